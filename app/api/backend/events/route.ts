@@ -0,0 +1,41 @@
+import { NextRequest, NextResponse } from 'next/server'
+
+const BACKEND_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
+
+// Long-lived stream - never cache or pre-render
+export const dynamic = 'force-dynamic'
+
+export async function GET(request: NextRequest) {
+  try {
+    const backendResponse = await fetch(`${BACKEND_URL}/api/events`, {
+      method: 'GET',
+      headers: { Accept: 'text/event-stream' },
+      cache: 'no-store',
+      signal: request.signal,
+    })
+
+    if (!backendResponse.ok || !backendResponse.body) {
+      return NextResponse.json(
+        { error: `Backend responded with status: ${backendResponse.status}` },
+        { status: backendResponse.status || 502 }
+      )
+    }
+
+    // Pass the event stream straight through
+    return new NextResponse(backendResponse.body, {
+      status: 200,
+      headers: {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache, no-transform',
+        Connection: 'keep-alive',
+        'X-Accel-Buffering': 'no',
+      },
+    })
+  } catch (error: any) {
+    console.error('Error opening event stream:', error)
+    return NextResponse.json(
+      { error: error.message || 'Failed to open event stream' },
+      { status: 502 }
+    )
+  }
+}
@@ -0,0 +1,40 @@
+import { NextRequest, NextResponse } from 'next/server'
+
+const BACKEND_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
+
+export async function GET(request: NextRequest) {
+  try {
+    // Forward selection (filenames / name_filter) exactly as received
+    const { search } = new URL(request.url)
+    const backendResponse = await fetch(
+      `${BACKEND_URL}/api/expected-format-pdf/download-zip${search}`,
+      { method: 'GET', cache: 'no-store' }
+    )
+
+    if (!backendResponse.ok) {
+      return new NextResponse(backendResponse.body, {
+        status: backendResponse.status,
+        headers: backendResponse.headers,
+      })
+    }
+
+    // Pass the archive through as a stream - never buffer it here
+    const headers = new Headers()
+    headers.set('Content-Type', 'application/zip')
+    headers.set(
+      'Content-Disposition',
+      backendResponse.headers.get('content-disposition') || 'attachment; filename="timesheets.zip"'
+    )
+
+    return new NextResponse(backendResponse.body, {
+      status: 200,
+      headers,
+    })
+  } catch (error: any) {
+    console.error('Error downloading PDF ZIP:', error)
+    return NextResponse.json(
+      { error: error.message || 'Failed to download PDF ZIP' },
+      { status: 500 }
+    )
+  }
+}
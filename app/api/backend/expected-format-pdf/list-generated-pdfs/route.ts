@@ -2,17 +2,36 @@ import { NextRequest, NextResponse } from 'next/server'
 
 const BACKEND_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
+// Conditional-request headers forwarded to the backend and validators passed back
+const CONDITIONAL_HEADERS = ['if-none-match', 'if-modified-since']
+const VALIDATOR_HEADERS = ['etag', 'last-modified', 'cache-control']
+
+function pickHeaders(source: Headers, names: string[]): Record<string, string> {
+  const picked: Record<string, string> = {}
+  for (const name of names) {
+    const value = source.get(name)
+    if (value) picked[name] = value
+  }
+  return picked
+}
+
 export async function GET(request: NextRequest) {
   try {
-    // Try to fetch from backend
-    const response = await fetch(`${BACKEND_URL}/api/expected-format-pdf/list-generated-pdfs`, {
+    // Try to fetch from backend, forwarding pagination/sort/search params
+    const response = await fetch(`${BACKEND_URL}/api/expected-format-pdf/list-generated-pdfs${request.nextUrl.search}`, {
       method: 'GET',
       headers: {
         'Content-Type': 'application/json',
+        ...pickHeaders(request.headers, CONDITIONAL_HEADERS),
       },
       cache: 'no-store',
     })
 
+    // Unchanged since the client's copy - let the browser reuse its cached body
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: pickHeaders(response.headers, VALIDATOR_HEADERS) })
+    }
+
     // If backend endpoint not found, return empty result instead of error
     if (response.status === 404) {
       console.warn('Backend endpoint not found, returning empty list')
@@ -35,9 +54,12 @@ export async function GET(request: NextRequest) {
     return NextResponse.json({
       files: data.files || [],
       count: data.count || (data.files ? data.files.length : 0),
+      page: data.page,
+      page_size: data.page_size,
+      total_pages: data.total_pages,
       output_directory: data.output_directory || '',
       format: data.format || 'Expected Format (matching Expected.pdf)'
-    })
+    }, { headers: pickHeaders(response.headers, VALIDATOR_HEADERS) })
   } catch (error: any) {
     console.error('Error fetching generated PDFs:', error)
     // Return empty list instead of error to prevent UI breakage
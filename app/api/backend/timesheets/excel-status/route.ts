@@ -2,19 +2,38 @@ import { NextRequest, NextResponse } from 'next/server'
 
 const BACKEND_URL = process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000'
 
+// Conditional-request headers forwarded to the backend and validators passed back
+const CONDITIONAL_HEADERS = ['if-none-match', 'if-modified-since']
+const VALIDATOR_HEADERS = ['etag', 'last-modified', 'cache-control']
+
+function pickHeaders(source: Headers, names: string[]): Record<string, string> {
+  const picked: Record<string, string> = {}
+  for (const name of names) {
+    const value = source.get(name)
+    if (value) picked[name] = value
+  }
+  return picked
+}
+
 export async function GET(request: NextRequest) {
   try {
     const response = await fetch(`${BACKEND_URL}/api/timesheets/excel-status`, {
       method: 'GET',
+      headers: pickHeaders(request.headers, CONDITIONAL_HEADERS),
+      cache: 'no-store',
     })
 
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: pickHeaders(response.headers, VALIDATOR_HEADERS) })
+    }
+
     if (!response.ok) {
       const errorData = await response.json().catch(() => ({ detail: 'Failed to check Excel status' }))
       throw new Error(errorData.detail || `Backend responded with status: ${response.status}`)
     }
 
     const data = await response.json()
-    return NextResponse.json(data)
+    return NextResponse.json(data, { headers: pickHeaders(response.headers, VALIDATOR_HEADERS) })
   } catch (error: any) {
     console.error('Error checking Excel status:', error)
     return NextResponse.json(
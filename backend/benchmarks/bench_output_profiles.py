@@ -0,0 +1,61 @@
+"""
+Output Profile Benchmark
+Reports bytes and milliseconds per employee for each PDF output profile
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_output_profiles --rows 5000 --employees 100
+"""
+
+import argparse
+import io
+import logging
+import time
+
+from expected_format_pdf_generator import ExpectedFormatPDFGenerator, OUTPUT_PROFILES
+from benchmarks.synthetic import make_timesheet_frame
+
+
+def run_profile(generator, profile, employee_groups):
+    """Render every employee into memory; return (total_bytes, total_seconds)"""
+    generator.set_output_profile(profile)
+    total_bytes = 0
+    started = time.perf_counter()
+    for (user_name, emp_id), employee_data in employee_groups:
+        buffer = io.BytesIO()
+        generator.render_pdf(buffer, employee_data, str(user_name), str(emp_id))
+        total_bytes += len(buffer.getvalue())
+    return total_bytes, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--engine", choices=["platypus", "canvas"], default=None,
+                        help="Render engine (defaults to the configured one)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    generator = ExpectedFormatPDFGenerator()
+    if args.engine:
+        generator.render_engine = args.engine
+
+    df = make_timesheet_frame(rows=args.rows, employees=args.employees)
+    employee_groups = list(df.groupby(["User Name", "EMP ID"]))
+    count = len(employee_groups)
+
+    # Warm-up so font and logo loading are not charged to the first profile
+    run_profile(generator, "fast", employee_groups[:1])
+
+    print(f"{count} employees, {args.rows} rows, engine={generator.render_engine}")
+    print(f"{'profile':>9} {'bytes/employee':>15} {'ms/employee':>12} {'total MB':>9}")
+    for profile in OUTPUT_PROFILES:
+        total_bytes, seconds = run_profile(generator, profile, employee_groups)
+        print(
+            f"{profile:>9} {total_bytes / count:>15,.0f} {seconds * 1000 / count:>12.1f} "
+            f"{total_bytes / 1e6:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
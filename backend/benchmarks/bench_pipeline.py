@@ -0,0 +1,193 @@
+"""
+Pipeline Benchmark Suite
+Times each stage of the Excel -> filter -> PDF pipeline on synthetic workbooks
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_pipeline --sizes 1000 10000 100000 --json baseline.json
+    python -m benchmarks.bench_pipeline --sizes 1000 10000 --compare baseline.json
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import tempfile
+import time
+
+# Keep benchmark PDFs, indexes and caches out of the real data directory
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="timeguard-bench-"))
+
+import pandas as pd
+import reportlab
+
+from expected_format_pdf_generator import (
+    ExpectedFormatPDFGenerator, detect_employee_identifier_columns, detect_billability_column
+)
+from services.excel_service import ExcelService
+from services.filter_service import FilterService
+from utils.group_index import GroupIndex
+from benchmarks.synthetic import COLUMN_VARIANTS, NAME_FORMATS, write_timesheet_workbook
+
+# Median slowdown reported as a regression by --compare
+REGRESSION_THRESHOLD = 1.10
+
+
+def measure(fn, rounds, warmup=1):
+    """
+    Time fn() over several rounds after warm-up calls.
+
+    Returns:
+        Dict with rounds, min, median, mean and max in seconds
+    """
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return {
+        "rounds": rounds,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "max": max(timings),
+    }
+
+
+def build_cases(args, rows, workbook_path, generator, excel_service, filter_service):
+    """
+    Prepare the benchmark cases for one dataset size.
+
+    Returns:
+        List of (name, callable, rounds, warmup)
+    """
+    df = excel_service.read_excel_file(workbook_path)
+    columns = detect_employee_identifier_columns(df)
+    name_col, id_col = columns["name_column"], columns["id_column"]
+    billability_col = detect_billability_column(df)
+    employee_groups = GroupIndex(df, name_col, id_col)
+    (first_name, first_id), first_group = next(iter(employee_groups))
+    rounds = args.rounds
+
+    def create_all_table_data():
+        for _, group in employee_groups:
+            generator.create_table_data(group)
+
+    def render_single_pdf():
+        generator.render_pdf(io.BytesIO(), first_group, str(first_name), str(first_id))
+
+    cases = [
+        ("xlsx_read", lambda: excel_service.read_excel_file(workbook_path), rounds, 0),
+        ("column_detection", lambda: (detect_employee_identifier_columns(df), detect_billability_column(df)),
+         rounds, 1),
+        ("filter_name_letter", lambda: generator.apply_standard_filters(df, name_col, id_col, name_filter="D"),
+         rounds, 1),
+        ("filter_emp_id_prefix", lambda: generator.apply_standard_filters(df, name_col, id_col, emp_id_filter="E100"),
+         rounds, 1),
+        ("filter_billability", lambda: generator.apply_standard_filters(
+            df, name_col, id_col, billability_filter="billable"), rounds, 1),
+        ("filter_custom_contains", lambda: filter_service.apply_custom_condition(df, f"{name_col} contains doe"),
+         rounds, 1),
+        ("filter_custom_starts_with", lambda: filter_service.apply_custom_condition(df, f"{id_col} starts with E100"),
+         rounds, 1),
+        ("filter_custom_equals", lambda: filter_service.apply_custom_condition(
+            df, f"{billability_col} == Billable"), rounds, 1),
+        ("filter_custom_query", lambda: filter_service.apply_custom_condition(df, "`Regular Time (Hours)` > 5"),
+         rounds, 1),
+        ("group_index", lambda: GroupIndex(df, name_col, id_col), rounds, 1),
+        ("create_table_data", create_all_table_data, rounds, 1),
+        ("single_pdf_render", render_single_pdf, rounds, 1),
+    ]
+    if not args.skip_e2e:
+        cases.append((
+            "generate_all_pdfs",
+            lambda: generator.generate_all_pdfs(df, force_regenerate=True),
+            1, 0
+        ))
+    return cases, len(employee_groups)
+
+
+def compare(results, baseline_path):
+    """Print median ratios against a previous --json file"""
+    with open(baseline_path, "r", encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    previous = {(entry["name"], entry["rows"]): entry["stats"]["median"] for entry in baseline["benchmarks"]}
+
+    print(f"\nCompared with {baseline_path}")
+    print(f"{'benchmark':>26} {'rows':>8} {'before ms':>10} {'after ms':>10} {'ratio':>7}")
+    for entry in results:
+        before = previous.get((entry["name"], entry["rows"]))
+        if before is None:
+            continue
+        after = entry["stats"]["median"]
+        ratio = after / before if before else float("inf")
+        flag = "  slower" if ratio > REGRESSION_THRESHOLD else ""
+        print(f"{entry['name']:>26} {entry['rows']:>8} {before * 1000:>10.1f} {after * 1000:>10.1f} "
+              f"{ratio:>7.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Workbook row counts")
+    parser.add_argument("--rows-per-employee", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=3, help="Timed rounds per micro benchmark")
+    parser.add_argument("--name-format", choices=NAME_FORMATS, default="last_first")
+    parser.add_argument("--columns", choices=list(COLUMN_VARIANTS), default="standard",
+                        help="Header naming variant")
+    parser.add_argument("--skip-e2e", action="store_true", help="Skip end-to-end generate_all_pdfs")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Previous --json file to compare medians against")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    generator = ExpectedFormatPDFGenerator()
+    excel_service = ExcelService()
+    filter_service = FilterService()
+    workdir = tempfile.mkdtemp(prefix="timeguard-bench-xlsx-")
+
+    print(f"engine={generator.render_engine} profile={generator.output_profile} data_dir={os.environ['DATA_DIR']}")
+    print(f"{'benchmark':>26} {'rows':>8} {'employees':>9} {'median ms':>10} {'min ms':>9}")
+    results = []
+    for rows in args.sizes:
+        employees = max(1, rows // args.rows_per_employee)
+        workbook_path = os.path.join(workdir, f"timesheet_{rows}.xlsx")
+        write_timesheet_workbook(
+            workbook_path, rows, employees, name_format=args.name_format, column_variant=args.columns
+        )
+        cases, employees = build_cases(args, rows, workbook_path, generator, excel_service, filter_service)
+        for name, fn, rounds, warmup in cases:
+            stats = measure(fn, rounds, warmup)
+            results.append({"name": name, "rows": rows, "employees": employees, "stats": stats})
+            print(f"{name:>26} {rows:>8} {employees:>9} {stats['median'] * 1000:>10.1f} {stats['min'] * 1000:>9.1f}")
+
+    if args.json:
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "pandas": pd.__version__,
+                "reportlab": reportlab.Version,
+                "render_engine": generator.render_engine,
+                "output_profile": generator.output_profile,
+                "name_format": args.name_format,
+                "columns": args.columns,
+                "rows_per_employee": args.rows_per_employee,
+            },
+            "benchmarks": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Render Engine Benchmark
+Compares the platypus and direct canvas engines on synthetic employees
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_render_engines --rows 2000
+"""
+
+import argparse
+import io
+import logging
+import re
+import time
+
+from expected_format_pdf_generator import ExpectedFormatPDFGenerator
+from benchmarks.synthetic import make_timesheet_frame
+
+PAGE_PATTERN = re.compile(rb"/Type /Page\b(?!s)")
+
+
+def render(generator, engine, employee_data):
+    """Render one employee into memory and return (pdf_bytes, seconds)"""
+    generator.render_engine = engine
+    buffer = io.BytesIO()
+    started = time.perf_counter()
+    if engine == "canvas":
+        generator.build_canvas_pdf(buffer, employee_data, "Doe, John", "E10000")
+    else:
+        generator.build_platypus_pdf(buffer, employee_data, "Doe, John", "E10000")
+    return buffer.getvalue(), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    generator = ExpectedFormatPDFGenerator()
+
+    print(f"{'rows':>8} {'engine':>9} {'pages':>6} {'seconds':>9} {'rows/s':>9} {'bytes':>10}")
+    for rows in args.rows:
+        employee_data = make_timesheet_frame(rows=rows, employees=1)
+        page_counts = {}
+        for engine in ("platypus", "canvas"):
+            pdf_bytes, seconds = render(generator, engine, employee_data)
+            page_counts[engine] = len(PAGE_PATTERN.findall(pdf_bytes))
+            print(
+                f"{rows:>8} {engine:>9} {page_counts[engine]:>6} {seconds:>9.3f} "
+                f"{rows / seconds:>9.0f} {len(pdf_bytes):>10}"
+            )
+        if page_counts["platypus"] != page_counts["canvas"]:
+            print(f"⚠️ Page count differs: {page_counts}")
+
+    print(f"Text layout cache: {generator.text_layout_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Startup Benchmark
+Measures cold import time of the API and the cost of the deferred service warm-up
+
+Each round runs in a fresh interpreter so nothing is already imported.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_startup --rounds 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs inside the child interpreter; prints one JSON line
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+heavy = {name: name in sys.modules for name in ("pandas", "numpy", "reportlab")}
+from services.container import container
+container.warm_up()
+warmed = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "warm_up_ms": (warmed - imported) * 1000,
+    "heavy_modules_at_import": heavy,
+    "services_ms": {name: seconds * 1000 for name, seconds in container.init_seconds.items()},
+}))
+"""
+
+
+def run_probe(data_dir):
+    """Run one cold start in a child interpreter and return its measurements"""
+    env = dict(os.environ, DATA_DIR=data_dir, LOG_LEVEL="WARNING", STARTUP_WARM_UP="false")
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=backend_dir, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="Cold starts to measure")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="timeguard-bench-startup-")
+    # First start creates the output directory and SQLite files; don't count it
+    run_probe(data_dir)
+    probes = [run_probe(data_dir) for _ in range(args.rounds)]
+
+    import_ms = [probe["import_ms"] for probe in probes]
+    warm_up_ms = [probe["warm_up_ms"] for probe in probes]
+    print(f"{'import main':>16}: median {statistics.median(import_ms):7.1f} ms  min {min(import_ms):7.1f} ms")
+    print(f"{'service warm-up':>16}: median {statistics.median(warm_up_ms):7.1f} ms  min {min(warm_up_ms):7.1f} ms")
+    print(f"{'heavy at import':>16}: {probes[-1]['heavy_modules_at_import']}")
+    for name in probes[-1]["services_ms"]:
+        median = statistics.median(probe["services_ms"][name] for probe in probes)
+        print(f"{name:>16}: median {median:7.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as report_file:
+            json.dump({"rounds": args.rounds, "probes": probes}, report_file, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
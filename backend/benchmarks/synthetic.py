@@ -0,0 +1,122 @@
+"""
+Synthetic Timesheet Data
+Builds realistic Expected.pdf-shaped DataFrames and workbooks for benchmarking
+
+Usage (from the backend directory):
+    python -m benchmarks.synthetic --rows 10000 --employees 250 --out /tmp/Consolidated.xlsx
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from expected_format_pdf_generator import TABLE_HEADERS
+
+FIRST_NAMES = ["John", "Priya", "Ahmed", "Maria", "Chen", "Olga", "Kwame", "Sara", "Luis", "Aisha"]
+LAST_NAMES = ["Doe", "Sharma", "Khan", "Garcia", "Wei", "Ivanova", "Mensah", "Cohen", "Lopez", "Bello"]
+PROJECTS = [
+    "Digital Transformation Program", "ERP Migration", "Cloud Landing Zone",
+    "Customer Portal Revamp", "Data Platform", "Internal Tools",
+]
+BILLABILITY = ["Billable", "Non-Billable"]
+
+NAME_FORMATS = ("last_first", "first_last")
+
+# Header renames seen in real exports; all are recognised by the column detection
+COLUMN_VARIANTS = {
+    "standard": {},
+    "employee": {
+        "User Name": "Employee Name",
+        "EMP ID": "Employee ID",
+        "Project Billability Type": "Billability Type",
+    },
+    "mixed_case": {
+        "User Name": "USER NAME",
+        "EMP ID": "Emp Id",
+        "Project Billability Type": "project billability type",
+    },
+}
+
+
+def employee_name(index, name_format="last_first"):
+    """Deterministic employee name, e.g. 'Doe1, John' or 'John Doe1'"""
+    last = f"{LAST_NAMES[index % len(LAST_NAMES)]}{index // len(LAST_NAMES) or ''}"
+    first = FIRST_NAMES[(index * 7) % len(FIRST_NAMES)]
+    if name_format == "first_last":
+        return f"{first} {last}"
+    return f"{last}, {first}"
+
+
+def make_timesheet_frame(rows=1000, employees=50, seed=0, name_format="last_first", column_variant="standard"):
+    """
+    Build a synthetic timesheet DataFrame with the 26 Expected.pdf columns.
+
+    Args:
+        rows: Total number of timesheet rows
+        employees: Number of distinct employees the rows are spread across
+        seed: Random seed for reproducible data
+        name_format: "last_first" ("Doe, John") or "first_last" ("John Doe")
+        column_variant: Key of COLUMN_VARIANTS used to rename the headers
+
+    Returns:
+        DataFrame with one column per Expected.pdf header
+    """
+    if name_format not in NAME_FORMATS:
+        raise ValueError(f"name_format must be one of {', '.join(NAME_FORMATS)}")
+    if column_variant not in COLUMN_VARIANTS:
+        raise ValueError(f"column_variant must be one of {', '.join(COLUMN_VARIANTS)}")
+    rng = np.random.default_rng(seed)
+    employee_ids = rng.integers(0, employees, rows)
+    names = [employee_name(i, name_format) for i in range(employees)]
+    projects = rng.integers(0, len(PROJECTS), rows)
+
+    data = {header: [f"{header} {i % 7}" for i in range(rows)] for header in TABLE_HEADERS}
+    data.update({
+        "Date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 31, rows), unit="D"),
+        "Month": ["Jan-2024"] * rows,
+        "User Name": [names[i] for i in employee_ids],
+        "EMP ID": [f"E{10000 + i}" for i in employee_ids],
+        "Email": [f"user{i}@example.com" for i in employee_ids],
+        "Project": [PROJECTS[i] for i in projects],
+        "Project Code": [f"PRJ-{100 + i}" for i in projects],
+        "Project Billability Type": [BILLABILITY[i % 2] for i in projects],
+        "Regular Time (Hours)": rng.integers(1, 10, rows).astype(float),
+        "Timesheet Status": rng.choice(["Approved", "Submitted"], rows),
+    })
+    frame = pd.DataFrame(data, columns=TABLE_HEADERS)
+    return frame.rename(columns=COLUMN_VARIANTS[column_variant])
+
+
+def write_timesheet_workbook(path, rows=1000, employees=50, seed=0, name_format="last_first",
+                             column_variant="standard"):
+    """
+    Write a synthetic timesheet workbook (same arguments as make_timesheet_frame).
+
+    Returns:
+        The DataFrame that was written
+    """
+    frame = make_timesheet_frame(rows, employees, seed, name_format, column_variant)
+    frame.to_excel(path, index=False)
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--name-format", choices=NAME_FORMATS, default="last_first")
+    parser.add_argument("--columns", choices=list(COLUMN_VARIANTS), default="standard",
+                        help="Header naming variant")
+    parser.add_argument("--out", required=True, help="Path of the .xlsx file to write")
+    args = parser.parse_args()
+
+    frame = write_timesheet_workbook(
+        args.out, args.rows, args.employees, args.seed, args.name_format, args.columns
+    )
+    print(f"Wrote {len(frame)} rows for {frame.iloc[:, 2].nunique()} employees to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
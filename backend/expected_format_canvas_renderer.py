@@ -0,0 +1,285 @@
+"""
+Direct Canvas Table Renderer
+Lays out the fixed 26-column Expected.pdf table straight onto a ReportLab canvas
+"""
+
+import logging
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+logger = logging.getLogger(__name__)
+
+# Cell geometry used by the platypus table style in ExpectedFormatPDFGenerator
+CELL_PADDING = 3
+FONT_SIZE = 3.5
+PARAGRAPH_LEADING = 4  # Leading of wrapped (Paragraph) cells and headers
+STRING_LEADING = 12  # Table default leading for plain string cells
+WRAP_THRESHOLD = 15  # Values longer than this are wrapped like Paragraphs
+BODY_FONT = "Helvetica"
+HEADER_FONT = "Helvetica-Bold"
+GRID_WIDTH = 0.5
+BORDER_WIDTH = 1
+FRAME_PADDING = 6  # SimpleDocTemplate frame padding
+
+
+def wrap_text(text, font_name, font_size, max_width):
+    """
+    Greedy word wrap matching Paragraph line breaking for plain text.
+
+    Words are separated on whitespace; a word wider than the line starts on
+    the current line and is broken character by character (Paragraph's
+    splitLongWords).
+
+    Args:
+        text: Text to wrap
+        font_name: Font used for measurement
+        font_size: Font size in points
+        max_width: Available line width in points
+
+    Returns:
+        List of line strings
+    """
+    space_width = stringWidth(" ", font_name, font_size)
+    lines = []
+    current = []
+    current_width = 0
+
+    for word in text.split():
+        word_width = stringWidth(word, font_name, font_size)
+        if word_width > max_width:
+            # Word longer than the line: its first piece fills the rest of the
+            # current line, the remainder is broken by characters
+            line_width = current_width + space_width if current else 0
+            piece = ""
+            for char in word:
+                char_width = stringWidth(char, font_name, font_size)
+                if line_width + char_width > max_width and (piece or char_width <= max_width):
+                    current.append(piece)
+                    lines.append(" ".join(current))
+                    current = []
+                    piece = ""
+                    line_width = 0
+                piece += char
+                line_width += char_width
+            current = [piece]
+            current_width = line_width
+            continue
+        if current and current_width + space_width + word_width <= max_width:
+            current.append(word)
+            current_width += space_width + word_width
+            continue
+        if current:
+            lines.append(" ".join(current))
+        current = [word]
+        current_width = word_width
+
+    if current:
+        lines.append(" ".join(current))
+    return lines
+
+
+class CanvasTableRenderer:
+    """
+    Renders the Expected.pdf table directly on a canvas.
+
+    Produces the same layout as the platypus Table used by
+    ExpectedFormatPDFGenerator (header repeated per page, striped rows, grid)
+    but measures every row once, breaks pages itself and draws each page with
+    a handful of batched primitives instead of per-cell flowables.
+    """
+
+    def __init__(self, generator, layout_cache=None):
+        self.layout_cache = layout_cache
+        self.column_widths = list(generator.column_widths)
+        self.table_width = sum(self.column_widths)
+        self.header_color = generator.header_color
+        self.stripe_color = colors.Color(0.95, 0.95, 0.95)
+
+        # Column x positions (left edge of each column plus the right edge)
+        page_width, page_height = generator.page_width, generator.page_height
+        frame_width = page_width - 2 * generator.margin - 2 * FRAME_PADDING
+        left = generator.margin + FRAME_PADDING + (frame_width - self.table_width) / 2.0
+        self.column_positions = [left]
+        for width in self.column_widths:
+            self.column_positions.append(self.column_positions[-1] + width)
+
+        # Vertical extent of the table area on each page
+        self.top = page_height - (generator.margin + 50) - FRAME_PADDING
+        self.bottom = generator.margin + FRAME_PADDING
+
+    def layout_cell(self, value, font_name, width, wrap):
+        """
+        Measure a cell, reusing the cached layout when the value repeats.
+
+        Returns:
+            Tuple of (lines, line_widths, height, is_wrapped)
+        """
+        if self.layout_cache is None:
+            return self._measure_cell(value, font_name, width, wrap)
+        key = (value, font_name, FONT_SIZE, width if wrap else None)
+        return self.layout_cache.get_or_compute(
+            key, lambda: self._measure_cell(value, font_name, width, wrap)
+        )
+
+    @staticmethod
+    def _measure_cell(value, font_name, width, wrap):
+        """Wrap and measure a cell from scratch"""
+        if wrap:
+            lines = wrap_text(value, font_name, FONT_SIZE, width - 2 * CELL_PADDING)
+            height = PARAGRAPH_LEADING * len(lines) + 2 * CELL_PADDING
+        else:
+            lines = value.split("\n")
+            height = STRING_LEADING * len(lines) + 2 * CELL_PADDING
+        widths = tuple(stringWidth(line, font_name, FONT_SIZE) for line in lines)
+        return tuple(lines), widths, height, wrap
+
+    def layout_row(self, values, font_name=BODY_FONT, wrap_all=False):
+        """
+        Measure all cells of a row.
+
+        Returns:
+            Tuple of (cells, row_height) where cells is a list of
+            (lines, line_widths, is_wrapped) per column
+        """
+        cells = []
+        row_height = 0
+        for value, width in zip(values, self.column_widths):
+            lines, line_widths, height, wrapped = self.layout_cell(
+                value, font_name, width, wrap_all or len(value) > WRAP_THRESHOLD
+            )
+            cells.append((lines, line_widths, wrapped))
+            if height > row_height:
+                row_height = height
+        return cells, row_height
+
+    def paginate(self, header_height, row_heights):
+        """
+        Split rows into pages the way a repeatRows=1 table split does.
+
+        Returns:
+            List of (start, end) row index ranges, one per page
+        """
+        available = self.top - self.bottom - header_height
+        pages = []
+        start = 0
+        used = 0
+        for index, height in enumerate(row_heights):
+            if used + height > available and index > start:
+                pages.append((start, index))
+                start = index
+                used = 0
+            used += height
+        if start < len(row_heights) or not pages:
+            pages.append((start, len(row_heights)))
+        return pages
+
+    def render(self, canv, headers, rows, on_page=None):
+        """
+        Render the table onto the canvas, starting a new page for the table.
+
+        Args:
+            canv: ReportLab canvas positioned at the start of a fresh page
+            headers: List of header strings
+            rows: List of rows, each a list of display strings
+            on_page: Optional callback(canv, page_number) drawing page decorations
+
+        Returns:
+            Number of pages drawn
+        """
+        header_cells, header_height = self.layout_row(headers, HEADER_FONT, wrap_all=True)
+        laid_out = [self.layout_row(row) for row in rows]
+        pages = self.paginate(header_height, [height for _, height in laid_out])
+
+        for page_number, (start, end) in enumerate(pages, 1):
+            if on_page:
+                on_page(canv, page_number)
+            self._draw_page(canv, header_cells, header_height, laid_out[start:end])
+            canv.showPage()
+
+        return len(pages)
+
+    def _draw_page(self, canv, header_cells, header_height, page_rows):
+        """Draw one page of the table: backgrounds, text, then grid lines"""
+        positions = self.column_positions
+        left, right = positions[0], positions[-1]
+
+        # Row boundaries from the top of the table downwards
+        boundaries = [self.top, self.top - header_height]
+        for _, height in page_rows:
+            boundaries.append(boundaries[-1] - height)
+        bottom = boundaries[-1]
+
+        canv.saveState()
+
+        # Backgrounds: header band and every second data row
+        canv.setFillColor(self.header_color)
+        canv.rect(left, boundaries[1], self.table_width, header_height, stroke=0, fill=1)
+        canv.setFillColor(self.stripe_color)
+        for index in range(1, len(page_rows), 2):
+            row_bottom = boundaries[index + 2]
+            canv.rect(left, row_bottom, self.table_width, boundaries[index + 1] - row_bottom, stroke=0, fill=1)
+
+        # Text: one text object for the header, one for the body
+        header_text = canv.beginText()
+        header_text.setFont(HEADER_FONT, FONT_SIZE)
+        header_text.setFillColor(colors.white)
+        self._add_row_text(header_text, header_cells, self.top, middle_height=header_height)
+        canv.drawText(header_text)
+
+        body_text = canv.beginText()
+        body_text.setFont(BODY_FONT, FONT_SIZE)
+        body_text.setFillColor(colors.black)
+        for (cells, _), row_top in zip(page_rows, boundaries[1:]):
+            self._add_row_text(body_text, cells, row_top)
+        canv.drawText(body_text)
+
+        # Grid: all cell borders in a single path
+        canv.setStrokeColor(colors.black)
+        canv.setLineWidth(GRID_WIDTH)
+        grid = canv.beginPath()
+        for y in boundaries:
+            grid.moveTo(left, y)
+            grid.lineTo(right, y)
+        for x in positions:
+            grid.moveTo(x, self.top)
+            grid.lineTo(x, bottom)
+        canv.drawPath(grid, stroke=1, fill=0)
+
+        # Thicker lines around the header and the outer columns
+        canv.setLineWidth(BORDER_WIDTH)
+        borders = canv.beginPath()
+        for y in boundaries[:2]:
+            borders.moveTo(left, y)
+            borders.lineTo(right, y)
+        for x in (left, right):
+            borders.moveTo(x, self.top)
+            borders.lineTo(x, bottom)
+        canv.drawPath(borders, stroke=1, fill=0)
+
+        canv.restoreState()
+
+    def _add_row_text(self, text_object, cells, row_top, middle_height=None):
+        """
+        Append the lines of one row to a text object.
+
+        Body cells are top-aligned with wrapped text left-aligned; passing
+        middle_height centres every cell both ways like the header row.
+        """
+        for (lines, line_widths, wrapped), x, width in zip(cells, self.column_positions, self.column_widths):
+            leading = PARAGRAPH_LEADING if wrapped else STRING_LEADING
+            center = not wrapped or middle_height is not None
+            if middle_height is None:
+                y = row_top - CELL_PADDING - FONT_SIZE
+            else:
+                y = row_top - (middle_height - leading * len(lines)) / 2.0 - FONT_SIZE
+            for line, line_width in zip(lines, line_widths):
+                if not line:
+                    y -= leading
+                    continue
+                if center:
+                    line_x = x + (width - line_width) / 2.0
+                else:
+                    line_x = x + CELL_PADDING
+                text_object.setTextOrigin(line_x, y)
+                text_object.textOut(line)
+                y -= leading
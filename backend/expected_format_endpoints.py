@@ -2,130 +2,241 @@
 FastAPI endpoints for Expected Format PDF Generator
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse
-import pandas as pd
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import os
+import io
 import logging
+import threading
+import time
 from pathlib import Path
-from expected_format_pdf_generator import ExpectedFormatPDFGenerator, detect_employee_identifier_columns
-from settings import settings
+from typing import List, Optional, Tuple
+from services.container import container
 from utils.file_utils import validate_filename, sanitize_path
+from utils.zip_stream import iter_zip_stream
+from utils.pdf_index import SORT_COLUMNS
+from utils.event_bus import event_bus, PDF_DELETED, JOB_PROGRESS
+from utils.job_registry import job_registry
+from utils.metrics import request_timings, stage_timer
+from utils.http_cache import make_etag, is_not_modified, not_modified_response, validator_headers
 
 logger = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter(prefix="/api/expected-format-pdf", tags=["Expected Format PDF Generation"])
 
-# Initialize generator
-expected_format_generator = ExpectedFormatPDFGenerator()
+# Serialises trash reclamation so concurrent delete-all jobs never walk the same directory
+_reclaim_lock = threading.Lock()
 
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
+    generator = await container.resolve("pdf_generator")
     return {
         "status": "healthy",
         "message": "Expected Format PDF Generator is ready",
-        "output_dir_exists": os.path.exists(expected_format_generator.output_dir),
+        "output_dir_exists": os.path.exists(generator.output_dir),
         "method": "Expected Format ReportLab",
-        "page_size": f"{expected_format_generator.page_width:.1f} x {expected_format_generator.page_height:.1f} points",
-        "total_columns": len(expected_format_generator.column_widths)
+        "page_size": f"{generator.page_width:.1f} x {generator.page_height:.1f} points",
+        "total_columns": len(generator.column_widths),
+        "render_engine": generator.render_engine,
+        "text_layout_cache": generator.text_layout_cache.stats()
     }
 
 @router.post("/generate-single-timesheet")
 async def generate_single_timesheet(
     user_name: str = Query(..., min_length=1, max_length=200, description="Employee name"),
-    emp_id: str = Query(..., min_length=1, max_length=50, description="Employee ID")
+    emp_id: str = Query(..., min_length=1, max_length=50, description="Employee ID"),
+    stream: bool = Query(False, description="Return the PDF bytes directly instead of JSON"),
+    persist: bool = Query(True, description="Also save the PDF to the output directory (stream mode)")
 ):
-    """Generate Expected Format PDF for a single employee"""
+    """
+    Generate Expected Format PDF for a single employee
+    
+    With stream=true the PDF is rendered in memory and returned as an
+    application/pdf response in the same round trip; persist=false skips
+    writing it to the output directory.
+    """
+    # Deferred: ReportLab loads with the first generation request (or the startup
+    # warm-up); resolving the generator imports it in the threadpool
+    generator = await container.resolve("pdf_generator")
+    from expected_format_pdf_generator import detect_employee_identifier_columns
+    
     try:
-        # Load data from Consolidated.xlsx using settings
-        consolidated_path = os.path.join(settings.data_dir, "Consolidated.xlsx")
-        if not os.path.exists(consolidated_path):
+        # Load data from Consolidated.xlsx via the shared ExcelService
+        excel_service = await container.resolve("excel_service")
+        snapshot = await run_in_threadpool(excel_service.snapshots.acquire)
+        if snapshot is None:
             raise HTTPException(status_code=404, detail="Consolidated.xlsx not found")
         
-        # Read data
-        df = pd.read_excel(consolidated_path)
-        
-        # Dynamically detect employee identifier columns
-        employee_cols = detect_employee_identifier_columns(df)
-        if not employee_cols['name_found'] or not employee_cols['id_found']:
-            raise HTTPException(status_code=400, detail="Could not detect employee identifier columns in Excel file")
-        
-        # Filter for specific employee using dynamically detected columns
-        name_col = employee_cols['name_column']
-        id_col = employee_cols['id_column']
-        employee_data = df[(df[name_col] == user_name) & (df[id_col] == emp_id)]
-        
-        if employee_data.empty:
-            raise HTTPException(status_code=404, detail=f"No data found for {user_name} ({emp_id})")
-        
-        # Generate PDF
-        result = expected_format_generator.generate_single_pdf(employee_data, user_name, emp_id)
+        with request_timings() as timings:
+            # Read data (cached per snapshot version, consistent across workers)
+            async with snapshot:
+                df = await run_in_threadpool(excel_service.load_consolidated_file, snapshot)
+            
+            # Dynamically detect employee identifier columns
+            with stage_timer("detect_columns"):
+                employee_cols = detect_employee_identifier_columns(df)
+            if not employee_cols['name_found'] or not employee_cols['id_found']:
+                raise HTTPException(status_code=400, detail="Could not detect employee identifier columns in Excel file")
+            
+            # Filter for specific employee using dynamically detected columns
+            name_col = employee_cols['name_column']
+            id_col = employee_cols['id_column']
+            with stage_timer("filter"):
+                employee_data = df[(df[name_col] == user_name) & (df[id_col] == emp_id)]
+            
+            if employee_data.empty:
+                raise HTTPException(status_code=404, detail=f"No data found for {user_name} ({emp_id})")
+            
+            # Generate PDF
+            result = await run_in_threadpool(
+                generator.generate_single_pdf,
+                employee_data, user_name, emp_id, in_memory=stream
+            )
+            
+            if not result["success"]:
+                raise HTTPException(status_code=500, detail=result.get("error", "PDF generation failed"))
+            
+            result["snapshot_version"] = snapshot.version
+            if not stream:
+                result["timings"] = timings.breakdown()
+                return result
+            
+            content = result.pop("content")
+            if persist:
+                result["file_path"] = await run_in_threadpool(
+                    generator.save_pdf_bytes,
+                    result["filename"], content, user_name=user_name, emp_id=emp_id
+                )
+            breakdown = timings.breakdown()
         
-        if result["success"]:
-            return result
-        else:
-            raise HTTPException(status_code=500, detail=result.get("error", "PDF generation failed"))
+        # Binary responses carry the breakdown as a Server-Timing header
+        server_timing = ", ".join(
+            f"{name[:-3]};dur={duration}" for name, duration in breakdown.items()
+        )
+        return StreamingResponse(
+            io.BytesIO(content),
+            media_type="application/pdf",
+            headers={
+                "Content-Disposition": f'attachment; filename="{result["filename"]}"',
+                "Content-Length": str(len(content)),
+                "Server-Timing": server_timing,
+                "X-Snapshot-Version": snapshot.version
+            }
+        )
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error in generate_single_timesheet: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/generate-all-timesheets")
 async def generate_all_timesheets(
-    name_filter: str = Query(None, description="Filter by names starting with this letter (e.g., 'A')")
+    name_filter: str = Query(None, description="Filter by names starting with this letter (e.g., 'A')"),
+    force_regenerate: bool = Query(False, description="Re-render PDFs even if their data is unchanged"),
+    single_document: bool = Query(False, description="Render all employees into one combined PDF")
 ):
     """Generate Expected Format PDFs for all employees, optionally filtered by name"""
     try:
-        # Load data from Consolidated.xlsx using settings
-        consolidated_path = os.path.join(settings.data_dir, "Consolidated.xlsx")
-        if not os.path.exists(consolidated_path):
+        # Load data from Consolidated.xlsx via the shared ExcelService
+        excel_service = await container.resolve("excel_service")
+        generator = await container.resolve("pdf_generator")
+        snapshot = await run_in_threadpool(excel_service.snapshots.acquire)
+        if snapshot is None:
             raise HTTPException(status_code=404, detail="Consolidated.xlsx not found")
         
-        # Read data
-        df = pd.read_excel(consolidated_path)
-        
-        # Generate all PDFs with optional filter
-        result = expected_format_generator.generate_all_pdfs(df, name_filter=name_filter)
+        with request_timings() as timings:
+            # The run keeps its snapshot version leased until it finishes
+            async with snapshot:
+                df = await run_in_threadpool(excel_service.load_consolidated_file, snapshot)
+                
+                # Generate all PDFs with optional filter, off the event loop
+                result = await run_in_threadpool(
+                    generator.generate_all_pdfs,
+                    df, name_filter=name_filter, force_regenerate=force_regenerate,
+                    single_document=single_document, snapshot_version=snapshot.version
+                )
+            result["timings"] = timings.breakdown()
         
         return result
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error in generate_all_timesheets: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/list-generated-pdfs")
-async def list_generated_pdfs():
-    """List all generated Expected Format PDF files"""
+async def list_generated_pdfs(
+    request: Request,
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number (1-based)"),
+    page_size: Optional[int] = Query(None, ge=1, le=1000, description="Files per page (all files if omitted)"),
+    sort_by: str = Query("created", description="Sort column: created, filename, file_size, user_name or emp_id"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order"),
+    search: Optional[str] = Query(None, max_length=200, description="Match filename, employee name or EMP ID"),
+    refresh: bool = Query(False, description="Re-index the output directory from disk first")
+):
+    """
+    List generated Expected Format PDF files
+    
+    Served from the PDF index rather than scanning the output directory;
+    count is the number of files matching the search across all pages.
+    The ETag combines the index generation with the query, so polls that
+    repeat it get a 304 until a PDF is written or deleted.
+    """
     try:
-        output_dir = expected_format_generator.output_dir
-        
-        if not os.path.exists(output_dir):
-            return {"files": [], "count": 0}
-        
-        files = []
-        for filename in os.listdir(output_dir):
-            if filename.endswith('.pdf'):
-                file_path = os.path.join(output_dir, filename)
-                file_size = os.path.getsize(file_path)
-                files.append({
-                    "filename": filename,
-                    "file_path": file_path,
-                    "file_size": file_size,
-                    "created": os.path.getctime(file_path)
-                })
-        
-        # Sort by creation time (newest first)
-        files.sort(key=lambda x: x["created"], reverse=True)
+        # Validate before the ETag check so a bad query never gets a 304
+        if sort_by not in SORT_COLUMNS:
+            raise HTTPException(status_code=400, detail=f"sort_by must be one of: {', '.join(SORT_COLUMNS)}")
+        
+        generator = await container.resolve("pdf_generator")
+        output_dir = generator.output_dir
+        pdf_index = generator.pdf_index
+        
+        if refresh:
+            # Full directory walk plus an index rewrite - run it off the event loop
+            await run_in_threadpool(pdf_index.rebuild, generator.storage)
+        
+        generation, last_modified = pdf_index.generation()
+        etag = make_etag("pdfs", generation, page, page_size, sort_by, order, search)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        response.headers.update(validator_headers(etag, last_modified))
+        
+        offset = (page - 1) * page_size if page_size else 0
+        entries, total = pdf_index.query(
+            search=search.strip() if search else None, sort_by=sort_by, order=order,
+            limit=page_size, offset=offset
+        )
+        files = [
+            {
+                "filename": entry["filename"],
+                "file_path": entry["file_path"],
+                "file_size": entry["file_size"],
+                "created": entry["created"],
+                "user_name": entry["user_name"],
+                "emp_id": entry["emp_id"],
+                "run_id": entry["run_id"]
+            }
+            for entry in entries
+        ]
         
         return {
             "files": files,
-            "count": len(files),
+            "count": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": -(-total // page_size) if page_size else 1,
             "output_directory": output_dir,
             "format": "Expected Format (matching Expected.pdf)"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error listing PDFs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -137,13 +248,13 @@ async def download_pdf(filename: str):
         # Validate and sanitize filename
         safe_filename = validate_filename(filename, allowed_extensions=['.pdf'])
         
-        # Build and sanitize file path
-        output_dir = expected_format_generator.output_dir
-        file_path = os.path.join(output_dir, safe_filename)
-        file_path_resolved = sanitize_path(file_path, output_dir)
-        
-        if not file_path_resolved.exists():
+        # Resolve through the storage layout and sanitize file path
+        generator = await container.resolve("pdf_generator")
+        output_dir = generator.output_dir
+        file_path = generator.storage.resolve(safe_filename)
+        if file_path is None:
             raise HTTPException(status_code=404, detail="PDF file not found")
+        file_path_resolved = sanitize_path(file_path, output_dir)
         
         return FileResponse(
             path=str(file_path_resolved),
@@ -157,6 +268,62 @@ async def download_pdf(filename: str):
         logger.error(f"❌ Error downloading PDF: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def select_zip_files(filenames: Optional[List[str]], name_filter: Optional[str]) -> List[Tuple[str, str]]:
+    """
+    Resolve the (filename, path) pairs to put in a ZIP download.
+    
+    Files deleted after this listing are skipped while the archive streams.
+    """
+    output_dir = container.pdf_generator.output_dir
+    if not os.path.exists(output_dir):
+        return []
+    
+    if filenames:
+        # Explicit selection - validate every name
+        selected = []
+        for filename in filenames:
+            safe_filename = validate_filename(filename, allowed_extensions=['.pdf'])
+            file_path = container.pdf_generator.storage.resolve(safe_filename)
+            if file_path is not None:
+                selected.append((safe_filename, str(sanitize_path(file_path, output_dir))))
+    else:
+        selected = sorted(container.pdf_generator.storage.iter_files())
+    
+    if name_filter and name_filter.strip():
+        prefix = name_filter.strip().lower()
+        selected = [(name, path) for name, path in selected if name.lower().startswith(prefix)]
+    return selected
+
+@router.get("/download-zip")
+async def download_zip(
+    filenames: Optional[List[str]] = Query(None, description="Specific PDF filenames to include"),
+    name_filter: Optional[str] = Query(None, description="Only include PDFs whose name starts with this text")
+):
+    """
+    Download generated PDFs as a single ZIP archive.
+    
+    The archive is streamed in chunks as it is built (stored, no compression),
+    so nothing is staged on disk or held in memory.
+    """
+    try:
+        # Walking the shard directories is blocking I/O; keep it off the event loop
+        selected = await run_in_threadpool(select_zip_files, filenames, name_filter)
+        if not selected:
+            raise HTTPException(status_code=404, detail="No PDF files found")
+        
+        logger.info(f"📦 Streaming ZIP of {len(selected)} PDF files")
+        return StreamingResponse(
+            iter_zip_stream(selected),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="timesheets.zip"'}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error streaming PDF ZIP: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.delete("/delete-pdf/{filename}")
 async def delete_pdf(filename: str):
     """Delete a specific Expected Format PDF file"""
@@ -164,16 +331,18 @@ async def delete_pdf(filename: str):
         # Validate and sanitize filename
         safe_filename = validate_filename(filename, allowed_extensions=['.pdf'])
         
-        # Build and sanitize file path
-        output_dir = expected_format_generator.output_dir
-        file_path = os.path.join(output_dir, safe_filename)
-        file_path_resolved = sanitize_path(file_path, output_dir)
-        
-        if not file_path_resolved.exists():
+        # Resolve through the storage layout and sanitize file path
+        generator = await container.resolve("pdf_generator")
+        output_dir = generator.output_dir
+        file_path = generator.storage.resolve(safe_filename)
+        if file_path is None:
             raise HTTPException(status_code=404, detail="PDF file not found")
+        file_path_resolved = sanitize_path(file_path, output_dir)
         
         # Delete file
         file_path_resolved.unlink()
+        generator.pdf_index.remove(safe_filename)
+        event_bus.publish(PDF_DELETED, {"filename": safe_filename})
         logger.info(f"✅ Deleted PDF: {safe_filename}")
         
         return {
@@ -187,41 +356,95 @@ async def delete_pdf(filename: str):
         logger.error(f"❌ Error deleting PDF: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def reclaim_trash(job_id: str, trash_path: Optional[str]) -> None:
+    """
+    Background task: unlink PDFs swapped out by delete-all, reporting progress.
+    
+    Also reclaims trash left behind by earlier runs (e.g. a restart mid-delete).
+    """
+    storage = container.pdf_generator.storage
+    interval = container.pdf_generator.PROGRESS_EVENT_INTERVAL
+    total = job_registry.get(job_id)["total"]
+    deleted_before = 0
+    last_progress = time.monotonic()
+    
+    def report(deleted: int) -> None:
+        nonlocal last_progress
+        if time.monotonic() - last_progress < interval:
+            return
+        last_progress = time.monotonic()
+        processed = deleted_before + deleted
+        job_registry.update(job_id, processed=processed)
+        event_bus.publish(JOB_PROGRESS, {
+            "run_id": job_id, "kind": "delete-all", "status": "running",
+            "processed": processed, "total": max(total, processed)
+        })
+    
+    try:
+        with _reclaim_lock:
+            paths = storage.pending_trash()
+            if trash_path and trash_path not in paths:
+                paths.append(trash_path)
+            for path in paths:
+                deleted_before += storage.reclaim(path, progress=report)
+        
+        job = job_registry.update(job_id, status="completed", processed=deleted_before)
+        event_bus.publish(JOB_PROGRESS, {
+            "run_id": job_id, "kind": "delete-all", "status": "completed",
+            "processed": deleted_before, "total": deleted_before
+        })
+        logger.info(f"✅ Reclaimed {deleted_before} deleted PDF files in {job['finished'] - job['started']:.1f}s")
+    except Exception as e:
+        job_registry.update(job_id, status="failed", error=str(e), processed=deleted_before)
+        logger.error(f"❌ Error reclaiming deleted PDFs: {e}", exc_info=True)
+
 @router.delete("/delete-all-pdfs")
-async def delete_all_pdfs():
-    """Delete all Expected Format PDF files"""
+async def delete_all_pdfs(background_tasks: BackgroundTasks):
+    """
+    Delete all Expected Format PDF files
+    
+    The stored PDFs are moved aside in one step and the response returns
+    immediately; the files are unlinked by a background job whose progress is
+    available from /jobs/{job_id} and as job-progress events.
+    """
     try:
-        output_dir = expected_format_generator.output_dir
+        generator = await container.resolve("pdf_generator")
+        storage = generator.storage
+        pdf_index = generator.pdf_index
         
-        if not os.path.exists(output_dir):
+        file_count = pdf_index.count()
+        trash_path = await run_in_threadpool(storage.swap_out)
+        if trash_path is None and not storage.pending_trash():
             return {
                 "success": True,
                 "message": "No PDF files to delete",
                 "deleted_count": 0
             }
         
-        deleted_count = 0
-        deleted_files = []
-        
-        # Get all PDF files in the output directory
-        for filename in os.listdir(output_dir):
-            if filename.endswith('.pdf'):
-                file_path = os.path.join(output_dir, filename)
-                try:
-                    os.remove(file_path)
-                    deleted_count += 1
-                    deleted_files.append(filename)
-                    logger.info(f"✅ Deleted PDF: {filename}")
-                except Exception as e:
-                    logger.error(f"❌ Error deleting {filename}: {e}")
+        # The layout is now empty apart from PDFs written after the swap
+        await run_in_threadpool(pdf_index.rebuild, storage)
+        event_bus.publish(PDF_DELETED, {"all": True, "deleted_count": file_count})
+        
+        job = job_registry.create("delete-all", total=file_count)
+        background_tasks.add_task(reclaim_trash, job["job_id"], trash_path)
+        logger.info(f"✅ Deleting {file_count} PDF files in the background (job {job['job_id']})")
         
         return {
             "success": True,
-            "message": f"Successfully deleted {deleted_count} PDF files",
-            "deleted_count": deleted_count,
-            "deleted_files": deleted_files
+            "message": f"Deleting {file_count} PDF files in the background",
+            "deleted_count": file_count,
+            "job_id": job["job_id"],
+            "status": job["status"]
         }
         
     except Exception as e:
         logger.error(f"❌ Error deleting all PDFs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Progress of a background job (e.g. delete-all reclamation)"""
+    job = job_registry.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, **job}
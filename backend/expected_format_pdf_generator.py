@@ -4,20 +4,40 @@ Generates PDFs exactly matching the Expected.pdf format
 """
 
 import pandas as pd
+import numpy as np
 import os
 import logging
 from datetime import datetime
 from pathlib import Path
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, Flowable, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, mm
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab import rl_config
 import io
 import re
+import hashlib
+import uuid
+import time
+import threading
+from contextlib import contextmanager
+
+from expected_format_canvas_renderer import CanvasTableRenderer, HEADER_FONT, BODY_FONT
+from utils.text_layout_cache import TextLayoutCache
+from utils.pdf_storage import PDFStorage
+from utils.pdf_index import PDFIndex
+from utils.run_store import RunStore, COMPLETED, FAILED
+from utils.file_lock import FileLock
+from utils.group_index import GroupIndex
+from utils import metrics
+from utils.metrics import stage_timer, observe_stage
+from utils.event_bus import event_bus, PDF_CREATED, JOB_PROGRESS
+from utils.logging_utils import bind_log_context, reset_log_context
 
 # Import settings if available, otherwise use defaults
 try:
@@ -30,6 +50,136 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# The 26 column headers exactly as in Expected.pdf
+TABLE_HEADERS = [
+    "Date", "Month", "User Name", "EMP ID", "Email", "Resource Category",
+    "User Resource Type", "DU Head", "DU", "PU", "BU", "SBU",
+    "Project", "Project Code", "Project Manager", "Project Practice Owner",
+    "Project Contract Type", "Project Type", "Project Billability Type",
+    "Task", "Task Category", "Task Billability", "Tasks Payability", "Regular Time (Hours)",
+    "Timesheet Status", "Input Type Code"
+]
+
+# Output profiles trading file size against render time
+#   page_compression: Flate-compress page content streams
+#   ascii85: ASCII85-encode binary streams (7-bit clean, ~25% larger)
+#   logo: "original" embeds logo.png losslessly, "jpeg" re-encodes it as a small JPEG
+OUTPUT_PROFILES = {
+    "fast": {"page_compression": False, "ascii85": False, "logo": "original"},
+    "compact": {"page_compression": True, "ascii85": False, "logo": "jpeg"},
+    "archival": {"page_compression": True, "ascii85": True, "logo": "original"},
+}
+
+# Logo re-encoding for the "jpeg" logo mode
+LOGO_JPEG_QUALITY = 80
+LOGO_MAX_PIXELS = (240, 110)  # 2x the 120x55pt drawn size
+
+# Per-run lock files (under the output directory) marking runs in progress in any worker
+RUN_LOCK_DIR = ".runs"
+
+# Batch responses list at most this many generated files inline; the rest are
+# paged through the run's results_url
+GENERATED_FILES_LIMIT = 100
+
+class Ascii85Switch:
+    """
+    Applies a document's ASCII85 setting for the duration of its render.
+    
+    ReportLab only has a process-wide switch (rl_config.useA85), read while a
+    document is drawn and saved. Renders wanting the same setting run
+    concurrently; one wanting the other setting waits for them to finish, so
+    generators with different profiles never change each other's output.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._active = 0
+        self._value = None
+    
+    @contextmanager
+    def applied(self, enabled):
+        value = 1 if enabled else 0
+        with self._condition:
+            while self._active and self._value != value:
+                self._condition.wait()
+            rl_config.useA85 = self._value = value
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                if not self._active:
+                    self._condition.notify_all()
+
+ascii85_switch = Ascii85Switch()
+
+class LazyTableBlock(Flowable):
+    """
+    Page-sized table block whose cells are only created when it is laid out
+    
+    Used by long-table mode so that only one page of Paragraph/Table objects
+    exists at a time; the table is dropped again as soon as it is drawn.
+    """
+    
+    def __init__(self, build_table):
+        super().__init__()
+        self._build_table = build_table
+        self._table = None
+        self.hAlign = 'CENTER'
+    
+    def _get_table(self):
+        if self._table is None:
+            self._table = self._build_table()
+        return self._table
+    
+    def wrap(self, availWidth, availHeight):
+        self.width, self.height = self._get_table().wrap(availWidth, availHeight)
+        return self.width, self.height
+    
+    def split(self, availWidth, availHeight):
+        # Only reached if the measured block did not fit (e.g. unusual fonts)
+        return self._get_table().split(availWidth, availHeight)
+    
+    def drawOn(self, canvas, x, y, _sW=0):
+        self._get_table().drawOn(canvas, x, y, _sW)
+        self._table = None
+
+
+class CachedParagraph(Paragraph):
+    """
+    Table cell Paragraph whose markup parse and line breaks come from a TextLayoutCache
+
+    Cell values repeat across rows and employees (project names, DU heads,
+    column headers), so each distinct text is parsed once per style and
+    broken into lines once per column width. The cached fragments and line
+    layouts are only read when drawing, so instances can share them.
+    """
+
+    def __init__(self, text, style, layout_cache):
+        self._layout_cache = layout_cache
+        self._style_key = (
+            style.name, style.fontName, style.fontSize, style.leading,
+            style.alignment, str(style.textColor)
+        )
+        frags = layout_cache.get_or_compute(
+            ("paragraph", text, self._style_key), lambda: Paragraph(text, style).frags
+        )
+        super().__init__(text, style, frags=frags)
+
+    def wrap(self, availWidth, availHeight):
+        if availWidth <= 0:
+            # Nothing fits; Paragraph reports that without laying out lines
+            return super().wrap(availWidth, availHeight)
+
+        def compute():
+            width, height = super(CachedParagraph, self).wrap(availWidth, availHeight)
+            return self._wrapWidths, self.blPara, width, height
+
+        key = ("paragraph_lines", self.text, self._style_key, availWidth)
+        self._wrapWidths, self.blPara, self.width, self.height = self._layout_cache.get_or_compute(key, compute)
+        return self.width, self.height
+
 def normalize_column_name(name):
     """Normalize column name for comparison (remove spaces, underscores, lowercase)"""
     return str(name).strip().lower().replace(' ', '').replace('_', '').replace('-', '')
@@ -194,6 +344,30 @@ class ExpectedFormatPDFGenerator:
     PDF Generator that creates PDFs exactly matching the Expected.pdf format
     """
     
+    # Bump whenever the rendered layout changes so unchanged-data skips are invalidated
+    TEMPLATE_VERSION = "1"
+    
+    # Minimum seconds between job-progress events during batch generation
+    PROGRESS_EVENT_INTERVAL = 0.5
+    
+    # Minimum seconds between progress summary log lines (per-employee logs are DEBUG)
+    PROGRESS_LOG_INTERVAL = 10.0
+    
+    # Distinct column layouts whose header mapping is kept
+    COLUMN_MAPPING_CACHE_SIZE = 16
+    
+    # Run IDs currently executing in this process (shared by every generator instance)
+    _active_runs = set()
+    
+    # Batch run counter incremented for each per-employee outcome
+    OUTCOME_COUNTERS = {
+        "created": "new_files",
+        "regenerated": "regenerated",
+        "skipped": "skipped_unchanged",
+        "resumed": "resumed_completed",
+        "failed": "failed_generations",
+    }
+    
     def __init__(self):
         # Use settings for output directory (Azure-friendly)
         if USE_SETTINGS:
@@ -205,6 +379,13 @@ class ExpectedFormatPDFGenerator:
             self.output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "output")
         
         os.makedirs(self.output_dir, exist_ok=True)
+        self.storage = PDFStorage(
+            self.output_dir, settings.pdf_output_layout if USE_SETTINGS else "sharded"
+        )
+        self.pdf_index = PDFIndex(self.output_dir)
+        if self.pdf_index.is_new:
+            self.pdf_index.rebuild(self.storage)
+        self.run_store = RunStore(self.output_dir)
         
         # Page setup for landscape A4 (exactly like Expected.pdf)
         self.page_width, self.page_height = landscape(A4)
@@ -253,47 +434,116 @@ class ExpectedFormatPDFGenerator:
         self.black = colors.black
         self.light_gray = colors.Color(0.98, 0.98, 0.98)  # Very light gray for alternating rows
         
+        # Rendering engine: "platypus" builds a Table flowable, "canvas" draws rows directly
+        self.render_engine = settings.pdf_render_engine if USE_SETTINGS else "platypus"
+        # Wrapped-text layouts are shared across employees (project names, DU heads, ...)
+        self.text_layout_cache = TextLayoutCache(settings.text_layout_cache_size if USE_SETTINGS else 10000)
+        self.canvas_renderer = CanvasTableRenderer(self, self.text_layout_cache)
+        metrics.track_layout_cache(self.text_layout_cache)
+        
+        # Skip re-rendering employees whose rows are unchanged since the last run
+        self.skip_unchanged = settings.pdf_skip_unchanged if USE_SETTINGS else True
+        
+        # Employees with at least this many rows use pre-split page-sized table blocks
+        self.long_table_threshold = settings.long_table_threshold if USE_SETTINGS else 500
+        
+        # Header -> column mappings keyed by column layout (see build_column_mapping)
+        self._column_mappings = {}
+        
+        # Output profile (compression, invariance, stream filters, logo encoding)
+        self._logo = None
+        self.set_output_profile(settings.pdf_output_profile if USE_SETTINGS else "archival")
+        
         logger.info("✅ Expected Format PDF Generator initialized")
         logger.info(f"📄 Page size: {self.page_width:.1f} x {self.page_height:.1f} points (Landscape A4)")
         logger.info(f"📏 Total column width: {sum(self.column_widths):.1f} points")
+        logger.info(f"🖨️ Render engine: {self.render_engine}")
+        logger.info(f"🗜️ Output profile: {self.output_profile}")
+    
+    def set_output_profile(self, name):
+        """
+        Select one of OUTPUT_PROFILES for subsequent renders
+        
+        Args:
+            name: Profile name ("fast", "compact" or "archival")
+        """
+        if name not in OUTPUT_PROFILES:
+            raise ValueError(f"Unknown output profile '{name}' (expected one of: {', '.join(OUTPUT_PROFILES)})")
+        self.output_profile = name
+        self.profile_options = OUTPUT_PROFILES[name]
+        self._logo = None  # Re-load with this profile's encoding
+    
+    def canvas_options(self):
+        """Canvas/SimpleDocTemplate keyword arguments for the active output profile"""
+        return {
+            "pageCompression": 1 if self.profile_options["page_compression"] else 0,
+        }
+    
+    def stream_encoding(self):
+        """Context applying this profile's ASCII85 setting while a document is drawn and saved"""
+        return ascii85_switch.applied(self.profile_options["ascii85"])
+    
+    def get_logo(self):
+        """
+        Load logo.png once, encoded for the active output profile
+        
+        Returns:
+            ImageReader for the logo, or None if no logo file is found
+        """
+        if self._logo is not None:
+            return self._logo or None
+        
+        # Try multiple locations for logo (root, public, current directory)
+        logo_paths = [
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), "logo.png"),  # Root directory
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), "public", "logo.png"),  # Public directory
+            "logo.png",  # Current directory
+        ]
+        logo_path = next((path for path in logo_paths if os.path.exists(path)), None)
+        if logo_path is None:
+            logger.warning("⚠️ logo.png not found in root directory")
+            self._logo = False
+            return None
+        
+        try:
+            if self.profile_options["logo"] == "jpeg":
+                from PIL import Image as PILImage
+                with PILImage.open(logo_path) as source:
+                    # Same colours ReportLab embeds for the PNG (alpha dropped)
+                    image = source.convert("RGB")
+                image.thumbnail(LOGO_MAX_PIXELS)
+                buffer = io.BytesIO()
+                image.save(buffer, format="JPEG", quality=LOGO_JPEG_QUALITY, optimize=True)
+                buffer.seek(0)
+                self._logo = ImageReader(buffer)
+            else:
+                self._logo = ImageReader(logo_path)
+            logger.info(f"✅ Logo loaded successfully from {logo_path}")
+        except Exception as logo_error:
+            logger.warning(f"⚠️ Could not load logo.png: {logo_error}")
+            self._logo = False
+        return self._logo or None
     
-    def create_header_and_logo(self, canvas, doc, employee_name="", emp_id=""):
+    def create_header_and_logo(self, canvas, doc, employee_name="", emp_id="", show_employee=False):
         """
         Create header with title, timestamp, and logo in top-left corner
+        When show_employee is set (combined reports) the employee is named below the timestamp
         """
         try:
             # Logo in top-left corner - use logo.png from root directory
             logo_x = self.margin - 10  # Move further left
             logo_y = self.page_height - 70  # Move down slightly to avoid overlap
             
-            # Try to load and display the logo.png file
-            # Try multiple locations for logo (root, public, current directory)
-            logo_paths = [
-                os.path.join(os.path.dirname(os.path.dirname(__file__)), "logo.png"),  # Root directory
-                os.path.join(os.path.dirname(os.path.dirname(__file__)), "public", "logo.png"),  # Public directory
-                "logo.png",  # Current directory
-            ]
-            
-            logo_path = None
-            for path in logo_paths:
-                if os.path.exists(path):
-                    logo_path = path
-                    break
-            
-            if logo_path and os.path.exists(logo_path):
+            # Display the logo.png file (loaded once per output profile)
+            logo = self.get_logo()
+            if logo is not None:
                 try:
-                    # Load and display the logo image
-                    from reportlab.lib.utils import ImageReader
-                    logo = ImageReader(logo_path)
                     # Smaller logo dimensions to avoid overlap
                     logo_width = 120  # Reduced from 169
                     logo_height = 55  # Reduced from 75
                     canvas.drawImage(logo, logo_x, logo_y, width=logo_width, height=logo_height)
-                    logger.info("✅ Logo loaded successfully from logo.png")
                 except Exception as logo_error:
-                    logger.warning(f"⚠️ Could not load logo.png: {logo_error}")
-            else:
-                logger.warning("⚠️ logo.png not found in root directory")
+                    logger.warning(f"⚠️ Could not draw logo.png: {logo_error}")
             
             # Report title (centered) - Black Bold Arial 9.5
             title_y = self.page_height - 35
@@ -314,6 +564,13 @@ class ExpectedFormatPDFGenerator:
             timestamp_x = (self.page_width - timestamp_width) / 2
             canvas.drawString(timestamp_x, title_y - 8, timestamp)
             
+            # Employee line (centered below timestamp) - Black Bold Arial 6
+            if show_employee:
+                employee_line = f"{employee_name} ({emp_id})" if emp_id else employee_name
+                canvas.setFont("Helvetica-Bold", 6)
+                employee_width = canvas.stringWidth(employee_line, "Helvetica-Bold", 6)
+                canvas.drawString((self.page_width - employee_width) / 2, title_y - 18, employee_line)
+            
         except Exception as e:
             logger.error(f"❌ Error creating header: {e}")
     
@@ -322,19 +579,7 @@ class ExpectedFormatPDFGenerator:
         """
         Return the 26 column headers exactly as in Expected.pdf with text wrapping
         """
-        headers = [
-            "Date", "Month", "User Name", "EMP ID", "Email", "Resource Category",
-            "User Resource Type", "DU Head", "DU", "PU", "BU", "SBU",
-            "Project", "Project Code", "Project Manager", "Project Practice Owner",
-            "Project Contract Type", "Project Type", "Project Billability Type",
-            "Task", "Task Category", "Task Billability", "Tasks Payability", "Regular Time (Hours)",
-            "Timesheet Status", "Input Type Code"
-        ]
-        
         # Convert headers to Paragraphs for text wrapping
-        from reportlab.lib.styles import getSampleStyleSheet
-        from reportlab.platypus import Paragraph
-        from reportlab.lib import colors
         styles = getSampleStyleSheet()
         header_style = styles['Normal']
         header_style.fontSize = 3.5
@@ -343,142 +588,231 @@ class ExpectedFormatPDFGenerator:
         header_style.alignment = 1  # Center alignment
         header_style.textColor = colors.white  # Set header text color to white
         
-        return [Paragraph(header, header_style) for header in headers]
+        return [CachedParagraph(header, header_style, self.text_layout_cache) for header in TABLE_HEADERS]
+    
+    def get_cell_style(self):
+        """
+        Return the paragraph style used for wrapped (long) data cells
+        """
+        styles = getSampleStyleSheet()
+        normal_style = styles['Normal']
+        normal_style.fontSize = 3.5
+        normal_style.fontName = 'Helvetica'
+        normal_style.leading = 4
+        return normal_style
+    
+    def build_column_mapping(self, df_columns):
+        """
+        Map each of the 26 Expected.pdf headers to a column of the DataFrame
+        The mapping depends only on the column labels, so it is computed (and
+        logged) once per column layout and reused for every employee
+        
+        Returns:
+            dict of header -> actual DataFrame column (unmapped headers are omitted)
+        """
+        df_columns = list(df_columns)
+        layout_key = tuple(df_columns)
+        cached = self._column_mappings.get(layout_key)
+        if cached is not None:
+            return dict(cached)
+        col_mapping = {}
+        
+        # Build mapping with multiple matching strategies
+        for header in TABLE_HEADERS:
+            found = False
+            header_normalized = normalize_column_name(header)
+            
+            # Strategy 1: Exact match
+            if header in df_columns:
+                col_mapping[header] = header
+                found = True
+            # Strategy 2: Exact match after stripping whitespace
+            else:
+                for df_col in df_columns:
+                    if str(df_col).strip() == header:
+                        col_mapping[header] = df_col
+                        found = True
+                        break
+            # Strategy 3: Normalized match (handles spaces, underscores, case variations)
+            # e.g., "User Name" matches "User_Name", "USER NAME", "UserName", etc.
+            if not found:
+                for df_col in df_columns:
+                    df_col_normalized = normalize_column_name(df_col)
+                    if df_col_normalized == header_normalized:
+                        col_mapping[header] = df_col
+                        found = True
+                        break
+            # Strategy 4: Partial match (if column contains header keywords)
+            # e.g., "Project Billability Type" matches "Billability", "Project_Billability", etc.
+            if not found:
+                header_keywords = set(header.lower().split())
+                for df_col in df_columns:
+                    df_col_str = str(df_col).strip()
+                    df_col_keywords = set(df_col_str.lower().split())
+                    # If 80% of keywords match, consider it a match
+                    if len(header_keywords) > 0:
+                        match_ratio = len(header_keywords & df_col_keywords) / len(header_keywords)
+                        if match_ratio >= 0.8:
+                            col_mapping[header] = df_col
+                            found = True
+                            logger.info(f"✅ Fuzzy match found: '{header}' -> '{df_col}' (match ratio: {match_ratio:.0%})")
+                            break
+            
+            # Log if column not found (will use empty string in PDF)
+            if not found:
+                logger.warning(f"⚠️ No column mapping found for header: '{header}' - will use empty value in PDF")
+        
+        # Log column mapping summary
+        mapped_count = len(col_mapping)
+        total_headers = len(TABLE_HEADERS)
+        unmapped_count = total_headers - mapped_count
+        logger.debug(f"📊 Available columns: {df_columns}")
+        logger.debug(f"📊 Column mapping: {col_mapping}")
+        logger.info(f"📊 Column mapping summary: {mapped_count}/{total_headers} columns mapped successfully")
+        if unmapped_count > 0:
+            unmapped_headers = [h for h in TABLE_HEADERS if h not in col_mapping]
+            logger.info(f"⚠️ Unmapped columns ({unmapped_count}) - will appear empty in PDF: {', '.join(unmapped_headers[:5])}{'...' if unmapped_count > 5 else ''}")
+        
+        if len(self._column_mappings) >= self.COLUMN_MAPPING_CACHE_SIZE:
+            self._column_mappings.clear()
+        self._column_mappings[layout_key] = col_mapping
+        return dict(col_mapping)
+    
+    @staticmethod
+    def _format_cell(value, is_hours):
+        """Format a single cell value (row-wise fallback for mixed object columns)"""
+        if pd.isna(value):
+            return ""
+        if isinstance(value, (int, float)) and is_hours:
+            return str(int(value))
+        return str(value)
+    
+    def _truncate_hours(self, values, missing):
+        """Render float hours as truncated int strings, as int() did row by row"""
+        if np.all(np.abs(values[~missing]) < 2 ** 63):
+            return np.trunc(np.where(missing, 0, values)).astype('int64').astype(str)
+        # inf / out-of-range hours: let int() raise exactly as before
+        return [self._format_cell(value, True) for value in values.tolist()]
+    
+    def _format_column(self, column, is_hours, row_dtype=None):
+        """
+        Format one mapped column into display strings in a single columnar pass.
+        
+        Mirrors the per-cell rules used for table rows: missing values become "",
+        Regular Time (Hours) numbers are truncated to an int string and everything
+        else is rendered with str(). Row-wise access handed out numpy scalars of
+        the common dtype for all-numeric frames and Python objects otherwise;
+        only Python ints and floats (bool included) got the numeric treatment,
+        so each branch reproduces the value type rows used to see.
+        
+        Args:
+            column: Series holding the mapped column
+            is_hours: True for the "Regular Time (Hours)" column
+            row_dtype: Common numpy dtype of an all-numeric frame, if any
+        
+        Returns:
+            List of strings, one per row
+        """
+        if row_dtype is not None:
+            values = column.to_numpy(dtype=row_dtype)
+            missing = pd.isna(values)
+            if is_hours and row_dtype == np.float64:
+                # np.float64 subclasses float, so its hours were truncated
+                formatted = self._truncate_hours(values, missing)
+            else:
+                # float32, integer and bool numpy scalars went through str()
+                formatted = values.astype(str)
+        else:
+            dtype = column.dtype
+            missing = column.isna().to_numpy()
+            if dtype == bool:
+                values = column.to_numpy()
+                formatted = np.where(values, "1", "0") if is_hours else np.where(values, "True", "False")
+            elif isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+                formatted = column.to_numpy().astype(str)
+            elif isinstance(dtype, np.dtype) and dtype.kind == 'f':
+                # Interleaving to object turned every float width into a Python float
+                values = column.to_numpy().astype(np.float64)
+                formatted = self._truncate_hours(values, missing) if is_hours else values.astype(str)
+            elif (
+                pd.api.types.is_datetime64_dtype(dtype)
+                and (column.dt.microsecond[~missing] == 0).all()
+                and (column.dt.nanosecond[~missing] == 0).all()
+            ):
+                formatted = column.dt.strftime('%Y-%m-%d %H:%M:%S').to_numpy(dtype=object)
+            else:
+                formatted = [self._format_cell(value, is_hours) for value in column.to_numpy(dtype=object)]
+        
+        formatted = np.array(formatted, dtype=object)
+        formatted[missing] = ""
+        return [str(value) for value in formatted.tolist()]
+    
+    def build_table_rows(self, employee_data, col_mapping=None):
+        """
+        Build the formatted string rows (without header) for an employee's data.
+        
+        Each mapped column is projected and formatted once as a whole column;
+        rows are then assembled by zipping the formatted columns together.
+        
+        Args:
+            employee_data: DataFrame with the employee's timesheet rows
+            col_mapping: Optional precomputed header -> column mapping
+        
+        Returns:
+            List of rows, each a list of 26 strings
+        """
+        if col_mapping is None:
+            col_mapping = self.build_column_mapping(employee_data.columns)
+        
+        # Row-wise access used to interleave all columns to one dtype; keep that
+        # behaviour for all-numeric (or all-bool) frames so the rendered values don't change
+        row_dtype = None
+        dtypes = list(employee_data.dtypes)
+        if dtypes and all(isinstance(d, np.dtype) for d in dtypes):
+            kinds = {d.kind for d in dtypes}
+            if kinds <= set('iuf'):
+                row_dtype = np.result_type(*dtypes)
+            elif kinds == {'b'}:
+                row_dtype = np.dtype(bool)
+        
+        row_count = len(employee_data)
+        columns = []
+        for header in TABLE_HEADERS:
+            if header in col_mapping:
+                columns.append(self._format_column(
+                    employee_data[col_mapping[header]],
+                    header == "Regular Time (Hours)",
+                    row_dtype
+                ))
+            else:
+                # Column not found - use empty string (graceful handling)
+                # This allows PDF generation to continue even if some columns are missing
+                columns.append([""] * row_count)
+        
+        return [list(row) for row in zip(*columns)]
     
     def create_table_data(self, employee_data):
         """
         Convert employee DataFrame to table data format
         """
         try:
-            logger.info(f"📊 Creating table data for {len(employee_data)} rows")
-            logger.info(f"📊 Available columns: {list(employee_data.columns)}")
-            
-            # Get string headers for mapping (not Paragraph objects)
-            string_headers = [
-                "Date", "Month", "User Name", "EMP ID", "Email", "Resource Category",
-                "User Resource Type", "DU Head", "DU", "PU", "BU", "SBU",
-                "Project", "Project Code", "Project Manager", "Project Practice Owner",
-                "Project Contract Type", "Project Type", "Project Billability Type",
-                "Task", "Task Category", "Task Billability", "Tasks Payability", "Regular Time (Hours)",
-                "Timesheet Status", "Input Type Code"
-            ]
-            
-            # Get Paragraph headers for table data
-            headers = self.get_table_headers()
-            table_data = [headers]
+            logger.debug(f"📊 Creating table data for {len(employee_data)} rows")
             
             # Create column mapping dictionary - enhanced dynamic approach
-            col_mapping = {}
-            df_columns = list(employee_data.columns)
-            
-            # Helper function for fuzzy column matching
-            def normalize_column_name(name):
-                """Normalize column name for comparison (remove spaces, underscores, lowercase)"""
-                return str(name).strip().lower().replace(' ', '').replace('_', '').replace('-', '')
-            
-            # Build mapping with multiple matching strategies
-            for header in string_headers:
-                found = False
-                header_normalized = normalize_column_name(header)
-                
-                # Strategy 1: Exact match
-                if header in df_columns:
-                    col_mapping[header] = header
-                    found = True
-                # Strategy 2: Case-insensitive exact match
-                elif not found:
-                    for df_col in df_columns:
-                        if str(df_col).strip() == header:
-                            col_mapping[header] = df_col
-                            found = True
-                            break
-                # Strategy 3: Case-insensitive match
-                elif not found:
-                    for df_col in df_columns:
-                        df_col_str = str(df_col).strip()
-                        if df_col_str.lower() == header.lower():
-                            col_mapping[header] = df_col
-                            found = True
-                            break
-                # Strategy 4: Normalized match (handles spaces, underscores, case variations)
-                # e.g., "User Name" matches "User_Name", "USER NAME", "UserName", etc.
-                if not found:
-                    for df_col in df_columns:
-                        df_col_normalized = normalize_column_name(df_col)
-                        if df_col_normalized == header_normalized:
-                            col_mapping[header] = df_col
-                            found = True
-                            break
-                # Strategy 5: Partial match (if column contains header keywords)
-                # e.g., "Project Billability Type" matches "Billability", "Project_Billability", etc.
-                if not found:
-                    header_keywords = set(header.lower().split())
-                    for df_col in df_columns:
-                        df_col_str = str(df_col).strip()
-                        df_col_keywords = set(df_col_str.lower().split())
-                        # If 80% of keywords match, consider it a match
-                        if len(header_keywords) > 0:
-                            match_ratio = len(header_keywords & df_col_keywords) / len(header_keywords)
-                            if match_ratio >= 0.8:
-                                col_mapping[header] = df_col
-                                found = True
-                                logger.info(f"✅ Fuzzy match found: '{header}' -> '{df_col}' (match ratio: {match_ratio:.0%})")
-                                break
-                
-                # Log if column not found (will use empty string in PDF)
-                if not found:
-                    logger.warning(f"⚠️ No column mapping found for header: '{header}' - will use empty value in PDF")
-            
-            logger.info(f"📊 Column mapping: {col_mapping}")
-            
-            # Data rows
-            for _, row in employee_data.iterrows():
-                row_data = []
-                for header in string_headers:  # Use string headers for mapping
-                    if header in col_mapping:
-                        actual_col = col_mapping[header]
-                        value = row.get(actual_col, "")
-                        
-                        # Handle different data types
-                        if pd.isna(value):
-                            value = ""
-                        elif isinstance(value, (int, float)):
-                            if header == "Regular Time (Hours)":
-                                value = str(int(value)) if not pd.isna(value) else ""
-                            else:
-                                value = str(value)
-                        else:
-                            value = str(value)
-                        
-                        # Enable text wrapping by using Paragraph for long text
-                        if len(str(value)) > 15:  # Use Paragraph for longer text
-                            from reportlab.lib.styles import getSampleStyleSheet
-                            from reportlab.platypus import Paragraph
-                            styles = getSampleStyleSheet()
-                            normal_style = styles['Normal']
-                            normal_style.fontSize = 3.5
-                            normal_style.fontName = 'Helvetica'
-                            normal_style.leading = 4
-                            value = Paragraph(str(value), normal_style)
-                        
-                        row_data.append(value)
-                    else:
-                        # Column not found - use empty string (graceful handling)
-                        # This allows PDF generation to continue even if some columns are missing
-                        row_data.append("")
-                
-                table_data.append(row_data)
-            
-            # Log column mapping summary
-            mapped_count = len(col_mapping)
-            total_headers = len(string_headers)
-            unmapped_count = total_headers - mapped_count
-            logger.info(f"📊 Column mapping summary: {mapped_count}/{total_headers} columns mapped successfully")
-            if unmapped_count > 0:
-                unmapped_headers = [h for h in string_headers if h not in col_mapping]
-                logger.info(f"⚠️ Unmapped columns ({unmapped_count}) - will appear empty in PDF: {', '.join(unmapped_headers[:5])}{'...' if unmapped_count > 5 else ''}")
-            
-            logger.info(f"✅ Created table data with {len(table_data)} rows (including header)")
+            col_mapping = self.build_column_mapping(employee_data.columns)
+            
+            rows = self.build_table_rows(employee_data, col_mapping)
+            
+            # Enable text wrapping by using Paragraph for long text
+            normal_style = self.get_cell_style()
+            table_data = [self.get_table_headers()]
+            for row in rows:
+                table_data.append([
+                    CachedParagraph(value, normal_style, self.text_layout_cache) if len(value) > 15 else value
+                    for value in row
+                ])
+            
+            logger.debug(f"✅ Created table data with {len(table_data)} rows (including header)")
             return table_data
             
         except Exception as e:
@@ -528,30 +862,70 @@ class ExpectedFormatPDFGenerator:
             ('WORDWRAP', (0, 0), (-1, -1), 'CJK'),  # Enable text wrapping for all cells
         ])
     
-    def generate_single_pdf(self, employee_data, user_name, emp_id):
+    def get_pdf_filename(self, user_name):
+        """Create filename using just the User Name exactly as it appears"""
+        return f"{user_name}.pdf"
+    
+    def compute_content_hash(self, employee_data):
+        """
+        Compute a stable hash of an employee's rows together with the template version
+        
+        Returns:
+            Hex digest string, or None if the rows cannot be hashed
+        """
+        try:
+            row_hashes = pd.util.hash_pandas_object(employee_data, index=False)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not hash employee rows, PDF will be regenerated: {e}")
+            return None
+        
+        digest = hashlib.sha256()
+        digest.update(f"{self.TEMPLATE_VERSION}|{self.render_engine}|{self.output_profile}|".encode("utf-8"))
+        digest.update("\x1f".join(str(col) for col in employee_data.columns).encode("utf-8"))
+        digest.update(row_hashes.to_numpy().tobytes())
+        return digest.hexdigest()
+    
+    def generate_single_pdf(self, employee_data, user_name, emp_id, in_memory=False,
+                            run_id=None, content_hash=None):
         """
         Generate PDF for a single employee exactly matching Expected.pdf format
+        
+        Args:
+            employee_data: DataFrame with the employee's rows
+            user_name: Employee name
+            emp_id: Employee ID
+            in_memory: Render into memory and return the bytes as "content"
+                instead of writing to the output directory
+            run_id: Generation run recorded in the PDF index
+            content_hash: Row hash recorded in the PDF index (computed if omitted)
         """
         try:
-            logger.info(f"🎯 Generating Expected Format PDF for {user_name} ({emp_id})")
-            
-            # Create filename using just the User Name exactly as it appears
-            filename = f"{user_name}.pdf"
-            output_path = os.path.join(self.output_dir, filename)
-            
-            # Create PDF document with exact margins
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=landscape(A4),
-                leftMargin=self.margin,
-                rightMargin=self.margin,
-                topMargin=self.margin + 50,  # Increased space to avoid logo overlap
-                bottomMargin=self.margin
-            )
+            logger.debug(f"🎯 Generating Expected Format PDF for {user_name} ({emp_id})")
             
-            # Create table data
-            table_data = self.create_table_data(employee_data)
-            if not table_data:
+            filename = self.get_pdf_filename(user_name)
+            output_path = self.storage.path_for(filename)
+            
+            # Render with the configured engine, into memory or atomically onto disk
+            mode = "memory" if in_memory else "file"
+            write_started = None
+            if in_memory:
+                output = io.BytesIO()
+                rendered = self.render_pdf(output, employee_data, user_name, emp_id)
+            else:
+                rendered = None
+                try:
+                    with self.storage.atomic_write(filename) as temp_path:
+                        rendered = self.render_pdf(temp_path, employee_data, user_name, emp_id)
+                        if not rendered:
+                            raise ValueError("No table data created")
+                        write_started = time.perf_counter()
+                except ValueError:
+                    # Only swallow the no-data abort; real render errors propagate
+                    if rendered is not False:
+                        raise
+            
+            if not rendered:
+                metrics.pdfs_failed.inc(mode=mode)
                 logger.error(f"❌ No table data created for {user_name}")
                 return {
                     "success": False,
@@ -559,24 +933,38 @@ class ExpectedFormatPDFGenerator:
                     "message": f"Failed to create table data for {user_name}"
                 }
             
-            # Create table with exact column widths
-            table = Table(table_data, colWidths=self.column_widths, repeatRows=1)
-            table.setStyle(self.create_table_style())
-            
-            # Build PDF with custom header
-            def on_first_page(canvas, doc):
-                self.create_header_and_logo(canvas, doc, user_name, emp_id)
-            
-            def on_later_pages(canvas, doc):
-                self.create_header_and_logo(canvas, doc, user_name, emp_id)
-            
-            # Build the document
-            doc.build([table], onFirstPage=on_first_page, onLaterPages=on_later_pages)
+            if in_memory:
+                content = output.getvalue()
+                metrics.pdfs_generated.inc(mode=mode)
+                logger.info(f"✅ PDF rendered in memory for {user_name} ({len(content):,} bytes)")
+                return {
+                    "success": True,
+                    "file_path": None,
+                    "filename": filename,
+                    "user_name": user_name,
+                    "emp_id": emp_id,
+                    "file_size": len(content),
+                    "content": content,
+                    "message": f"Expected Format PDF generated successfully for {user_name}"
+                }
             
             # Verify file was created
             if os.path.exists(output_path):
                 file_size = os.path.getsize(output_path)
-                logger.info(f"✅ PDF created successfully: {output_path} ({file_size:,} bytes)")
+                if content_hash is None:
+                    content_hash = self.compute_content_hash(employee_data)
+                self.pdf_index.record(
+                    filename, output_path, file_size, user_name=user_name, emp_id=emp_id,
+                    run_id=run_id, content_hash=content_hash
+                )
+                observe_stage("write", time.perf_counter() - write_started)
+                metrics.pdfs_generated.inc(mode=mode)
+                metrics.pdf_bytes_written.inc(file_size)
+                event_bus.publish(PDF_CREATED, {
+                    "filename": filename, "user_name": user_name, "emp_id": emp_id,
+                    "file_size": file_size, "run_id": run_id
+                })
+                logger.debug(f"✅ PDF created successfully: {output_path} ({file_size:,} bytes)")
                 return {
                     "success": True,
                     "file_path": output_path,
@@ -588,17 +976,494 @@ class ExpectedFormatPDFGenerator:
                 }
             else:
                 logger.error(f"❌ PDF file not found after creation: {output_path}")
+                metrics.pdfs_failed.inc(mode=mode)
                 return {"success": False, "error": "PDF file not created"}
                 
         except Exception as e:
             logger.error(f"❌ Error generating Expected Format PDF for {user_name}: {e}")
+            metrics.pdfs_failed.inc(mode="memory" if in_memory else "file")
+            return {"success": False, "error": str(e)}
+    
+    def save_pdf_bytes(self, filename, content, user_name="", emp_id=""):
+        """
+        Persist an in-memory PDF to the output directory
+        
+        Args:
+            filename: PDF filename (as returned by get_pdf_filename)
+            content: Rendered PDF bytes
+            user_name: Employee name recorded in the PDF index
+            emp_id: Employee ID recorded in the PDF index
+        
+        Returns:
+            Path of the written file
+        """
+        with stage_timer("write"):
+            output_path = self.storage.write_bytes(filename, content)
+            self.pdf_index.record(filename, output_path, len(content), user_name=user_name, emp_id=emp_id)
+        metrics.pdf_bytes_written.inc(len(content))
+        event_bus.publish(PDF_CREATED, {
+            "filename": filename, "user_name": user_name, "emp_id": emp_id, "file_size": len(content)
+        })
+        logger.info(f"✅ PDF saved: {output_path} ({len(content):,} bytes)")
+        return output_path
+    
+    def prime_font_metrics(self):
+        """Load the width tables of the fonts used in headers and cells"""
+        for font_name in (BODY_FONT, HEADER_FONT):
+            pdfmetrics.stringWidth(" ".join(TABLE_HEADERS), font_name, 6)
+    
+    def render_warm_up_pdf(self, employee_data=None, user_name="Warm-up, Sample", emp_id="WARMUP"):
+        """
+        Render one PDF into memory and discard it, so the first real request
+        finds ReportLab's lazy state, the layout cache and column mapping ready
+        
+        Args:
+            employee_data: Rows to render (a one-row placeholder if None)
+        
+        Returns:
+            Size of the discarded PDF in bytes
+        """
+        if employee_data is None:
+            employee_data = pd.DataFrame([{header: header for header in TABLE_HEADERS}])
+        output = io.BytesIO()
+        self.render_pdf(output, employee_data, user_name, emp_id)
+        return len(output.getvalue())
+    
+    def render_pdf(self, output, employee_data, user_name, emp_id):
+        """
+        Render an employee's PDF with the configured engine
+        
+        Returns:
+            True if the document was built, False if no table data could be created
+        """
+        if self.render_engine == "canvas":
+            self.build_canvas_pdf(output, employee_data, user_name, emp_id)
+            return True
+        return self.build_platypus_pdf(output, employee_data, user_name, emp_id)
+    
+    def build_platypus_pdf(self, output, employee_data, user_name, emp_id):
+        """
+        Render an employee's PDF as a platypus Table flowable
+        
+        Args:
+            output: File path or binary file-like object to write to
+            employee_data: DataFrame with the employee's rows
+            user_name: Employee name for the page header
+            emp_id: Employee ID for the page header
+        
+        Returns:
+            True if the document was built, False if no table data could be created
+        """
+        # Create PDF document with exact margins
+        doc = SimpleDocTemplate(
+            output,
+            pagesize=landscape(A4),
+            leftMargin=self.margin,
+            rightMargin=self.margin,
+            topMargin=self.margin + 50,  # Increased space to avoid logo overlap
+            bottomMargin=self.margin,
+            **self.canvas_options()
+        )
+        
+        with stage_timer("table_build"):
+            if len(employee_data) >= self.long_table_threshold:
+                # Pre-split very long employees into page-sized table blocks
+                story = self.create_long_table_story(employee_data)
+            else:
+                # Create table data
+                table_data = self.create_table_data(employee_data)
+                
+                # Create table with exact column widths
+                table = Table(table_data, colWidths=self.column_widths, repeatRows=1) if table_data else None
+                if table is not None:
+                    table.setStyle(self.create_table_style())
+                story = [table] if table is not None else []
+        
+        if not story:
+            return False
+        
+        # Build PDF with custom header
+        def on_first_page(canvas, doc):
+            self.create_header_and_logo(canvas, doc, user_name, emp_id)
+        
+        def on_later_pages(canvas, doc):
+            self.create_header_and_logo(canvas, doc, user_name, emp_id)
+        
+        # Build the document
+        with stage_timer("render"), self.stream_encoding():
+            doc.build(story, onFirstPage=on_first_page, onLaterPages=on_later_pages)
+        return True
+    
+    def create_long_table_story(self, employee_data):
+        """
+        Build the platypus story for an employee with thousands of rows
+        
+        Rows are measured once through the shared text layout cache and
+        paginated up front, giving one table block per page separated by page
+        breaks. Platypus then never has to split a huge Table, so render time
+        grows linearly with the row count, and cell flowables only exist for
+        the page being drawn.
+        
+        Returns:
+            List of flowables, empty if no table data could be created
+        """
+        try:
+            rows = self.build_table_rows(employee_data)
+        except Exception as e:
+            logger.error(f"❌ Error creating table data: {e}")
+            return []
+        if not rows:
+            return []
+        
+        renderer = self.canvas_renderer
+        _, header_height = renderer.layout_row(TABLE_HEADERS, HEADER_FONT, wrap_all=True)
+        row_heights = [renderer.layout_row(row)[1] for row in rows]
+        pages = renderer.paginate(header_height, row_heights)
+        logger.debug(f"📊 Long-table mode: {len(rows)} rows in {len(pages)} page blocks")
+        
+        headers = self.get_table_headers()
+        cell_style = self.get_cell_style()
+        table_style = self.create_table_style()
+        
+        def block_builder(start, end):
+            def build_table():
+                block = [headers]
+                for row in rows[start:end]:
+                    block.append([
+                        CachedParagraph(value, cell_style, self.text_layout_cache) if len(value) > 15 else value
+                        for value in row
+                    ])
+                table = Table(block, colWidths=self.column_widths, repeatRows=1)
+                table.setStyle(table_style)
+                return table
+            return build_table
+        
+        story = []
+        for start, end in pages:
+            if story:
+                story.append(PageBreak())
+            story.append(LazyTableBlock(block_builder(start, end)))
+        return story
+    
+    def build_canvas_pdf(self, output, employee_data, user_name, emp_id):
+        """
+        Render an employee's PDF with the direct canvas engine
+        
+        Args:
+            output: File path or binary file-like object to write to
+            employee_data: DataFrame with the employee's rows
+            user_name: Employee name for the page header
+            emp_id: Employee ID for the page header
+        
+        Returns:
+            Number of pages written
+        """
+        with stage_timer("table_build"):
+            rows = self.build_table_rows(employee_data)
+        pdf_canvas = canvas.Canvas(output, pagesize=landscape(A4), **self.canvas_options())
+        
+        def on_page(page_canvas, page_number):
+            self.create_header_and_logo(page_canvas, None, user_name, emp_id)
+        
+        with stage_timer("render"), self.stream_encoding():
+            page_count = self.canvas_renderer.render(pdf_canvas, TABLE_HEADERS, rows, on_page)
+            pdf_canvas.save()
+        return page_count
+    
+    def _describe_filters(self, name_filter, emp_id_filter, billability_filter):
+        """Build the filter suffix used in generation messages"""
+        filter_parts = []
+        if name_filter:
+            filter_parts.append(f"name starting with '{name_filter}'")
+        if emp_id_filter:
+            filter_parts.append(f"EMP ID starting with '{emp_id_filter}'")
+        if billability_filter:
+            filter_parts.append(f"billability type '{billability_filter}'")
+        
+        # Check if this was a pre-filtered DataFrame (custom condition)
+        # If all standard filters are None the DataFrame was pre-filtered by a custom condition
+        if not name_filter and not emp_id_filter and not billability_filter:
+            # Likely custom condition was applied (standard filters are None)
+            # The filter message will be handled by main.py response
+            return " (custom condition applied)"
+        elif filter_parts:
+            return f" (filtered by {', '.join(filter_parts)})"
+        else:
+            return " (no filters applied - all employees included)"
+    
+    def generate_combined_pdf(self, employee_groups, filename=None):
+        """
+        Render several employees into one consolidated PDF in a single pass
+        
+        Each employee starts on a new page, gets an outline bookmark and a page
+        header naming them. Pages are drawn straight onto one canvas as each
+        employee is processed, so only the current employee's rows are held.
+        
+        Args:
+            employee_groups: Iterable of ((user_name, emp_id), employee_data)
+            filename: Output filename (defaults to a timestamped Combined_Timesheets name)
+        
+        Returns:
+            Result dictionary for the combined file
+        """
+        filename = filename or f"Combined_Timesheets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        output_path = self.storage.path_for(filename)
+        
+        try:
+            logger.info(f"🎯 Generating combined Expected Format PDF: {filename}")
+            with self.storage.atomic_write(filename) as temp_path, self.stream_encoding():
+                pdf_canvas = canvas.Canvas(temp_path, pagesize=landscape(A4), **self.canvas_options())
+                pdf_canvas.setTitle("Admin Timesheet Report")
+                
+                employees = []
+                page_count = 0
+                for index, ((user_name, emp_id), group) in enumerate(employee_groups):
+                    user_name, emp_id = str(user_name), str(emp_id)
+                    bookmark = f"employee-{index}"
+                    
+                    def on_page(page_canvas, page_number, user_name=user_name, emp_id=emp_id, bookmark=bookmark):
+                        if page_number == 1:
+                            page_canvas.bookmarkPage(bookmark)
+                            page_canvas.addOutlineEntry(f"{user_name} ({emp_id})", bookmark, level=0)
+                        self.create_header_and_logo(page_canvas, None, user_name, emp_id, show_employee=True)
+                    
+                    rows = self.build_table_rows(group)
+                    page_count += self.canvas_renderer.render(pdf_canvas, TABLE_HEADERS, rows, on_page)
+                    employees.append({"user_name": user_name, "emp_id": emp_id, "rows": len(rows)})
+                
+                pdf_canvas.showOutline()
+                pdf_canvas.save()
+            
+            file_size = os.path.getsize(output_path)
+            self.pdf_index.record(filename, output_path, file_size)
+            metrics.pdfs_generated.inc(mode="combined")
+            metrics.pdf_bytes_written.inc(file_size)
+            event_bus.publish(PDF_CREATED, {"filename": filename, "file_size": file_size, "combined": True})
+            logger.info(f"✅ Combined PDF created: {output_path} ({len(employees)} employees, {page_count} pages, {file_size:,} bytes)")
+            return {
+                "success": True,
+                "file_path": output_path,
+                "filename": filename,
+                "employees": employees,
+                "page_count": page_count,
+                "file_size": file_size,
+                "message": f"Combined Expected Format PDF generated for {len(employees)} employees"
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ Error generating combined Expected Format PDF: {e}")
+            metrics.pdfs_failed.inc(mode="combined")
             return {"success": False, "error": str(e)}
     
-    def generate_all_pdfs(self, df, name_filter=None, emp_id_filter=None, billability_filter=None):
+    def apply_standard_filters(self, df, name_col, id_col, name_filter=None, emp_id_filter=None,
+                               billability_filter=None):
+        """
+        Apply the name-letter, EMP ID prefix and billability filters
+        
+        Returns:
+            Tuple of (filtered DataFrame, error result dict or None when employees remain)
+        """
+        # Apply name filter if provided
+        if name_filter:
+            logger.info(f"🔍 Filtering employees by first letter after comma starting with '{name_filter}'")
+            # Filter data where the first letter after comma in name column starts with the specified letter
+            def extract_first_letter_after_comma(name):
+                if pd.isna(name):
+                    return ''
+                name_str = str(name).strip()
+                if ',' in name_str:
+                    # Get part after comma, strip spaces, get first letter
+                    after_comma = name_str.split(',', 1)[1].strip()
+                    return after_comma[0].upper() if after_comma else ''
+                return name_str[0].upper() if name_str else ''
+
+            mask_after_comma = df[name_col].apply(extract_first_letter_after_comma) == name_filter.upper()
+            filtered_df = df[mask_after_comma]
+            logger.info(f"🔍 After 'after comma' name filtering: {len(filtered_df)} rows")
+
+            # Fallback: if no rows, try first letter of whole name (previous behavior)
+            if filtered_df.empty:
+                logger.info("ℹ️ No matches using 'after comma' rule. Falling back to first letter of full name (legacy behavior).")
+                mask_first_letter = df[name_col].astype(str).str.strip().str.upper().str[0] == name_filter.upper()
+                filtered_df = df[mask_first_letter]
+                logger.info(f"🔍 After legacy first-letter filtering: {len(filtered_df)} rows")
+
+            # If still empty, return helpful message
+            if filtered_df.empty:
+                return df, {
+                    "success": False,
+                    "error": f"No employees found starting with '{name_filter}'",
+                    "message": f"No data available for employees starting with '{name_filter}' (after-comma and legacy modes)",
+                }
+
+            df = filtered_df
+        
+        # Apply EMP ID filter if provided
+        if emp_id_filter:
+            logger.info(f"🔍 Filtering employees by ID starting with '{emp_id_filter}'")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"🔍 Available columns: {list(df.columns)}")
+                logger.debug(f"🔍 Sample ID values: {df[id_col].head(10).tolist()}")
+            
+            # Filter data where ID starts with the specified text
+            mask = df[id_col].astype(str).str.upper().str.startswith(emp_id_filter.upper())
+            df = df[mask]
+            logger.info(f"🔍 After ID filtering: {len(df)} rows for IDs starting with '{emp_id_filter}'")
+            
+            if df.empty:
+                return df, {
+                    "success": False,
+                    "error": f"No employees found with ID starting with '{emp_id_filter}'",
+                    "message": f"No data available for employees whose ID starts with '{emp_id_filter}'"
+                }
+        
+        # Apply billability filter if provided
+        if billability_filter:
+            logger.info(f"🔍 Filtering employees by billability type: '{billability_filter}'")
+            logger.debug(f"🔍 Available columns: {list(df.columns)}")
+            
+            # Dynamically detect billability column
+            billability_column = detect_billability_column(df)
+            
+            if billability_column:
+                logger.info(f"🔍 Using billability column: '{billability_column}'")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"🔍 Sample {billability_column} values: {df[billability_column].head(10).tolist()}")
+                
+                # Filter data based on billability type
+                if billability_filter.lower() == 'billable':
+                    mask = df[billability_column].astype(str).str.lower().str.contains('billable', na=False)
+                elif billability_filter.lower() == 'non-billable':
+                    mask = df[billability_column].astype(str).str.lower().str.contains('non-billable', na=False)
+                else:
+                    logger.warning(f"⚠️ Unknown billability filter: {billability_filter}")
+                    mask = pd.Series([True] * len(df), index=df.index)
+                
+                df = df[mask]
+                logger.info(f"🔍 After billability filtering: {len(df)} rows for '{billability_filter}' billability type")
+                
+                if df.empty:
+                    return df, {
+                        "success": False,
+                        "error": f"No employees found with '{billability_filter}' billability type",
+                        "message": f"No data available for employees with '{billability_filter}' billability type"
+                    }
+            else:
+                logger.warning("⚠️ No billability column found in data. Available columns: " + ", ".join(df.columns))
+                # If no billability column exists, continue without filtering
+        
+        return df, None
+    
+    def _process_employee(self, run_id, user_name, emp_id, employee_data, skip_unchanged, completed_items):
+        """
+        Render, write and checkpoint one employee of a batch run
+        
+        Args:
+            run_id: Run the employee belongs to
+            user_name: Employee name
+            emp_id: Employee ID
+            employee_data: The employee's rows
+            skip_unchanged: Reuse the existing PDF when its content hash matches
+            completed_items: (user_name, emp_id) -> content hash already completed by this run
+            
+        Returns:
+            Outcome: "created", "regenerated", "skipped", "resumed" or "failed"
+        """
+        logger.debug(f"📊 Processing {user_name} ({emp_id}) - {len(employee_data)} rows")
+        
+        filename = self.get_pdf_filename(user_name)
+        output_path = self.storage.resolve(filename)
+        content_hash = self.compute_content_hash(employee_data)
+        file_exists = output_path is not None
+        
+        if file_exists and content_hash and completed_items.get((user_name, emp_id)) == content_hash:
+            # Finished by an earlier attempt of this run with the same rows; already checkpointed
+            return "resumed"
+        
+        error = None
+        file_size = None
+        if (skip_unchanged and file_exists and content_hash
+                and self.pdf_index.get_hash(filename) == content_hash):
+            try:
+                file_size = os.path.getsize(output_path)
+            except OSError:
+                # Removed since resolve() (e.g. by a concurrent delete) - render it again
+                logger.debug(f"🔍 Unchanged PDF for {user_name} ({emp_id}) disappeared; regenerating")
+                metrics.cache_misses.inc(cache="pdf_unchanged")
+                file_exists = False
+
+        if file_size is not None:
+            # Rows unchanged since the existing PDF was rendered - reuse it
+            logger.debug(f"⏭️ Skipping {user_name} ({emp_id}) - data unchanged")
+            outcome = "skipped"
+            metrics.cache_hits.inc(cache="pdf_unchanged")
+        else:
+            if skip_unchanged and file_exists:
+                metrics.cache_misses.inc(cache="pdf_unchanged")
+            result = self.generate_single_pdf(
+                employee_data, user_name, emp_id, run_id=run_id, content_hash=content_hash
+            )
+            if result.get("success"):
+                outcome = "regenerated" if file_exists else "created"
+                file_size = result.get("file_size", 0)
+            else:
+                outcome = "failed"
+                file_size = 0
+                error = result.get("error")
+        
+        # Checkpoint so a resumed run can skip this employee
+        self.run_store.record_item(
+            run_id, user_name, emp_id, filename, content_hash,
+            status=FAILED if outcome == "failed" else COMPLETED,
+            outcome=outcome, file_size=file_size, error=error
+        )
+        return outcome
+    
+    def _generated_files(self, run_id):
+        """Files of the first GENERATED_FILES_LIMIT completed employees of a run, in processing order"""
+        items, _ = self.run_store.list_items(run_id, status=COMPLETED, limit=GENERATED_FILES_LIMIT)
+        return [{
+            "filename": item["filename"],
+            "file_path": self.storage.path_for(item["filename"]),
+            "user_name": item["user_name"],
+            "emp_id": item["emp_id"],
+            "file_size": item["file_size"] or 0
+        } for item in items]
+    
+    @staticmethod
+    def _log_progress(processed, total, counters, elapsed):
+        """Periodic run summary logged in place of per-employee INFO lines"""
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"📊 Progress: {processed}/{total} employees ({rate:.1f}/s) - "
+            f"{counters['new_files']} new, {counters['regenerated']} regenerated, "
+            f"{counters['skipped_unchanged']} unchanged, {counters['resumed_completed']} resumed, "
+            f"{counters['failed_generations']} failed",
+            extra={"processed": processed, "total": total, "elapsed_seconds": round(elapsed, 2), **counters}
+        )
+    
+    def _run_lock(self, run_id):
+        """Lock file held while a run executes (visible to every worker process)"""
+        return FileLock(os.path.join(self.output_dir, RUN_LOCK_DIR, f"{run_id}.lock"))
+    
+    def is_run_active(self, run_id):
+        """Whether a generation run is currently executing in this or another worker process"""
+        return run_id in self._active_runs or self._run_lock(run_id).is_held()
+    
+    def generate_all_pdfs(self, df, name_filter=None, emp_id_filter=None, billability_filter=None,
+                          force_regenerate=False, single_document=False, resume_run_id=None,
+                          snapshot_hash=None, run_inputs=None, snapshot_version=None):
         """
         Generate PDFs for all employees using Expected.pdf format
         Supports filtering by name starting with specific letter, EMP ID starting with specific text, and billability type
+        Employees whose rows hash the same as the existing PDF are skipped unless force_regenerate is set
+        With single_document, all selected employees are rendered into one combined PDF instead
+        Per-employee runs are checkpointed in the run store (with snapshot_version, snapshot_hash and run_inputs);
+        resume_run_id continues such a run, skipping employees it already completed with the same rows
         """
+        run_id = None
+        log_token = None
+        run_lock = run_lock_fd = None
         try:
             logger.info("🎯 Generating Expected Format PDFs for all employees")
             logger.info(f"🔍 Received filters - name_filter: {name_filter}, emp_id_filter: {emp_id_filter}, billability_filter: {billability_filter}")
@@ -623,7 +1488,8 @@ class ExpectedFormatPDFGenerator:
                 logger.info(f"📊 Using provided DataFrame with {len(df)} rows (custom condition already applied)")
             
             # Dynamically detect employee identifier columns
-            employee_cols = detect_employee_identifier_columns(df)
+            with stage_timer("detect_columns"):
+                employee_cols = detect_employee_identifier_columns(df)
             name_col = employee_cols['name_column']
             id_col = employee_cols['id_column']
             
@@ -640,163 +1506,172 @@ class ExpectedFormatPDFGenerator:
             
             logger.info(f"✅ Detected employee columns - Name: '{name_col}', ID: '{id_col}'")
             
-            # Apply name filter if provided
-            if name_filter:
-                logger.info(f"🔍 Filtering employees by first letter after comma starting with '{name_filter}'")
-                # Filter data where the first letter after comma in name column starts with the specified letter
-                def extract_first_letter_after_comma(name):
-                    if pd.isna(name):
-                        return ''
-                    name_str = str(name).strip()
-                    if ',' in name_str:
-                        # Get part after comma, strip spaces, get first letter
-                        after_comma = name_str.split(',', 1)[1].strip()
-                        return after_comma[0].upper() if after_comma else ''
-                    return name_str[0].upper() if name_str else ''
-
-                mask_after_comma = df[name_col].apply(extract_first_letter_after_comma) == name_filter.upper()
-                filtered_df = df[mask_after_comma]
-                logger.info(f"🔍 After 'after comma' name filtering: {len(filtered_df)} rows")
-
-                # Fallback: if no rows, try first letter of whole name (previous behavior)
-                if filtered_df.empty:
-                    logger.info("ℹ️ No matches using 'after comma' rule. Falling back to first letter of full name (legacy behavior).")
-                    mask_first_letter = df[name_col].astype(str).str.strip().str.upper().str[0] == name_filter.upper()
-                    filtered_df = df[mask_first_letter]
-                    logger.info(f"🔍 After legacy first-letter filtering: {len(filtered_df)} rows")
-
-                # If still empty, return helpful message
-                if filtered_df.empty:
-                    return {
-                        "success": False,
-                        "error": f"No employees found starting with '{name_filter}'",
-                        "message": f"No data available for employees starting with '{name_filter}' (after-comma and legacy modes)",
-                    }
-
-                df = filtered_df
+            with stage_timer("filter"):
+                df, filter_error = self.apply_standard_filters(
+                    df, name_col, id_col, name_filter, emp_id_filter, billability_filter
+                )
+            if filter_error:
+                return filter_error
             
-            # Apply EMP ID filter if provided
-            if emp_id_filter:
-                logger.info(f"🔍 Filtering employees by ID starting with '{emp_id_filter}'")
-                logger.info(f"🔍 Available columns: {list(df.columns)}")
-                logger.info(f"🔍 Sample ID values: {df[id_col].head(10).tolist()}")
-                
-                # Filter data where ID starts with the specified text
-                mask = df[id_col].astype(str).str.upper().str.startswith(emp_id_filter.upper())
-                df = df[mask]
-                logger.info(f"🔍 After ID filtering: {len(df)} rows for IDs starting with '{emp_id_filter}'")
-                
-                if df.empty:
+            # Group by employee using dynamically detected columns; the index is
+            # reused across requests on the same snapshot and yields row slices
+            with stage_timer("group"):
+                employee_groups = GroupIndex.for_frame(df, name_col, id_col)
+            # The index holds its own sorted rows; drop the filtered intermediate
+            del df
+            filter_message = self._describe_filters(name_filter, emp_id_filter, billability_filter)
+            
+            logger.info(f"📊 Found {len(employee_groups)} unique employees to process")
+            logger.debug(f"📊 Sample employee data: {employee_groups.keys[:5]}")
+            
+            if single_document:
+                # One consolidated PDF for all selected employees
+                combined = self.generate_combined_pdf(employee_groups)
+                if not combined.get("success"):
                     return {
                         "success": False,
-                        "error": f"No employees found with ID starting with '{emp_id_filter}'",
-                        "message": f"No data available for employees whose ID starts with '{emp_id_filter}'"
+                        "error": combined.get("error", "Combined PDF generation failed"),
+                        "message": f"Failed to generate combined Expected Format PDF: {combined.get('error')}"
                     }
-            
-            # Apply billability filter if provided
-            if billability_filter:
-                logger.info(f"🔍 Filtering employees by billability type: '{billability_filter}'")
-                logger.info(f"🔍 Available columns: {list(df.columns)}")
                 
-                # Dynamically detect billability column
-                billability_column = detect_billability_column(df)
-                
-                if billability_column:
-                    logger.info(f"🔍 Using billability column: '{billability_column}'")
-                    logger.info(f"🔍 Sample {billability_column} values: {df[billability_column].head(10).tolist()}")
-                    
-                    # Filter data based on billability type
-                    if billability_filter.lower() == 'billable':
-                        mask = df[billability_column].astype(str).str.lower().str.contains('billable', na=False)
-                    elif billability_filter.lower() == 'non-billable':
-                        mask = df[billability_column].astype(str).str.lower().str.contains('non-billable', na=False)
-                    else:
-                        logger.warning(f"⚠️ Unknown billability filter: {billability_filter}")
-                        mask = pd.Series([True] * len(df), index=df.index)
-                    
-                    df = df[mask]
-                    logger.info(f"🔍 After billability filtering: {len(df)} rows for '{billability_filter}' billability type")
-                    
-                    if df.empty:
-                        return {
-                            "success": False,
-                            "error": f"No employees found with '{billability_filter}' billability type",
-                            "message": f"No data available for employees with '{billability_filter}' billability type"
-                        }
-                else:
-                    logger.warning("⚠️ No billability column found in data. Available columns: " + ", ".join(df.columns))
-                    # If no billability column exists, continue without filtering
+                employee_count = len(combined["employees"])
+                return {
+                    "success": True,
+                    "single_document": True,
+                    "snapshot_version": snapshot_version,
+                    "total_employees": len(employee_groups),
+                    "successful_generations": employee_count,
+                    "failed_generations": len(employee_groups) - employee_count,
+                    "skipped_unchanged": 0,
+                    "regenerated": 0,
+                    "new_files": 1,
+                    "generated_files": [{
+                        "filename": combined["filename"],
+                        "file_path": combined["file_path"],
+                        "user_name": "",
+                        "emp_id": "",
+                        "file_size": combined["file_size"]
+                    }],
+                    "results": [combined],
+                    "filter_applied": {
+                        "name_filter": name_filter,
+                        "emp_id_filter": emp_id_filter
+                    },
+                    "message": f"Generated combined Expected Format PDF for {employee_count} employees ({combined['page_count']} pages){filter_message}"
+                }
             
-            # Group by employee using dynamically detected columns
-            employee_groups = df.groupby([name_col, id_col])
-            results = []
-            generated_files = []
-            successful_generations = 0
+            counters = {
+                "successful_generations": 0,
+                "failed_generations": 0,
+                "skipped_unchanged": 0,
+                "resumed_completed": 0,
+                "regenerated": 0,
+                "new_files": 0
+            }
+            skip_unchanged = self.skip_unchanged and not force_regenerate
+            total_employees = len(employee_groups)
             
-            logger.info(f"📊 Found {len(employee_groups)} unique employees to process")
-            logger.info(f"📊 Sample employee data: {list(employee_groups.groups.keys())[:5]}")
+            # The run lock is held for the whole run, so a second resume of the
+            # same run fails fast in this or any other worker process
+            candidate_run_id = resume_run_id or uuid.uuid4().hex[:12]
+            run_lock = self._run_lock(candidate_run_id)
+            run_lock_fd = run_lock.acquire(blocking=False)
+            if run_lock_fd is None:
+                return {
+                    "success": False,
+                    "error": f"Run {resume_run_id} is already in progress",
+                    "message": f"Generation run {resume_run_id} is still running"
+                }
+            run_id = candidate_run_id
+            if resume_run_id:
+                completed_items = self.run_store.completed_items(run_id)
+                logger.info(f"🔁 Resuming run {run_id} - {len(completed_items)} employees already completed")
+            else:
+                completed_items = {}
+            self._active_runs.add(run_id)
+            # Every log line of this run (including helpers) carries its run_id
+            log_token = bind_log_context(run_id=run_id)
+            self.run_store.start(
+                run_id, total_employees, snapshot_hash=snapshot_hash, inputs=run_inputs,
+                snapshot_version=snapshot_version
+            )
             
-            for (user_name, emp_id), group in employee_groups:
-                logger.info(f"📊 Processing {user_name} ({emp_id}) - {len(group)} rows")
-                
-                # Ensure name_col and id_col are in the group DataFrame for PDF generation
-                # They should already be there from groupby, but ensure consistency
-                result = self.generate_single_pdf(group, str(user_name), str(emp_id))
-                results.append(result)
+            run_started = last_progress = last_progress_log = time.monotonic()
+            event_bus.publish(JOB_PROGRESS, {
+                "run_id": run_id, "status": "running", "processed": 0, "total": total_employees
+            })
+            
+            # Stream employees through render -> write -> checkpoint; per-employee
+            # results go to the run store and only the counters stay in memory
+            for processed, ((user_name, emp_id), group) in enumerate(employee_groups, 1):
+                outcome = self._process_employee(
+                    run_id, str(user_name), str(emp_id), group, skip_unchanged, completed_items
+                )
+                counters[self.OUTCOME_COUNTERS[outcome]] += 1
+                if outcome != "failed":
+                    counters["successful_generations"] += 1
                 
-                if result.get("success"):
-                    successful_generations += 1
-                    generated_files.append({
-                        "filename": result.get("filename", ""),
-                        "file_path": result.get("file_path", ""),
-                        "user_name": result.get("user_name", ""),
-                        "emp_id": result.get("emp_id", ""),
-                        "file_size": result.get("file_size", 0)
+                now = time.monotonic()
+                if now - last_progress >= self.PROGRESS_EVENT_INTERVAL:
+                    last_progress = now
+                    event_bus.publish(JOB_PROGRESS, {
+                        "run_id": run_id, "status": "running", "processed": processed,
+                        "total": total_employees, "successful": counters["successful_generations"]
                     })
+                if now - last_progress_log >= self.PROGRESS_LOG_INTERVAL:
+                    last_progress_log = now
+                    self._log_progress(processed, total_employees, counters, now - run_started)
             
-            # Build filter message
-            filter_parts = []
-            if name_filter:
-                filter_parts.append(f"name starting with '{name_filter}'")
-            if emp_id_filter:
-                filter_parts.append(f"EMP ID starting with '{emp_id_filter}'")
-            if billability_filter:
-                filter_parts.append(f"billability type '{billability_filter}'")
-            
-            # Check if this was a pre-filtered DataFrame (custom condition)
-            # If all standard filters are None but DataFrame is not empty and wasn't loaded from file,
-            # it means custom condition was applied
-            initial_row_count = getattr(df, '_initial_row_count', None)
-            if not name_filter and not emp_id_filter and not billability_filter:
-                # Likely custom condition was applied (standard filters are None)
-                # The filter message will be handled by main.py response
-                filter_message = " (custom condition applied)"
-            elif filter_parts:
-                filter_message = f" (filtered by {', '.join(filter_parts)})"
-            else:
-                filter_message = " (no filters applied - all employees included)"
+            successful_generations = counters["successful_generations"]
+            event_bus.publish(JOB_PROGRESS, {
+                "run_id": run_id, "status": "completed", "processed": total_employees,
+                "total": total_employees, "successful": successful_generations
+            })
+            
+            skipped_unchanged = counters["skipped_unchanged"]
+            resumed_completed = counters["resumed_completed"]
+            skip_message = f" - {skipped_unchanged} unchanged PDF(s) reused" if skipped_unchanged else ""
+            if resumed_completed:
+                skip_message += f" - {resumed_completed} already completed before resuming"
+            
+            summary = {"total_employees": total_employees, **counters}
+            self.run_store.finish(run_id, COMPLETED, summary)
+            self._log_progress(total_employees, total_employees, counters, time.monotonic() - run_started)
+            generated_files = self._generated_files(run_id)
             
             return {
                 "success": successful_generations > 0,
-                "total_employees": len(employee_groups),
-                "successful_generations": successful_generations,
-                "failed_generations": len(employee_groups) - successful_generations,
+                "run_id": run_id,
+                "snapshot_version": snapshot_version,
+                "resumed": bool(resume_run_id),
+                **summary,
                 "generated_files": generated_files,
-                "results": results,
+                "generated_files_truncated": successful_generations > len(generated_files),
+                "results_url": f"/api/timesheets/runs/{run_id}/items",
                 "filter_applied": {
                     "name_filter": name_filter,
                     "emp_id_filter": emp_id_filter
                 },
-                "message": f"Generated {successful_generations}/{len(employee_groups)} Expected Format PDFs successfully{filter_message}"
+                "message": f"Generated {successful_generations}/{total_employees} Expected Format PDFs successfully{filter_message}{skip_message}"
             }
             
         except Exception as e:
             logger.error(f"❌ Error generating all Expected Format PDFs: {e}")
             import traceback
             logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+            if run_id:
+                self.run_store.finish(run_id, FAILED, {"error": str(e)})
             return {
                 "success": False,
+                "run_id": run_id,
+                "snapshot_version": snapshot_version,
                 "error": str(e),
                 "message": f"Failed to generate Expected Format PDFs: {e}",
                 "traceback": traceback.format_exc()
             }
+        finally:
+            self._active_runs.discard(run_id)
+            if run_lock_fd is not None:
+                run_lock.release(run_lock_fd, unlink=True)
+            if log_token is not None:
+                reset_log_context(log_token)
@@ -3,35 +3,71 @@ TimeGuard AI API - Automation Module Only
 This is a minimal FastAPI application supporting only the Automation tab functionality.
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 import traceback
 import os
 import tempfile
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
-import pandas as pd
 import logging
+import asyncio
+from typing import Optional
 
 from expected_format_endpoints import router as expected_format_router
 from settings import settings
-from services.excel_service import ExcelService
-from services.filter_service import FilterService
-from services.pdf_service import PDFService
+from services.container import container
+from utils.http_cache import make_etag, is_not_modified, not_modified_response, validator_headers
+from utils.event_bus import event_bus, format_sse
+from utils.metrics import registry as metrics_registry, request_timings, stage_timer
+from utils.memory_profiler import memory_profiler
+from utils.snapshot_store import SnapshotLease
 
 # Configure enterprise-level logging
 from utils.logging_utils import setup_logging, get_logger
 
 setup_logging(
     log_level=settings.log_level,
-    log_file=settings.log_file if settings.log_file else None
+    log_file=settings.log_file if settings.log_file else None,
+    log_format=settings.log_format,
+    async_logging=settings.log_async
 )
 logger = get_logger(__name__)
 
-app = FastAPI(title="TimeGuard AI API - Automation Module", version="1.0.0")
+# Opt-in tracemalloc/RSS readings at every pipeline stage boundary
+memory_profiler.configure(
+    frames=settings.memory_profile_frames,
+    log_threshold_mb=settings.memory_profile_log_mb
+)
+if settings.memory_profiling:
+    memory_profiler.enable()
+
+def _log_warm_up_failure(task: asyncio.Future) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"❌ Service warm-up failed: {task.exception()}", exc_info=task.exception())
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the service warm-up in the background so the worker accepts requests immediately"""
+    if settings.startup_warm_up:
+        # Importing pandas/ReportLab, loading the snapshot and priming render
+        # caches runs in a worker thread; /health/ready reports 503 until it
+        # finishes, and a request arriving first builds what it needs itself
+        warm_up = asyncio.ensure_future(run_in_threadpool(container.warm_up, settings.startup_prime_caches))
+        warm_up.add_done_callback(_log_warm_up_failure)
+    else:
+        container.mark_ready()
+    yield
+
+app = FastAPI(title="TimeGuard AI API - Automation Module", version="1.0.0", lifespan=lifespan)
+
+# Seconds between keep-alive comments on idle event streams
+SSE_HEARTBEAT_SECONDS = 15
 
 # Global exception handler to ALWAYS return JSON
 @app.exception_handler(Exception)
@@ -95,11 +131,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-excel_service = ExcelService()
-filter_service = FilterService()
-pdf_service = PDFService()
-
 # Basic endpoints
 @app.get("/")
 async def root():
@@ -107,7 +138,63 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    """Liveness plus readiness summary; the process is alive whenever this responds"""
+    return {"status": "healthy", "ready": container.ready, "timestamp": datetime.now().isoformat()}
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the worker is up and serving requests"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the startup warm-up has finished"""
+    report = container.warm_up_report()
+    return JSONResponse(
+        status_code=200 if report["ready"] else 503,
+        content={**report, "timestamp": datetime.now().isoformat()}
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: per-stage timing histograms, PDF counters and cache hit rates"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/debug/memory")
+async def get_memory_profile(top: int = Query(20, ge=0, le=200, description="Top allocation sites to include")):
+    """
+    Memory profile: current/peak RSS, traced allocations, per-stage peak and
+    net deltas, the most recent stage readings and the largest live allocators
+    
+    Stage readings are only recorded while profiling is enabled
+    (MEMORY_PROFILING=true or POST /api/debug/memory?enabled=true).
+    """
+    try:
+        report = await run_in_threadpool(memory_profiler.report, top)
+        return {"success": True, **report}
+    except Exception as e:
+        logger.error(f"❌ Error building memory profile: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error building memory profile: {str(e)}")
+
+@app.post("/api/debug/memory")
+async def set_memory_profiling(
+    enabled: bool = Query(..., description="Turn stage memory profiling on or off"),
+    reset: bool = Query(False, description="Discard recorded stage readings")
+):
+    """Enable or disable memory profiling at runtime"""
+    if reset:
+        memory_profiler.reset()
+    if enabled and not memory_profiler.enabled:
+        memory_profiler.enable()
+    elif not enabled and memory_profiler.enabled:
+        # Log what is still allocated before tracemalloc discards its traces
+        memory_profiler.log_top_allocators()
+        memory_profiler.disable()
+    return {
+        "success": True,
+        "enabled": memory_profiler.enabled,
+        "message": f"Memory profiling {'enabled' if memory_profiler.enabled else 'disabled'}"
+    }
 
 # PDF Generation Endpoint - Core Automation functionality
 @app.post("/api/timesheets/upload-excel")
@@ -116,49 +203,45 @@ async def upload_excel_timesheet(
     filter_letter: str = Form(""),
     filter_emp_id: str = Form(""),
     filter_billability: str = Form("all"),
-    custom_condition: str = Form("")
+    custom_condition: str = Form(""),
+    force_regenerate: bool = Form(False),
+    single_document: bool = Form(False)
 ):
     """
     Upload Excel timesheet and generate PDFs.
     
     File is optional - if not provided, uses existing Consolidated.xlsx.
     Supports standard filters and custom conditions.
+    PDFs whose employee data is unchanged are reused unless force_regenerate is set.
+    With single_document, one combined PDF (bookmarked per employee) is produced instead.
     """
     try:
-        # Step 1: Load or process Excel file
-        if file is not None and file.filename:
-            df = await excel_service.process_uploaded_file(file)
-        else:
-            df = excel_service.load_consolidated_file()
-        
-        # Step 2: Store initial row count for tracking
-        initial_rows = len(df)
-        
-        # Step 3: Apply custom condition if provided
-        if custom_condition.strip():
-            df = filter_service.apply_custom_condition(df, custom_condition)
-        
-        # Step 4: Prepare standard filters
-        filters = filter_service.prepare_standard_filters(
-            filter_letter, filter_emp_id, filter_billability
-        )
-        
-        # Step 5: Generate PDFs
-        result = pdf_service.generate_pdfs(
-            df=df,
-            name_filter=filters['name_filter'],
-            emp_id_filter=filters['emp_id_filter'],
-            billability_filter=filters['billability_filter'],
-            custom_condition=custom_condition if custom_condition.strip() else None
-        )
-        
-        # Step 6: Add filter information to response
-        result.update({
-            "filter_letter": filter_letter.upper().strip() if filter_letter and filter_letter.strip() else "",
-            "filter_emp_id": filter_emp_id.upper().strip() if filter_emp_id and filter_emp_id.strip() else "",
-            "filter_billability": filter_billability.strip() if filter_billability and filter_billability.strip() != "all" else "",
-        })
-        
+        with request_timings() as timings:
+            # Step 1: Load or process Excel file, leasing the snapshot version
+            # the run reads so later uploads or clears can't pull it away
+            excel_service = await container.resolve("excel_service")
+            df = None
+            if file is not None and file.filename:
+                df, snapshot = await excel_service.process_uploaded_file(file)
+            else:
+                snapshot = await run_in_threadpool(excel_service.lease_snapshot)
+            
+            async with snapshot:
+                if df is None:
+                    df = await run_in_threadpool(excel_service.load_consolidated_file, snapshot)
+                
+                # Inputs are stored with the run so an interrupted run can be replayed
+                run_inputs = {
+                    "filter_letter": filter_letter,
+                    "filter_emp_id": filter_emp_id,
+                    "filter_billability": filter_billability,
+                    "custom_condition": custom_condition,
+                    "force_regenerate": force_regenerate,
+                    "single_document": single_document,
+                }
+                # Generation runs in a worker thread so SSE, health and metrics stay responsive
+                result = await run_in_threadpool(run_generation, df, run_inputs, snapshot)
+            result["timings"] = timings.breakdown()
         return JSONResponse(content=result)
         
     except HTTPException:
@@ -167,26 +250,212 @@ async def upload_excel_timesheet(
         logger.error(f"❌ Error processing Excel file: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing Excel file: {str(e)}")
 
+def run_generation(df, run_inputs: dict, snapshot: SnapshotLease,
+                   resume_run_id: Optional[str] = None) -> dict:
+    """
+    Filter the snapshot and generate PDFs for one upload-excel request.
+    
+    Shared by upload-excel and run resumption so a resumed run applies
+    exactly the same custom condition and filters as the original. The
+    run records the leased snapshot's version and content hash.
+    """
+    custom_condition = run_inputs.get("custom_condition", "")
+    filter_letter = run_inputs.get("filter_letter", "")
+    filter_emp_id = run_inputs.get("filter_emp_id", "")
+    filter_billability = run_inputs.get("filter_billability", "all")
+    
+    # Apply custom condition if provided
+    if custom_condition.strip():
+        with stage_timer("filter"):
+            df = container.filter_service.apply_custom_condition(df, custom_condition)
+    
+    # Prepare standard filters
+    filters = container.filter_service.prepare_standard_filters(
+        filter_letter, filter_emp_id, filter_billability
+    )
+    
+    # Generate PDFs
+    result = container.pdf_service.generate_pdfs(
+        df=df,
+        name_filter=filters['name_filter'],
+        emp_id_filter=filters['emp_id_filter'],
+        billability_filter=filters['billability_filter'],
+        custom_condition=custom_condition if custom_condition.strip() else None,
+        force_regenerate=run_inputs.get("force_regenerate", False),
+        single_document=run_inputs.get("single_document", False),
+        resume_run_id=resume_run_id,
+        snapshot_hash=container.excel_service.get_snapshot_hash(snapshot),
+        run_inputs=run_inputs,
+        snapshot_version=snapshot.version
+    )
+    
+    # Add filter information to response
+    result.update({
+        "filter_letter": filter_letter.upper().strip() if filter_letter and filter_letter.strip() else "",
+        "filter_emp_id": filter_emp_id.upper().strip() if filter_emp_id and filter_emp_id.strip() else "",
+        "filter_billability": filter_billability.strip() if filter_billability and filter_billability.strip() != "all" else "",
+    })
+    return result
+
+@app.get("/api/timesheets/runs")
+async def list_generation_runs(limit: int = Query(20, ge=1, le=200)):
+    """List recent checkpointed generation runs, newest first"""
+    try:
+        pdf_service = await container.resolve("pdf_service")
+        return {"success": True, "runs": pdf_service.list_runs(limit)}
+    except Exception as e:
+        logger.error(f"❌ Error listing generation runs: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error listing generation runs: {str(e)}")
+
+@app.get("/api/timesheets/runs/{run_id}")
+async def get_generation_run(run_id: str):
+    """Get a generation run's status, inputs and checkpoint counts"""
+    pdf_service = await container.resolve("pdf_service")
+    run = pdf_service.get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return {"success": True, **run}
+
+@app.get("/api/timesheets/runs/{run_id}/items")
+async def list_generation_run_items(
+    run_id: str,
+    page: int = Query(1, ge=1, description="Page number (1-based)"),
+    page_size: int = Query(100, ge=1, le=1000, description="Results per page"),
+    status: Optional[str] = Query(None, pattern="^(completed|failed)$", description="Only completed or failed employees")
+):
+    """Paginated per-employee results of a generation run (referenced by results_url)"""
+    try:
+        pdf_service = await container.resolve("pdf_service")
+        if pdf_service.get_run(run_id) is None:
+            raise HTTPException(status_code=404, detail="Run not found")
+        items, total = pdf_service.list_run_items(run_id, status=status, page=page, page_size=page_size)
+        return {
+            "success": True,
+            "run_id": run_id,
+            "items": items,
+            "count": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error listing results of run {run_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error listing run results: {str(e)}")
+
+@app.post("/api/timesheets/runs/{run_id}/resume")
+async def resume_generation_run(run_id: str):
+    """
+    Resume an interrupted generation run.
+    
+    Replays the run's original filters against the snapshot version the run
+    started from if it is still retained, otherwise the current
+    Consolidated.xlsx, and skips every employee the run already completed
+    whose rows still hash the same; everything else is generated as usual
+    under the same run ID.
+    """
+    try:
+        pdf_service = await container.resolve("pdf_service")
+        run = pdf_service.get_run(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail="Run not found")
+        if run["active"]:
+            raise HTTPException(status_code=409, detail="Run is still in progress")
+        if run["status"] == "completed":
+            raise HTTPException(status_code=409, detail="Run already completed")
+        if run["inputs"].get("single_document"):
+            raise HTTPException(status_code=400, detail="Single-document runs cannot be resumed")
+        
+        excel_service = await container.resolve("excel_service")
+        with request_timings() as timings:
+            snapshot = None
+            if run.get("snapshot_version"):
+                snapshot = await run_in_threadpool(excel_service.snapshots.acquire, run["snapshot_version"])
+            if snapshot is None:
+                snapshot = await run_in_threadpool(excel_service.lease_snapshot)
+            
+            async with snapshot:
+                df = await run_in_threadpool(excel_service.load_consolidated_file, snapshot)
+                snapshot_hash = await run_in_threadpool(excel_service.get_snapshot_hash, snapshot)
+                snapshot_changed = snapshot_hash != run["snapshot_hash"]
+                if snapshot_changed:
+                    logger.warning(f"⚠️ Consolidated.xlsx changed since run {run_id} started; only unchanged employees are skipped")
+                
+                result = await run_in_threadpool(
+                    run_generation, df, run["inputs"], snapshot, resume_run_id=run_id
+                )
+            result["snapshot_changed"] = snapshot_changed
+            result["timings"] = timings.breakdown()
+        return JSONResponse(content=result)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error resuming generation run {run_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error resuming generation run: {str(e)}")
+
 @app.delete("/api/timesheets/clear-excel")
 async def clear_uploaded_excel():
     """Clear the uploaded Consolidated.xlsx file"""
     try:
-        result = excel_service.clear_consolidated_file()
+        excel_service = await container.resolve("excel_service")
+        result = await run_in_threadpool(excel_service.clear_consolidated_file)
         return JSONResponse(content=result)
     except Exception as e:
         logger.error(f"❌ Error clearing Excel file: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error clearing Excel file: {str(e)}")
 
 @app.get("/api/timesheets/excel-status")
-async def get_excel_status():
-    """Check if Consolidated.xlsx exists and return its status including all column names"""
+async def get_excel_status(request: Request):
+    """
+    Check if Consolidated.xlsx exists and return its status including all column names
+    
+    Responses carry an ETag derived from the file's version; a matching
+    If-None-Match gets a 304 without reading the workbook.
+    """
     try:
-        result = excel_service.get_excel_status()
-        return JSONResponse(content=result)
+        excel_service = await container.resolve("excel_service")
+        snapshot_version, last_modified = excel_service.get_snapshot_version()
+        etag = make_etag("excel-status", snapshot_version)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        result = await run_in_threadpool(excel_service.get_excel_status)
+        return JSONResponse(content=result, headers=validator_headers(etag, last_modified))
     except Exception as e:
         logger.error(f"❌ Error checking Excel status: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error checking Excel status: {str(e)}")
 
+@app.get("/api/events")
+async def stream_events(request: Request):
+    """
+    Server-Sent Events stream of change notifications.
+    
+    Emits snapshot-uploaded, snapshot-cleared, pdf-created, pdf-deleted and
+    job-progress events so the dashboard can refetch on change instead of polling.
+    """
+    async def event_stream():
+        with event_bus.subscribe() as queue:
+            # Reconnect delay for EventSource, then an initial comment to open the stream
+            yield "retry: 3000\n: connected\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keep proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_sse(event)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Add Expected Format PDF endpoints router
 app.include_router(expected_format_router)
 
@@ -3,9 +3,21 @@ Service Layer - Business Logic
 Enterprise-level separation of concerns
 """
 
-from .excel_service import ExcelService
-from .filter_service import FilterService
-from .pdf_service import PDFService
+from .container import ServiceContainer, container
 
-__all__ = ['ExcelService', 'FilterService', 'PDFService']
+# Service classes import pandas and ReportLab, so they are loaded on first access
+_LAZY_EXPORTS = {
+    'ExcelService': '.excel_service',
+    'FilterService': '.filter_service',
+    'PDFService': '.pdf_service',
+}
 
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['ExcelService', 'FilterService', 'PDFService', 'ServiceContainer', 'container']
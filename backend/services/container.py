@@ -0,0 +1,230 @@
+"""
+Service Container
+Lazily constructed, process-wide service instances shared by all routers
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from starlette.concurrency import run_in_threadpool
+
+from utils.metrics import stage_metrics_disabled
+
+logger = logging.getLogger(__name__)
+
+# Warm-up states reported by /health/ready
+WARM_UP_PENDING = "pending"
+WARM_UP_RUNNING = "running"
+WARM_UP_COMPLETED = "completed"
+WARM_UP_SKIPPED = "skipped"
+
+
+class ServiceContainer:
+    """
+    Creates each service on first use and returns the same instance afterwards.
+    
+    Service modules are imported inside the factories, so importing the app
+    does not pull in pandas or ReportLab; they load on the first request that
+    needs them, or earlier in the startup warm-up. Dependencies are injected
+    here: one ExpectedFormatPDFGenerator is built and handed to PDFService, so
+    the timesheet and expected-format routers share its index, run store and
+    text layout cache.
+    
+    Each service is built under its own lock, so a slow build (the generator
+    during warm-up) never holds up a different service. Coroutines resolve
+    services with "await container.resolve(name)", which waits for a build
+    in the threadpool instead of on the event loop.
+    """
+    
+    def __init__(self):
+        self._instances: Dict[str, Any] = {}
+        # One build lock per service; building pdf_service takes pdf_generator's
+        # lock inside its own, never the reverse
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # Seconds spent importing and constructing each service
+        self.init_seconds: Dict[str, float] = {}
+        self.warm_up_status = WARM_UP_PENDING
+        # Warm-up phase -> {"ms": duration, "error": message or None}
+        self.warm_up_phases: Dict[str, Dict[str, Any]] = {}
+        self._ready = threading.Event()
+    
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._locks_guard:
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+        with build_lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                started = time.perf_counter()
+                instance = factory()
+                self.init_seconds[name] = time.perf_counter() - started
+                self._instances[name] = instance
+                logger.info(f"✅ Initialized {name} in {self.init_seconds[name] * 1000:.0f} ms")
+        return instance
+    
+    async def resolve(self, name: str) -> Any:
+        """
+        Service by property name for coroutines; one still being built (e.g. by
+        the warm-up) is waited for in the threadpool, not on the event loop
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        return await run_in_threadpool(getattr, self, name)
+    
+    def is_initialized(self, name: str) -> bool:
+        """Whether a service has been constructed yet"""
+        return name in self._instances
+    
+    @property
+    def pdf_generator(self):
+        """Shared ExpectedFormatPDFGenerator"""
+        def build():
+            from expected_format_pdf_generator import ExpectedFormatPDFGenerator
+            return ExpectedFormatPDFGenerator()
+        return self._get("pdf_generator", build)
+    
+    @property
+    def excel_service(self):
+        """Shared ExcelService"""
+        def build():
+            from services.excel_service import ExcelService
+            return ExcelService()
+        return self._get("excel_service", build)
+    
+    @property
+    def filter_service(self):
+        """Shared FilterService"""
+        def build():
+            from services.filter_service import FilterService
+            return FilterService()
+        return self._get("filter_service", build)
+    
+    @property
+    def pdf_service(self):
+        """Shared PDFService using the shared generator"""
+        def build():
+            from services.pdf_service import PDFService
+            return PDFService(generator=self.pdf_generator)
+        return self._get("pdf_service", build)
+    
+    @property
+    def ready(self) -> bool:
+        """Whether startup warm-up has finished (or was skipped)"""
+        return self._ready.is_set()
+    
+    def mark_ready(self) -> None:
+        """Report ready without warming up (warm-up disabled)"""
+        self.warm_up_status = WARM_UP_SKIPPED
+        self._ready.set()
+    
+    def _run_phase(self, name: str, phase: Callable[[], Any]) -> Any:
+        """Run one warm-up phase, recording its duration; failures are logged, not raised"""
+        started = time.perf_counter()
+        error = None
+        result = None
+        try:
+            result = phase()
+        except Exception as e:
+            error = str(e)
+            logger.warning(f"⚠️ Warm-up phase '{name}' failed: {e}")
+        self.warm_up_phases[name] = {"ms": round((time.perf_counter() - started) * 1000, 1), "error": error}
+        return result
+    
+    def _load_snapshot(self):
+        """Load the current Consolidated.xlsx into the ExcelService snapshot cache"""
+        excel_service = self.excel_service
+        snapshot = excel_service.snapshots.acquire()
+        if snapshot is None:
+            return None
+        with snapshot:
+            return excel_service.load_consolidated_file(snapshot)
+    
+    @staticmethod
+    def _build_indexes(df):
+        """
+        Detect the employee columns and build the snapshot's group index.
+        
+        Returns:
+            (user_name, emp_id, rows) of the first employee, or None
+        """
+        from expected_format_pdf_generator import detect_employee_identifier_columns
+        from utils.group_index import GroupIndex
+        
+        employee_cols = detect_employee_identifier_columns(df)
+        if not employee_cols['name_found'] or not employee_cols['id_found']:
+            return None
+        employee_groups = GroupIndex.for_frame(df, employee_cols['name_column'], employee_cols['id_column'])
+        if not len(employee_groups):
+            return None
+        user_name, emp_id = employee_groups.keys[0]
+        return str(user_name), str(emp_id), employee_groups.group_at(0)
+    
+    def warm_up(self, prime_caches: bool = True) -> Dict[str, Any]:
+        """
+        Construct every service now instead of on first use, then prime caches.
+        
+        With prime_caches, the current snapshot is loaded into the ExcelService
+        cache, its employee group index is built, the logo is decoded, font
+        metrics are loaded and one throwaway PDF is rendered in memory (from
+        the snapshot's first employee when there is one), all without
+        recording stage metrics. Phases that fail are recorded and skipped;
+        the process reports ready either way.
+        
+        Args:
+            prime_caches: Also warm the snapshot, index and rendering caches
+        
+        Returns:
+            Status and per-phase durations
+        """
+        started = time.perf_counter()
+        self.warm_up_status = WARM_UP_RUNNING
+        try:
+            self._run_phase("services", self._build_services)
+            if prime_caches:
+                # Warm-up work is not request work: keep it out of the stage metrics
+                with stage_metrics_disabled():
+                    self._prime_caches()
+        finally:
+            self.warm_up_status = WARM_UP_COMPLETED
+            self._ready.set()
+        logger.info(f"🔥 Warm-up completed in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return self.warm_up_report()
+    
+    def _prime_caches(self) -> None:
+        snapshot = self._run_phase("snapshot", self._load_snapshot)
+        sample = None
+        if snapshot is not None:
+            sample = self._run_phase("indexes", lambda: self._build_indexes(snapshot))
+        generator = self.pdf_generator
+        self._run_phase("logo", generator.get_logo)
+        self._run_phase("fonts", generator.prime_font_metrics)
+        if sample is not None:
+            user_name, emp_id, rows = sample
+            self._run_phase("render", lambda: generator.render_warm_up_pdf(rows, user_name, emp_id))
+        else:
+            self._run_phase("render", generator.render_warm_up_pdf)
+    
+    def _build_services(self) -> None:
+        self.pdf_generator
+        self.excel_service
+        self.filter_service
+        self.pdf_service
+    
+    def warm_up_report(self) -> Dict[str, Any]:
+        """Readiness, warm-up status, phase timings and service construction times"""
+        return {
+            "ready": self.ready,
+            "status": self.warm_up_status,
+            "phases": {name: dict(phase) for name, phase in self.warm_up_phases.items()},
+            "services_ms": {name: round(seconds * 1000, 1) for name, seconds in self.init_seconds.items()},
+        }
+
+
+# Shared container for the whole process
+container = ServiceContainer()
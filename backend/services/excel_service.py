@@ -3,18 +3,28 @@ Excel Processing Service
 Handles Excel file operations, validation, and data loading
 """
 
+import hashlib
 import os
 import tempfile
 import logging
 from typing import Dict, Optional, Tuple
 import pandas as pd
 from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
 
 from settings import settings
 from expected_format_pdf_generator import detect_employee_identifier_columns
+from utils.event_bus import event_bus, SNAPSHOT_UPLOADED, SNAPSHOT_CLEARED
+from utils.group_index import SNAPSHOT_ATTR
+from utils.metrics import stage_timer, cache_hits, cache_misses
+from utils.snapshot_store import SnapshotLease, SnapshotStore
 
 logger = logging.getLogger(__name__)
 
+# Published workbook versions live in data_dir/snapshots/<version>/Consolidated.xlsx
+SNAPSHOTS_DIR = "snapshots"
+WORKBOOK_NAME = "Consolidated.xlsx"
+
 
 class ExcelService:
     """Service for Excel file operations and validation"""
@@ -26,7 +36,25 @@ class ExcelService:
     def __init__(self):
         self.data_dir = settings.data_dir
         os.makedirs(self.data_dir, exist_ok=True)
-        self.consolidated_path = os.path.join(self.data_dir, "Consolidated.xlsx")
+        # Every upload becomes a new immutable version; readers lease the one they use
+        self.snapshots = SnapshotStore(os.path.join(self.data_dir, SNAPSHOTS_DIR), WORKBOOK_NAME)
+        # (snapshot version, DataFrame) of the last loaded Consolidated.xlsx
+        self._snapshot_cache: Optional[Tuple[str, pd.DataFrame]] = None
+        # (snapshot version, SHA-256) of the last hashed version; versions never change
+        self._hash_cache: Optional[Tuple[str, str]] = None
+        self._adopt_legacy_workbook()
+        self.snapshots.collect_garbage()
+    
+    def _adopt_legacy_workbook(self) -> None:
+        """Publish a Consolidated.xlsx left in data_dir by an older release as the first version"""
+        legacy_path = os.path.join(self.data_dir, WORKBOOK_NAME)
+        if not os.path.exists(legacy_path) or self.snapshots.read_current() is not None:
+            return
+        # publish() moves the file under its lock, so only one worker adopts it
+        snapshot = self.snapshots.publish(legacy_path)
+        if snapshot is not None:
+            snapshot.release()
+            logger.info(f"✅ Moved existing {WORKBOOK_NAME} into snapshot {snapshot.version}")
     
     async def validate_file(self, file: UploadFile) -> Tuple[bytes, int]:
         """
@@ -52,7 +80,8 @@ class ExcelService:
             )
         
         # Read and validate file size (await async read)
-        content = await file.read()
+        with stage_timer("upload"):
+            content = await file.read()
         file_size = len(content)
         
         if file_size > settings.max_file_size_bytes:
@@ -92,15 +121,19 @@ class ExcelService:
         
         return None
     
-    async def process_uploaded_file(self, file: UploadFile) -> pd.DataFrame:
+    async def process_uploaded_file(self, file: UploadFile) -> Tuple[pd.DataFrame, SnapshotLease]:
         """
         Process and save uploaded Excel file.
         
+        The workbook is published as a new snapshot version; runs still
+        reading an earlier version are unaffected.
+        
         Args:
             file: Uploaded file object
             
         Returns:
-            Processed DataFrame
+            Tuple of (processed DataFrame, lease on the new version); the
+            caller must release the lease
             
         Raises:
             HTTPException: If processing fails
@@ -108,76 +141,155 @@ class ExcelService:
         # Validate file
         content, file_size = await self.validate_file(file)
         
+        # Parsing and publishing (which waits for the publish lock) run off the event loop
+        df, snapshot = await run_in_threadpool(
+            self._save_upload, content, f".{file.filename.split('.')[-1]}"
+        )
+        logger.info(f"✅ Saved Excel as Consolidated.xlsx (snapshot {snapshot.version})")
+        event_bus.publish(SNAPSHOT_UPLOADED, {
+            "filename": file.filename, "rows": len(df), "version": snapshot.version
+        })
+        return df, snapshot
+    
+    def _save_upload(self, content: bytes, suffix: str) -> Tuple[pd.DataFrame, SnapshotLease]:
+        """Read and validate uploaded workbook bytes and publish them as a snapshot"""
         # Create temporary file
         temp_file_path = None
         try:
             with tempfile.NamedTemporaryFile(
                 delete=False, 
-                suffix=f".{file.filename.split('.')[-1]}"
+                suffix=suffix
             ) as temp_file:
                 temp_file.write(content)
                 temp_file_path = temp_file.name
             
-            # Read Excel file
-            df = self.read_excel_file(temp_file_path)
-            
-            if df is None or df.empty:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Could not read Excel file or no valid data found"
-                )
-            
-            # Validate required columns
-            self._validate_employee_columns(df)
-            
-            # Standardize column names
-            df = self._standardize_column_names(df)
-            
-            # Save to consolidated path
-            df.to_excel(self.consolidated_path, index=False)
-            logger.info(f"✅ Saved Excel as Consolidated.xlsx at {self.consolidated_path}")
+            with stage_timer("load"):
+                # Read Excel file
+                df = self.read_excel_file(temp_file_path)
+                
+                if df is None or df.empty:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Could not read Excel file or no valid data found"
+                    )
+                
+                # Validate required columns
+                self._validate_employee_columns(df)
+                
+                # Standardize column names
+                df = self._standardize_column_names(df)
+                
+                # Save as a new snapshot version
+                snapshot = self._publish_snapshot(df)
             
-            return df
+            return df, snapshot
             
         finally:
             # Clean up temporary file
             if temp_file_path and os.path.exists(temp_file_path):
                 os.unlink(temp_file_path)
     
-    def load_consolidated_file(self) -> pd.DataFrame:
+    def _publish_snapshot(self, df: pd.DataFrame) -> SnapshotLease:
         """
-        Load existing Consolidated.xlsx file.
+        Write the frame as a new snapshot version and make it current.
+        
+        The workbook is written to a staging file in the snapshot store and
+        moved into its version directory on publish, so no worker ever opens a
+        half-written file.
+        
+        Args:
+            df: Standardized DataFrame to publish
         
         Returns:
-            DataFrame with loaded data
-            
+            Lease on the new version
+        """
+        staging_path = self.snapshots.staging_path(".xlsx")
+        try:
+            df.to_excel(staging_path, index=False)
+            snapshot = self.snapshots.publish(staging_path)
+        finally:
+            if os.path.exists(staging_path):
+                os.unlink(staging_path)
+        self._snapshot_cache = None
+        return snapshot
+    
+    def lease_snapshot(self, version: Optional[str] = None) -> SnapshotLease:
+        """
+        Lease a snapshot version so it stays on disk while a job reads it.
+        
+        Args:
+            version: Version to lease (the current one if omitted)
+        
+        Returns:
+            Lease to release when done (usable as a context manager)
+        
         Raises:
-            HTTPException: If file doesn't exist or is invalid
+            HTTPException: If there is no current snapshot or no such version
         """
-        if not os.path.exists(self.consolidated_path):
+        snapshot = self.snapshots.acquire(version)
+        if snapshot is None:
+            if version is not None:
+                raise HTTPException(status_code=404, detail=f"Snapshot {version} no longer exists")
             raise HTTPException(
                 status_code=400,
                 detail="No Excel file available. Please upload an Excel file first."
             )
+        return snapshot
+    
+    def load_consolidated_file(self, snapshot: Optional[SnapshotLease] = None) -> pd.DataFrame:
+        """
+        Load existing Consolidated.xlsx file.
         
-        logger.info(f"📂 Loading data from Consolidated.xlsx")
-        df = pd.read_excel(self.consolidated_path)
-        df = df.dropna(how='all').reset_index(drop=True)
+        The parsed frame is kept until another version becomes current, so
+        repeated requests on the same snapshot skip re-reading the workbook.
+        The frame is tagged with the snapshot version (df.attrs) so
+        per-snapshot indexes can be reused. A version published by another
+        worker is picked up on the next call.
         
-        if df.empty:
-            raise HTTPException(
-                status_code=400,
-                detail="Consolidated.xlsx is empty or no valid data found"
-            )
-        
-        # Validate required columns
-        self._validate_employee_columns(df)
+        Args:
+            snapshot: Leased version to load (the current one if omitted)
         
-        # Standardize column names
-        df = self._standardize_column_names(df)
+        Returns:
+            DataFrame with loaded data
+            
+        Raises:
+            HTTPException: If file doesn't exist or is invalid
+        """
+        lease = snapshot or self.lease_snapshot()
+        version = lease.version
+        try:
+            cached = self._snapshot_cache
+            if cached is not None and cached[0] == version:
+                cache_hits.inc(cache="snapshot")
+                logger.info(f"📂 Using cached Consolidated.xlsx ({len(cached[1])} rows)")
+                # Copy-on-write shallow copy: callers can't alter the cached frame
+                return cached[1].copy(deep=False)
+            cache_misses.inc(cache="snapshot")
+            
+            logger.info(f"📂 Loading data from Consolidated.xlsx")
+            with stage_timer("load"):
+                df = pd.read_excel(lease.path)
+                df = df.dropna(how='all').reset_index(drop=True)
+                
+                if df.empty:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Consolidated.xlsx is empty or no valid data found"
+                    )
+                
+                # Validate required columns
+                self._validate_employee_columns(df)
+                
+                # Standardize column names
+                df = self._standardize_column_names(df)
+        finally:
+            if snapshot is None:
+                lease.release()
         
-        logger.info(f"📊 Loaded {len(df)} rows from Consolidated.xlsx")
-        return df
+        logger.info(f"📊 Loaded {len(df)} rows from Consolidated.xlsx (snapshot {version})")
+        df.attrs[SNAPSHOT_ATTR] = version
+        self._snapshot_cache = (version, df)
+        return df.copy(deep=False)
     
     def _validate_employee_columns(self, df: pd.DataFrame) -> None:
         """
@@ -244,6 +356,55 @@ class ExcelService:
         
         return df
     
+    def get_snapshot_version(self) -> Tuple[str, Optional[float]]:
+        """
+        Get a cheap version identifier for Consolidated.xlsx.
+        
+        The current snapshot version; versions are immutable, so it changes
+        whenever any worker publishes or clears, without reading the workbook.
+        
+        Returns:
+            Tuple of (version string, modification timestamp or None if absent)
+        """
+        version = self.snapshots.read_current()
+        if version is None:
+            return "none", None
+        try:
+            return version, os.stat(self.snapshots.workbook_path(version)).st_mtime
+        except FileNotFoundError:
+            # Cleared and collected since the pointer was read
+            return "none", None
+    
+    def get_snapshot_hash(self, snapshot: Optional[SnapshotLease] = None) -> Optional[str]:
+        """
+        Get a content hash of Consolidated.xlsx.
+        
+        Recorded with generation runs so a resumed run can tell whether the
+        workbook was replaced in between.
+        
+        Args:
+            snapshot: Leased version to hash (the current one if omitted)
+        
+        Returns:
+            SHA-256 hex digest, or None if the file does not exist
+        """
+        lease = snapshot or self.snapshots.acquire()
+        if lease is None:
+            return None
+        try:
+            cached = self._hash_cache
+            if cached is not None and cached[0] == lease.version:
+                return cached[1]
+            digest = hashlib.sha256()
+            with open(lease.path, "rb") as workbook:
+                for chunk in iter(lambda: workbook.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        finally:
+            if snapshot is None:
+                lease.release()
+        self._hash_cache = (lease.version, digest.hexdigest())
+        return self._hash_cache[1]
+    
     def get_excel_status(self) -> Dict:
         """
         Get status of Consolidated.xlsx file.
@@ -251,7 +412,8 @@ class ExcelService:
         Returns:
             Dictionary with file status information
         """
-        if not os.path.exists(self.consolidated_path):
+        snapshot = self.snapshots.acquire()
+        if snapshot is None:
             return {
                 "success": True,
                 "exists": False,
@@ -259,13 +421,15 @@ class ExcelService:
             }
         
         try:
-            df = pd.read_excel(self.consolidated_path)
+            with snapshot:
+                df = pd.read_excel(snapshot.path)
             columns_list = [str(col) for col in df.columns]
             employee_cols = detect_employee_identifier_columns(df)
             
             return {
                 "success": True,
                 "exists": True,
+                "snapshot_version": snapshot.version,
                 "rows": len(df),
                 "columns": columns_list,
                 "columns_count": len(columns_list),
@@ -276,6 +440,7 @@ class ExcelService:
             return {
                 "success": False,
                 "exists": True,
+                "snapshot_version": snapshot.version,
                 "error": f"Error reading file: {str(e)}"
             }
     
@@ -283,12 +448,17 @@ class ExcelService:
         """
         Clear the Consolidated.xlsx file.
         
+        Only the current pointer is removed; versions still leased by running
+        jobs are garbage-collected once those jobs finish.
+        
         Returns:
             Dictionary with operation result
         """
-        if os.path.exists(self.consolidated_path):
-            os.remove(self.consolidated_path)
-            logger.info(f"✅ Deleted Consolidated.xlsx at {self.consolidated_path}")
+        previous = self.snapshots.clear()
+        self._snapshot_cache = None
+        if previous is not None:
+            logger.info(f"✅ Cleared Consolidated.xlsx (snapshot {previous})")
+            event_bus.publish(SNAPSHOT_CLEARED, {"version": previous})
             return {"success": True, "message": "Excel file cleared successfully"}
         else:
             return {"success": True, "message": "No Excel file to clear"}
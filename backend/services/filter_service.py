@@ -44,7 +44,7 @@ class FilterService:
         self.initial_rows = len(df)
         
         logger.info(f"🔍 Applying custom condition: {custom_condition}")
-        logger.info(f"📋 Available columns in Excel: {list(df.columns)}")
+        logger.debug(f"📋 Available columns in Excel: {list(df.columns)}")
         
         try:
             condition_lower = custom_condition.lower()
@@ -4,7 +4,7 @@ Handles PDF generation business logic
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import pandas as pd
 
 from expected_format_pdf_generator import ExpectedFormatPDFGenerator
@@ -15,8 +15,9 @@ logger = logging.getLogger(__name__)
 class PDFService:
     """Service for PDF generation operations"""
     
-    def __init__(self):
-        self.generator = ExpectedFormatPDFGenerator()
+    def __init__(self, generator: Optional[ExpectedFormatPDFGenerator] = None):
+        # The service container injects the process-wide generator
+        self.generator = generator or ExpectedFormatPDFGenerator()
     
     def generate_pdfs(
         self,
@@ -24,7 +25,13 @@ class PDFService:
         name_filter: Optional[str] = None,
         emp_id_filter: Optional[str] = None,
         billability_filter: Optional[str] = None,
-        custom_condition: Optional[str] = None
+        custom_condition: Optional[str] = None,
+        force_regenerate: bool = False,
+        single_document: bool = False,
+        resume_run_id: Optional[str] = None,
+        snapshot_hash: Optional[str] = None,
+        run_inputs: Optional[Dict[str, Any]] = None,
+        snapshot_version: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate PDFs from filtered DataFrame.
@@ -35,6 +42,12 @@ class PDFService:
             emp_id_filter: Filter by EMP ID starting with text
             billability_filter: Filter by billability type
             custom_condition: Custom condition string (if applied)
+            force_regenerate: Re-render PDFs even if their data is unchanged
+            single_document: Render all employees into one combined PDF
+            resume_run_id: Continue this interrupted run instead of starting a new one
+            snapshot_hash: Hash of the workbook, recorded with the run
+            run_inputs: Request inputs recorded with the run so it can be replayed
+            snapshot_version: Snapshot version the DataFrame was loaded from
             
         Returns:
             Dictionary with generation results
@@ -53,18 +66,66 @@ class PDFService:
                 df,
                 name_filter=None,
                 emp_id_filter=None,
-                billability_filter=None
+                billability_filter=None,
+                force_regenerate=force_regenerate,
+                single_document=single_document,
+                resume_run_id=resume_run_id,
+                snapshot_hash=snapshot_hash,
+                run_inputs=run_inputs,
+                snapshot_version=snapshot_version
             )
         else:
             result = self.generator.generate_all_pdfs(
                 df,
                 name_filter=name_filter,
                 emp_id_filter=emp_id_filter,
-                billability_filter=billability_filter
+                billability_filter=billability_filter,
+                force_regenerate=force_regenerate,
+                single_document=single_document,
+                resume_run_id=resume_run_id,
+                snapshot_hash=snapshot_hash,
+                run_inputs=run_inputs,
+                snapshot_version=snapshot_version
             )
         
         return self._format_response(result, custom_condition)
     
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a checkpointed generation run.
+        
+        Returns:
+            Run record with an "active" flag, or None if unknown
+        """
+        run = self.generator.run_store.get(run_id)
+        if run is not None:
+            run["active"] = self.generator.is_run_active(run_id)
+        return run
+    
+    def list_run_items(
+        self,
+        run_id: str,
+        status: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 100
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Page through a run's per-employee results.
+        
+        Returns:
+            Tuple of (items, total matching items)
+        """
+        return self.generator.run_store.list_items(
+            run_id, status=status, limit=page_size, offset=(page - 1) * page_size
+        )
+    
+    def list_runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent generation runs, newest first"""
+        runs = self.generator.run_store.list_runs(limit)
+        for run in runs:
+            run["active"] = self.generator.is_run_active(run["run_id"])
+        return runs
+    
     def _format_response(
         self, 
         result: Dict[str, Any], 
@@ -84,7 +145,7 @@ class PDFService:
             message = result.get("message", "PDFs generated successfully")
             
             # Enhance message for custom conditions
-            if custom_condition and custom_condition.strip():
+            if custom_condition and custom_condition.strip() and not result.get("single_document"):
                 if "custom condition applied" not in message.lower():
                     message = (
                         f"Generated {result.get('successful_generations', 0)}/"
@@ -92,14 +153,30 @@ class PDFService:
                         f"successfully (custom condition: '{custom_condition}')"
                     )
             
+            # Batch runs list only their first files inline (generated_files_truncated
+            # is set when there are more); results_url pages through all of them
+            generated_files = result.get("generated_files", [])
             return {
                 "success": True,
                 "message": message,
-                "generated_files": result.get("generated_files", []),
+                "generated_files": generated_files,
+                "generated_files_truncated": result.get("generated_files_truncated", False),
+                "results_url": result.get("results_url"),
                 "total_employees": result.get("total_employees", 0),
                 "successful_generations": result.get("successful_generations", 0),
                 "failed_generations": result.get("failed_generations", 0),
-                "total_resources": len(result.get("generated_files", [])),
+                "skipped_unchanged": result.get("skipped_unchanged", 0),
+                "regenerated": result.get("regenerated", 0),
+                "new_files": result.get("new_files", 0),
+                "run_id": result.get("run_id"),
+                "snapshot_version": result.get("snapshot_version"),
+                "resumed": result.get("resumed", False),
+                "resumed_completed": result.get("resumed_completed", 0),
+                "single_document": result.get("single_document", False),
+                "total_resources": (
+                    len(generated_files) if result.get("single_document")
+                    else result.get("successful_generations", 0)
+                ),
                 "custom_condition_applied": (
                     custom_condition.strip() 
                     if custom_condition and custom_condition.strip() 
@@ -111,10 +188,15 @@ class PDFService:
                 "success": False,
                 "message": result.get("message", "Failed to generate PDFs"),
                 "error": result.get("error", "Unknown error"),
+                "run_id": result.get("run_id"),
+                "snapshot_version": result.get("snapshot_version"),
                 "generated_files": [],
                 "total_employees": 0,
                 "successful_generations": 0,
                 "failed_generations": 0,
+                "skipped_unchanged": 0,
+                "regenerated": 0,
+                "new_files": 0,
                 "total_resources": 0,
                 "custom_condition_applied": "",
             }
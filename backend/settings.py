@@ -36,9 +36,28 @@ class Settings(BaseSettings):
     max_file_size_mb: int = 50
     allowed_file_extensions: List[str] = [".xlsx", ".xls"]
     
+    # PDF Generation Configuration
+    pdf_render_engine: str = "platypus"  # "platypus" (Table flowables) or "canvas" (direct drawing)
+    text_layout_cache_size: int = 10000  # Max cached cell layouts shared across employees
+    pdf_skip_unchanged: bool = True  # Reuse existing PDFs whose employee rows are unchanged
+    pdf_output_layout: str = "sharded"  # "sharded" (hash-prefix subdirectories) or "flat"
+    pdf_output_profile: str = "archival"  # "fast", "compact" or "archival" (size vs. render time)
+    long_table_threshold: int = 500  # Rows per employee above which platypus tables are pre-split per page
+    
+    # Startup Configuration
+    startup_warm_up: bool = True  # Build services (pandas, ReportLab, indexes) in a background startup task
+    startup_prime_caches: bool = True  # Also load the snapshot, build its group index and render a throwaway PDF
+    
     # Logging Configuration
     log_level: str = "INFO"
     log_file: str = ""
+    log_format: str = "text"  # "text" or "json" (one structured object per line)
+    log_async: bool = True  # Write logs from a background QueueListener thread
+    
+    # Memory Profiling (opt-in; tracemalloc slows allocation-heavy code noticeably)
+    memory_profiling: bool = False  # tracemalloc/RSS readings at each pipeline stage boundary
+    memory_profile_frames: int = 1  # Stack frames recorded per allocation
+    memory_profile_log_mb: float = 10.0  # Stage peak delta logged at INFO above this size
     
     # Security Configuration (optional - for future use)
     jwt_secret_key: str = ""
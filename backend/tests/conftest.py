@@ -0,0 +1,25 @@
+"""
+Shared test setup: import backend modules from the source tree and keep
+generated files in a throwaway data directory.
+"""
+
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# settings is read on first import, so this must run before any backend import
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="timeguard-tests-")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def generator():
+    """One ExpectedFormatPDFGenerator shared by the whole session"""
+    from expected_format_pdf_generator import ExpectedFormatPDFGenerator
+    return ExpectedFormatPDFGenerator()
@@ -0,0 +1,32 @@
+"""
+Shared and exclusive semantics of FileLock, which snapshot leases rely on
+"""
+
+from utils.file_lock import FileLock
+
+
+def test_shared_locks_coexist_and_exclude_writers(tmp_path):
+    lock = FileLock(str(tmp_path / "ref.lock"))
+    first = lock.acquire(shared=True)
+    second = lock.acquire(shared=True, blocking=False)
+    try:
+        assert second is not None
+        assert lock.acquire(blocking=False) is None
+    finally:
+        lock.release(second)
+        lock.release(first)
+
+    exclusive = lock.acquire(blocking=False)
+    assert exclusive is not None
+    assert lock.acquire(shared=True, blocking=False) is None
+    lock.release(exclusive)
+
+
+def test_release_with_unlink_removes_the_lock_file(tmp_path):
+    lock = FileLock(str(tmp_path / "run.lock"))
+    fd = lock.acquire(blocking=False)
+
+    lock.release(fd, unlink=True)
+
+    assert not (tmp_path / "run.lock").exists()
+    assert not lock.is_held()
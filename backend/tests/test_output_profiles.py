@@ -0,0 +1,42 @@
+"""
+Output profiles apply their ASCII85 setting to each document, not to the process
+"""
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from reportlab import rl_config
+
+from benchmarks.synthetic import make_timesheet_frame
+
+from expected_format_pdf_generator import ExpectedFormatPDFGenerator
+
+
+def render(generator, employee_data):
+    buffer = io.BytesIO()
+    generator.build_platypus_pdf(buffer, employee_data, "Doe, John", "E10000")
+    return buffer.getvalue()
+
+
+def test_selecting_a_profile_leaves_reportlab_config_alone():
+    before = rl_config.useA85
+    generator = ExpectedFormatPDFGenerator()
+
+    for profile in ("fast", "archival", "compact"):
+        generator.set_output_profile(profile)
+        assert rl_config.useA85 == before
+
+
+def test_concurrent_generators_keep_their_own_stream_encoding():
+    employee_data = make_timesheet_frame(rows=40, employees=1, seed=5)
+    archival = ExpectedFormatPDFGenerator()
+    archival.set_output_profile("archival")
+    compact = ExpectedFormatPDFGenerator()
+    compact.set_output_profile("compact")
+
+    jobs = [archival, compact] * 4
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        outputs = list(pool.map(lambda generator: render(generator, employee_data), jobs))
+
+    for generator, pdf_bytes in zip(jobs, outputs):
+        assert (b"/ASCII85Decode" in pdf_bytes) == (generator is archival)
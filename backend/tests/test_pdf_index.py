@@ -0,0 +1,36 @@
+"""
+PDF index search treats LIKE wildcards in the query literally
+"""
+
+import pytest
+
+from utils.pdf_index import PDFIndex
+
+FILENAMES = [
+    "Doe_John_E100.pdf",
+    "DoeXJohn_E101.pdf",
+    "Smith 100%_E102.pdf",
+    "Smith 1000_E103.pdf",
+    "Back\\slash_E104.pdf",
+    "Backslash_E105.pdf",
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    pdf_index = PDFIndex(str(tmp_path))
+    for number, filename in enumerate(FILENAMES):
+        pdf_index.record(filename, str(tmp_path / filename), 1000, created=number)
+    return pdf_index
+
+
+@pytest.mark.parametrize("search, expected", [
+    ("doe_", ["Doe_John_E100.pdf"]),
+    ("100%", ["Smith 100%_E102.pdf"]),
+    ("k\\s", ["Back\\slash_E104.pdf"]),
+    ("e10", FILENAMES),
+])
+def test_search_matches_wildcards_literally(index, search, expected):
+    rows, total = index.query(search=search, sort_by="filename", order="asc")
+    assert [row["filename"] for row in rows] == sorted(expected)
+    assert total == len(expected)
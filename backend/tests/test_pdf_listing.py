@@ -0,0 +1,30 @@
+"""
+PDF listing endpoint: query validation comes before the conditional-request check
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+LIST_URL = "/api/expected-format-pdf/list-generated-pdfs"
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def test_invalid_sort_by_is_rejected_even_when_not_modified(client):
+    response = client.get(LIST_URL, params={"sort_by": "bogus"}, headers={"If-None-Match": "*"})
+
+    assert response.status_code == 400
+
+
+def test_refresh_reindexes_and_keeps_validators(client):
+    response = client.get(LIST_URL, params={"refresh": True})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get(LIST_URL, headers={"If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,112 @@
+"""
+Visual diff of the direct canvas engine against the platypus table it replaces
+"""
+
+import io
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_timesheet_frame
+
+import expected_format_pdf_generator
+
+pymupdf = pytest.importorskip("pymupdf")
+
+# Points; text is placed identically, path coordinates differ only by float rounding
+POSITION_TOLERANCE = 0.5
+# Share of page pixels allowed to differ visibly (anti-aliasing of batched grid paths)
+PIXEL_DIFF_TOLERANCE = 0.001
+
+
+class FrozenDatetime(datetime):
+    """Pins the "Generated on" header so both renders print the same time"""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2024, 1, 15, 9, 30, 0)
+
+
+@pytest.fixture(autouse=True)
+def frozen_clock(monkeypatch):
+    monkeypatch.setattr(expected_format_pdf_generator, "datetime", FrozenDatetime)
+
+
+def render(generator, engine, employee_data):
+    """Render one employee with the given engine and open it with PyMuPDF"""
+    buffer = io.BytesIO()
+    if engine == "canvas":
+        generator.build_canvas_pdf(buffer, employee_data, "Doe, John", "E10000")
+    else:
+        generator.build_platypus_pdf(buffer, employee_data, "Doe, John", "E10000")
+    return pymupdf.open(stream=buffer.getvalue(), filetype="pdf")
+
+
+def page_words(page):
+    return sorted((word[4], word[0], word[1], word[2], word[3]) for word in page.get_text("words"))
+
+
+def drawing_bounds(page):
+    bounds = pymupdf.Rect()
+    for drawing in page.get_drawings():
+        bounds |= drawing["rect"]
+    return bounds
+
+
+def page_pixels(page):
+    pixmap = page.get_pixmap(dpi=72, colorspace=pymupdf.csGRAY)
+    return np.frombuffer(pixmap.samples, dtype=np.uint8).astype(np.int16)
+
+
+def long_text_frame():
+    """Employee whose cells wrap, including words wider than their column"""
+    employee_data = make_timesheet_frame(rows=12, employees=1, seed=3)
+    employee_data["Project Manager"] = "Alexandra Konstantinopoulou-Vanderbilt (acting)"
+    employee_data["Email"] = "alexandra.konstantinopoulou.vanderbilt@example.com"
+    return employee_data
+
+
+CASES = {
+    "single_page": lambda: make_timesheet_frame(rows=8, employees=1, seed=1),
+    "multi_page": lambda: make_timesheet_frame(rows=120, employees=1, seed=2),
+    "wrapped_text": long_text_frame,
+}
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_canvas_engine_matches_platypus(generator, case):
+    employee_data = CASES[case]()
+
+    platypus_pdf = render(generator, "platypus", employee_data)
+    canvas_pdf = render(generator, "canvas", employee_data)
+
+    assert len(canvas_pdf) == len(platypus_pdf)
+    for platypus_page, canvas_page in zip(platypus_pdf, canvas_pdf):
+        expected_words = page_words(platypus_page)
+        words = page_words(canvas_page)
+        assert [word[0] for word in words] == [word[0] for word in expected_words]
+        for word, expected in zip(words, expected_words):
+            assert word[1:] == pytest.approx(expected[1:], abs=POSITION_TOLERANCE), word[0]
+    
+        bounds = drawing_bounds(canvas_page)
+        expected_bounds = drawing_bounds(platypus_page)
+        assert tuple(bounds) == pytest.approx(tuple(expected_bounds), abs=POSITION_TOLERANCE)
+    
+        difference = np.abs(page_pixels(canvas_page) - page_pixels(platypus_page))
+        assert (difference > 32).mean() < PIXEL_DIFF_TOLERANCE
+
+
+def test_platypus_reuses_cached_cell_layouts(generator):
+    employee_data = long_text_frame()
+    first_pdf = render(generator, "platypus", employee_data)
+    stats = generator.text_layout_cache.stats()
+
+    second_pdf = render(generator, "platypus", employee_data)
+
+    repeat_stats = generator.text_layout_cache.stats()
+    assert repeat_stats["misses"] == stats["misses"]
+    assert repeat_stats["hits"] > stats["hits"]
+    assert len(second_pdf) == len(first_pdf)
+    for first_page, second_page in zip(first_pdf, second_pdf):
+        assert page_words(second_page) == page_words(first_page)
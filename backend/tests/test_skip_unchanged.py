@@ -0,0 +1,53 @@
+"""
+Batch generation: unchanged-data skips (with the fallback when a PDF vanishes mid-run) and the inline file list
+"""
+
+import os
+
+from benchmarks.synthetic import make_timesheet_frame
+
+
+def test_unchanged_pdf_is_reused(generator):
+    employee_data = make_timesheet_frame(rows=6, employees=1, seed=11)
+    generator.generate_all_pdfs(employee_data, force_regenerate=True)
+
+    result = generator.generate_all_pdfs(employee_data)
+
+    assert result["skipped_unchanged"] == 1
+    assert result["successful_generations"] == 1
+
+
+def test_pdf_deleted_after_resolve_is_regenerated(generator, monkeypatch):
+    employee_data = make_timesheet_frame(rows=6, employees=1, seed=12)
+    generator.generate_all_pdfs(employee_data, force_regenerate=True)
+
+    resolve = generator.storage.resolve
+
+    def resolve_then_delete(filename):
+        # The file exists when resolved but is gone before it is stat'ed
+        path = resolve(filename)
+        if path is not None:
+            os.remove(path)
+        return path
+
+    monkeypatch.setattr(generator.storage, "resolve", resolve_then_delete)
+    result = generator.generate_all_pdfs(employee_data)
+    monkeypatch.undo()
+
+    assert result["skipped_unchanged"] == 0
+    assert result["failed_generations"] == 0
+    assert result["successful_generations"] == 1
+    filename = generator.get_pdf_filename(employee_data["User Name"].iloc[0])
+    assert generator.storage.resolve(filename) is not None
+
+
+def test_batch_response_lists_generated_files(generator):
+    employee_data = make_timesheet_frame(rows=12, employees=3, seed=13)
+
+    result = generator.generate_all_pdfs(employee_data, force_regenerate=True)
+
+    assert len(result["generated_files"]) == result["total_employees"]
+    assert result["generated_files_truncated"] is False
+    for entry in result["generated_files"]:
+        assert os.path.isfile(entry["file_path"])
+        assert entry["file_size"] == os.path.getsize(entry["file_path"])
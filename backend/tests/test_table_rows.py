@@ -0,0 +1,105 @@
+"""
+Columnar table rows must match the row-wise (iterrows) formatting they replaced
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from expected_format_pdf_generator import TABLE_HEADERS
+
+
+def iterrows_table_rows(employee_data, col_mapping):
+    """The original row-by-row formatting, kept verbatim as the reference"""
+    rows = []
+    for _, row in employee_data.iterrows():
+        row_data = []
+        for header in TABLE_HEADERS:
+            if header in col_mapping:
+                value = row.get(col_mapping[header], "")
+                if pd.isna(value):
+                    value = ""
+                elif isinstance(value, (int, float)):
+                    if header == "Regular Time (Hours)":
+                        value = str(int(value)) if not pd.isna(value) else ""
+                    else:
+                        value = str(value)
+                else:
+                    value = str(value)
+                row_data.append(value)
+            else:
+                row_data.append("")
+        rows.append(row_data)
+    return rows
+
+
+def frame(hours, mixed=True, **columns):
+    """Four-row employee frame; mixed adds a string column like real workbooks have"""
+    data = {"Regular Time (Hours)": hours}
+    if mixed:
+        data["User Name"] = ["Ann Lee"] * 4
+    data.update(columns)
+    return pd.DataFrame(data)
+
+
+FRAMES = {
+    "bool_hours": frame(pd.Series([True, False, True, False])),
+    "bool_column": frame([8.0, 7.5, 8.0, 1.0], **{"Task Billability": [True, False, True, True]}),
+    "bool_with_missing": frame([8.0, 7.5, 8.0, 1.0], **{"Task Billability": [True, False, None, True]}),
+    "all_bool": frame(pd.Series([True, False, True, True]), mixed=False, **{"Task Billability": [False] * 4}),
+    "float32_hours": frame(
+        pd.Series([1.5, 2.0, np.nan, 8.25], dtype="float32"),
+        **{"Project Code": pd.Series([0.1, 2.5, np.nan, 1e16], dtype="float32")}
+    ),
+    "all_float32": frame(
+        pd.Series([1.5, 2.0, np.nan, 8.25], dtype="float32"), mixed=False,
+        **{"Project Code": pd.Series([0.1, 2.5, 3.0, 4.0], dtype="float32")}
+    ),
+    "all_numeric_mixed_widths": frame(
+        pd.Series([1.5, 2.0, np.nan, 8.25], dtype="float32"), mixed=False,
+        **{"EMP ID": pd.Series([101, 102, 103, 104], dtype="int64")}
+    ),
+    "float64": frame([1.9, -2.5, np.nan, 1e16], **{"Project Code": [0.1, 1e16, 1e-7, np.nan]}),
+    "int_and_uint": frame(
+        pd.Series([8, 7, 0, 1], dtype="int64"),
+        **{"EMP ID": pd.Series([1, 2, 3, 2 ** 63], dtype="uint64")}
+    ),
+    "nullable_int": frame(
+        pd.Series([8, None, 3, 4], dtype="Int64"),
+        **{"EMP ID": pd.Series([7, None, 9, 1], dtype="Int64")}
+    ),
+    "datetime": frame(
+        [8.0, 8.0, 8.0, 8.0],
+        Date=pd.to_datetime(["2024-01-01", None, "2024-01-03 10:30", "2024-01-04"], format="mixed")
+    ),
+    "datetime_subsecond": frame(
+        [8.0, 8.0, 8.0, 8.0],
+        Date=pd.to_datetime(["2024-01-01 00:00:00.5", None, "2024-01-03", "2024-01-04"], format="mixed")
+    ),
+    "categorical": frame(
+        pd.Categorical([1.5, 2.5, None, 1.5]),
+        Task=pd.Categorical(["Design", "Build", None, "Design"])
+    ),
+    "object_mixed": frame(
+        pd.Series([8, 7.5, None, True], dtype=object),
+        Project=pd.Series(["A", 1, 2.5, None], dtype=object)
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(FRAMES))
+def test_columnar_rows_match_iterrows(generator, name):
+    employee_data = FRAMES[name]
+    col_mapping = generator.build_column_mapping(employee_data.columns)
+    
+    rows = generator.build_table_rows(employee_data, col_mapping)
+    
+    assert rows == iterrows_table_rows(employee_data, col_mapping)
+    assert all(isinstance(value, str) for row in rows for value in row)
+
+
+def test_bool_hours_column_builds_a_table(generator):
+    table_data = generator.create_table_data(FRAMES["bool_hours"])
+    
+    # Header row plus one row per employee row (an error returns [])
+    assert len(table_data) == 5
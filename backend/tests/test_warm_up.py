@@ -0,0 +1,85 @@
+"""
+Startup warm-up renders a throwaway PDF without touching the stage metrics,
+and a service still being built holds up neither other services nor the event loop
+"""
+
+import asyncio
+import io
+import threading
+
+from benchmarks.synthetic import make_timesheet_frame
+from services.container import ServiceContainer
+from utils import metrics
+
+
+def stage_counts():
+    return {key: sum(counts) for key, (counts, _) in metrics.stage_seconds._values.items()}
+
+
+def test_warm_up_is_not_recorded_as_stages():
+    container = ServiceContainer()
+    before = stage_counts()
+
+    report = container.warm_up(prime_caches=True)
+
+    assert report["phases"]["render"]["error"] is None
+    assert stage_counts() == before
+
+
+def test_stages_are_recorded_outside_warm_up(generator):
+    before = stage_counts().get(("render",), 0)
+
+    employee_data = make_timesheet_frame(rows=3, employees=1, seed=5)
+    generator.render_pdf(io.BytesIO(), employee_data, "Doe, John", "E10000")
+
+    assert stage_counts()[("render",)] == before + 1
+
+
+
+def start_slow_build(container, name):
+    """Build a service on another thread until the returned event is set"""
+    building, release = threading.Event(), threading.Event()
+
+    def slow_build():
+        building.set()
+        release.wait(5)
+        return object()
+
+    thread = threading.Thread(target=container._get, args=(name, slow_build))
+    thread.start()
+    assert building.wait(5)
+    return release, thread
+
+
+def test_slow_build_does_not_hold_up_other_services():
+    container = ServiceContainer()
+    release, thread = start_slow_build(container, "pdf_generator")
+    try:
+        built = []
+        other = threading.Thread(target=lambda: built.append(container._get("excel_service", object)))
+        other.start()
+        other.join(1)
+        assert built
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_resolve_waits_for_a_build_off_the_event_loop():
+    container = ServiceContainer()
+    release, thread = start_slow_build(container, "pdf_generator")
+
+    async def scenario():
+        pending = asyncio.ensure_future(container.resolve("pdf_generator"))
+        # The loop keeps running while resolve() waits for the build
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+        release.set()
+        return await pending
+
+    try:
+        instance = asyncio.run(scenario())
+    finally:
+        release.set()
+        thread.join()
+    assert instance is container._instances["pdf_generator"]
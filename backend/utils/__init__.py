@@ -4,7 +4,36 @@ Common helper functions used across the application
 """
 
 from .file_utils import validate_filename, sanitize_path
-from .logging_utils import setup_logging, get_logger
+from .logging_utils import setup_logging, get_logger, log_context, bind_log_context, reset_log_context
+from .text_layout_cache import TextLayoutCache
+from .zip_stream import iter_zip_stream
+from .pdf_storage import PDFStorage
+from .pdf_index import PDFIndex
+from .http_cache import make_etag, is_not_modified, not_modified_response, validator_headers
+from .event_bus import EventBus, event_bus, format_sse
+from .job_registry import JobRegistry, job_registry
+from .metrics import MetricsRegistry, registry, stage_timer, request_timings
+from .memory_profiler import MemoryProfiler, memory_profiler
+from .file_lock import FileLock, GenerationCounter
+from .snapshot_store import SnapshotStore, SnapshotLease
 
-__all__ = ['validate_filename', 'sanitize_path', 'setup_logging', 'get_logger']
+
+# GroupIndex needs pandas/numpy, so it is imported on first access
+def __getattr__(name):
+    if name == 'GroupIndex':
+        from .group_index import GroupIndex
+        return GroupIndex
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    'validate_filename', 'sanitize_path', 'setup_logging', 'get_logger',
+    'log_context', 'bind_log_context', 'reset_log_context',
+    'TextLayoutCache', 'iter_zip_stream', 'PDFStorage', 'PDFIndex',
+    'make_etag', 'is_not_modified', 'not_modified_response', 'validator_headers',
+    'EventBus', 'event_bus', 'format_sse', 'JobRegistry', 'job_registry',
+    'GroupIndex', 'MetricsRegistry', 'registry', 'stage_timer', 'request_timings',
+    'MemoryProfiler', 'memory_profiler', 'FileLock', 'GenerationCounter',
+    'SnapshotStore', 'SnapshotLease'
+]
 
@@ -0,0 +1,104 @@
+"""
+Event Bus
+In-process publish/subscribe used to push change notifications to clients
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Event types published by the application
+SNAPSHOT_UPLOADED = "snapshot-uploaded"
+SNAPSHOT_CLEARED = "snapshot-cleared"
+PDF_CREATED = "pdf-created"
+PDF_DELETED = "pdf-deleted"
+JOB_PROGRESS = "job-progress"
+
+
+class EventBus:
+    """
+    Fans published events out to every subscriber.
+
+    publish() is safe to call from any thread (request handlers run generation
+    in the threadpool and report progress from there); each subscriber owns a
+    bounded asyncio.Queue on its own loop.
+    A subscriber that falls behind loses its oldest events rather than
+    blocking publishers, which is fine for notifications that only tell the
+    client to refetch.
+    """
+
+    def __init__(self, max_queue_size: int = 256):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Publish an event to all current subscribers.
+
+        Args:
+            event_type: One of the event type constants
+            data: JSON-serialisable payload
+        """
+        event = {
+            "id": next(self._ids),
+            "type": event_type,
+            "data": data or {},
+            "timestamp": time.time(),
+        }
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # Subscriber's loop already closed; it unsubscribes on its way out
+                pass
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        """
+        Register a subscriber for the duration of the with block.
+
+        Must be entered from a coroutine; events arrive on the returned queue.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        token = object()
+        with self._lock:
+            self._subscribers[id(token)] = (asyncio.get_running_loop(), queue)
+        logger.debug(f"🔍 Event subscriber connected ({self.subscriber_count} total)")
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                self._subscribers.pop(id(token), None)
+            logger.debug(f"🔍 Event subscriber disconnected ({self.subscriber_count} total)")
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Serialise an event as a Server-Sent Events message"""
+    payload = json.dumps({**event["data"], "timestamp": event["timestamp"]})
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+
+# Shared bus for the whole process
+event_bus = EventBus()
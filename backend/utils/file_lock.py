@@ -0,0 +1,204 @@
+"""
+File Lock
+Advisory locks and counters on disk, shared by all worker processes on a host
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import ctypes
+    import msvcrt
+    from ctypes import wintypes
+
+    class _Overlapped(ctypes.Structure):
+        _fields_ = [
+            ("Internal", ctypes.c_void_p),
+            ("InternalHigh", ctypes.c_void_p),
+            ("Offset", wintypes.DWORD),
+            ("OffsetHigh", wintypes.DWORD),
+            ("hEvent", wintypes.HANDLE),
+        ]
+
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _kernel32.LockFileEx.argtypes = [
+        wintypes.HANDLE, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD,
+        ctypes.POINTER(_Overlapped),
+    ]
+    _kernel32.LockFileEx.restype = wintypes.BOOL
+    _kernel32.UnlockFileEx.argtypes = [
+        wintypes.HANDLE, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD, ctypes.POINTER(_Overlapped),
+    ]
+    _kernel32.UnlockFileEx.restype = wintypes.BOOL
+    LOCKFILE_FAIL_IMMEDIATELY = 0x1
+    LOCKFILE_EXCLUSIVE_LOCK = 0x2
+    ERROR_LOCK_VIOLATION = 33
+
+
+class FileLock:
+    """
+    Advisory lock on a lock file, usable across processes and threads.
+
+    Every acquisition opens its own descriptor, and flock() treats separate
+    descriptors independently, so the lock excludes other threads of this
+    process as well as other workers. Shared (read) locks may be held
+    together; an exclusive lock waits for all of them. On Windows the same
+    semantics come from LockFileEx on the file's first byte.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def _open(self) -> int:
+        return os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def _lock(self, fd: int, shared: bool, blocking: bool) -> bool:
+        if fcntl is not None:
+            flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            if not blocking:
+                flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(fd, flags)
+            except BlockingIOError:
+                return False
+            return True
+        flags = 0 if shared else LOCKFILE_EXCLUSIVE_LOCK
+        if not blocking:
+            flags |= LOCKFILE_FAIL_IMMEDIATELY
+        handle = msvcrt.get_osfhandle(fd)
+        if _kernel32.LockFileEx(handle, flags, 0, 1, 0, ctypes.byref(_Overlapped())):
+            return True
+        error = ctypes.get_last_error()
+        if error == ERROR_LOCK_VIOLATION:
+            return False
+        raise ctypes.WinError(error)
+
+    def acquire(self, shared: bool = False, blocking: bool = True) -> Optional[int]:
+        """
+        Take the lock.
+
+        Args:
+            shared: Take a shared (read) lock instead of an exclusive one
+            blocking: Wait for the lock; otherwise give up immediately
+
+        Returns:
+            Descriptor to pass to release(), or None if not acquired
+        """
+        while True:
+            fd = self._open()
+            try:
+                if not self._lock(fd, shared, blocking):
+                    os.close(fd)
+                    return None
+                # The file may have been unlinked (release(unlink=True)) while we
+                # waited; a lock on the orphaned inode would exclude nobody
+                try:
+                    if os.stat(self.path).st_ino == os.fstat(fd).st_ino:
+                        return fd
+                except FileNotFoundError:
+                    pass
+            except BaseException:
+                os.close(fd)
+                raise
+            os.close(fd)
+
+    def release(self, fd: int, unlink: bool = False) -> None:
+        """
+        Release a lock taken with acquire().
+
+        Args:
+            fd: Descriptor returned by acquire()
+            unlink: Remove the lock file first (for per-item locks that are done)
+        """
+        if fcntl is None:
+            # Windows can't remove a file that is still open, so unlink last
+            try:
+                _kernel32.UnlockFileEx(msvcrt.get_osfhandle(fd), 0, 1, 0, ctypes.byref(_Overlapped()))
+            finally:
+                os.close(fd)
+            if unlink:
+                try:
+                    os.unlink(self.path)
+                except OSError:
+                    pass  # already gone, or opened again by the next holder
+            return
+        try:
+            if unlink:
+                try:
+                    os.unlink(self.path)
+                except FileNotFoundError:
+                    pass
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Hold the lock exclusively for the duration of the block"""
+        fd = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(fd)
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """Hold a shared (read) lock for the duration of the block"""
+        fd = self.acquire(shared=True)
+        try:
+            yield
+        finally:
+            self.release(fd)
+
+    def is_held(self) -> bool:
+        """Whether some thread or process currently holds the lock exclusively"""
+        if not os.path.exists(self.path):
+            return False
+        fd = self.acquire(shared=True, blocking=False)
+        if fd is None:
+            return True
+        self.release(fd)
+        return False
+
+
+class GenerationCounter:
+    """
+    Monotonic counter in a small file, bumped whenever shared state is republished.
+
+    Reading it is a single small file read, so workers can compare it on
+    every request to notice that another process published a new version.
+    Writers bump it while holding the lock that guards the state; the new
+    value is written to a temp file and renamed over the old one, so readers
+    never see a partial value.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def read(self) -> int:
+        """Current generation (0 if never bumped)"""
+        try:
+            with open(self.path, "rb") as counter_file:
+                return int(counter_file.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump(self) -> int:
+        """
+        Increment the counter. Callers must hold the lock guarding the state.
+
+        Returns:
+            New generation
+        """
+        generation = self.read() + 1
+        temp_path = f"{self.path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+        with open(temp_path, "wb") as counter_file:
+            counter_file.write(str(generation).encode("ascii"))
+        os.replace(temp_path, self.path)
+        return generation
@@ -0,0 +1,132 @@
+"""
+Group Index
+Per-employee row offsets computed once per snapshot and reused across requests
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .metrics import cache_hits, cache_misses
+
+logger = logging.getLogger(__name__)
+
+# Attribute ExcelService stamps on frames loaded from a snapshot
+SNAPSHOT_ATTR = "snapshot_version"
+
+
+class GroupIndex:
+    """
+    Employee grouping of a frame as one sorted copy plus an offsets array.
+
+    Iterating a DataFrameGroupBy materialises a new frame per employee.
+    Here the frame is reordered once so each employee's rows are contiguous,
+    and employee i is simply frame.iloc[offsets[i]:offsets[i + 1]], a slice
+    that shares the sorted frame's data. Keys, group order and row order
+    within a group match df.groupby([name_col, id_col]) (rows with a missing
+    key are dropped, as groupby does), so it is a drop-in replacement for
+    `for (user_name, emp_id), group in df.groupby(...)`.
+    """
+
+    def __init__(self, df: pd.DataFrame, name_col: str, id_col: str):
+        grouped = df.groupby([name_col, id_col], sort=True)
+        codes = grouped.ngroup().to_numpy()
+        sizes = grouped.size()
+
+        rows = np.flatnonzero(codes >= 0)
+        order = rows[np.argsort(codes[rows], kind="stable")]
+
+        self.frame = df.take(order)
+        self.keys: List[Tuple[Hashable, Hashable]] = list(sizes.index)
+        self.offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes.to_numpy(), out=self.offsets[1:])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self) -> Iterator[Tuple[Tuple[Hashable, Hashable], pd.DataFrame]]:
+        for position, key in enumerate(self.keys):
+            yield key, self.group_at(position)
+
+    def group_at(self, position: int) -> pd.DataFrame:
+        """Rows of the employee at the given position, as a slice of the sorted frame"""
+        return self.frame.iloc[self.offsets[position]:self.offsets[position + 1]]
+
+    @classmethod
+    def for_frame(cls, df: pd.DataFrame, name_col: str, id_col: str) -> "GroupIndex":
+        """
+        Return the group index for a frame, reusing a cached one when possible.
+
+        Frames derived from a snapshot carry its version in df.attrs (pandas
+        keeps attrs through filtering), so the cache key is that version plus
+        the surviving row labels: the same snapshot with the same filters maps
+        to the same index. Frames without a snapshot version are never cached.
+        """
+        version = df.attrs.get(SNAPSHOT_ATTR)
+        if version is None:
+            return cls(df, name_col, id_col)
+
+        row_hashes = pd.util.hash_pandas_object(df.index, index=False).to_numpy()
+        rows_digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+        key = (version, name_col, id_col, tuple(df.columns), rows_digest)
+        cached = _cache.get(key)
+        if cached is not None:
+            cache_hits.inc(cache="group_index")
+            logger.debug(f"🔍 Reusing employee group index for snapshot {version}")
+            return cached
+        cache_misses.inc(cache="group_index")
+
+        group_index = cls(df, name_col, id_col)
+        _cache.put(key, group_index)
+        return group_index
+
+
+class _GroupIndexCache:
+    """
+    Small LRU of recently built group indexes (one per snapshot/filter combination).
+
+    Each entry holds a sorted copy of its frame, so the cache is bounded by
+    total rows as well as entries; an index larger than the row budget is
+    used for its own request and never retained.
+    """
+
+    def __init__(self, max_entries: int = 4, max_rows: int = 2_000_000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries: "OrderedDict[tuple, GroupIndex]" = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[GroupIndex]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, group_index: GroupIndex) -> None:
+        rows = len(group_index.frame)
+        if rows > self.max_rows:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._rows -= len(previous.frame)
+            self._entries[key] = group_index
+            self._rows += rows
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                _, evicted = self._entries.popitem(last=False)
+                self._rows -= len(evicted.frame)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+
+_cache = _GroupIndexCache()
@@ -0,0 +1,75 @@
+"""
+HTTP Caching Utilities
+Version-based ETag / Last-Modified validators for polled endpoints
+"""
+
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a weak ETag from version components.
+
+    Args:
+        *parts: Values identifying the representation (versions, query params, ...)
+
+    Returns:
+        ETag header value, e.g. W/"3f2a..."
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def validator_headers(etag: str, last_modified: Optional[float] = None) -> Dict[str, str]:
+    """
+    Headers attached to both 200 and 304 responses.
+
+    no-cache lets browsers store the response but forces them to revalidate
+    on every poll, which is what turns repeat polls into cheap 304s.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """
+    Evaluate the request's conditional headers against the current validators.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    it is absent (RFC 9110 section 13.2.2).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: ignore W/ prefixes
+        wanted = etag[2:] if etag.startswith("W/") else etag
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == wanted:
+                return True
+        return False
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(last_modified) <= since
+    return False
+
+
+def not_modified_response(etag: str, last_modified: Optional[float] = None) -> Response:
+    """Build an empty 304 response carrying the validators"""
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
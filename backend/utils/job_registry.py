@@ -0,0 +1,80 @@
+"""
+Job Registry
+In-memory status of background jobs started by the API
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class JobRegistry:
+    """
+    Tracks background jobs so clients can poll their progress.
+
+    Jobs are plain dicts (job_id, kind, status, processed, total, started,
+    finished, error, plus any extra fields). Only the most recent max_jobs
+    are kept; progress is also pushed over the event bus by the callers.
+    """
+
+    def __init__(self, max_jobs: int = 100):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, kind: str, total: int = 0, **fields) -> Dict[str, Any]:
+        """
+        Register a new running job.
+
+        Args:
+            kind: Job type, e.g. "delete-all"
+            total: Expected number of items to process
+            **fields: Extra fields stored on the job
+
+        Returns:
+            Copy of the new job
+        """
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "kind": kind,
+            "status": "running",
+            "processed": 0,
+            "total": total,
+            "started": time.time(),
+            "finished": None,
+            "error": None,
+            **fields,
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+            return dict(job)
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """
+        Update a job's fields; a terminal status also stamps the finish time.
+
+        Returns:
+            Copy of the updated job, or None if it is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            if fields.get("status") in ("completed", "failed") and job["finished"] is None:
+                job["finished"] = time.time()
+            return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a job, if known"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+# Shared registry for the whole process
+job_registry = JobRegistry()
@@ -3,25 +3,141 @@ Logging Utility Functions
 Enterprise-level logging configuration
 """
 
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+import queue
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, Iterator, Optional
+
+# Fields bound to the current context (e.g. run_id) and stamped on every record
+_log_context: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+# Listener draining the log queue, replaced on every setup_logging call
+_listener: Optional[QueueListener] = None
+
+
+def bind_log_context(**fields) -> Token:
+    """
+    Add fields to every log record emitted in the current context.
+    
+    Args:
+        **fields: Context fields, e.g. run_id
+    
+    Returns:
+        Token for reset_log_context
+    """
+    return _log_context.set({**_log_context.get(), **fields})
+
+
+def reset_log_context(token: Token) -> None:
+    """Restore the log context from before the matching bind_log_context call"""
+    _log_context.reset(token)
+
+
+@contextmanager
+def log_context(**fields) -> Iterator[None]:
+    """Bind log context fields for the duration of the block"""
+    token = bind_log_context(**fields)
+    try:
+        yield
+    finally:
+        reset_log_context(token)
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the bound log context on records; run_id defaults to '-' for text formats"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _log_context.get().items():
+            setattr(record, key, value)
+        if not hasattr(record, "run_id"):
+            record.run_id = "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the message, source, context and extra fields"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if entry.get("run_id") == "-":
+            del entry["run_id"]
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _ContextQueueHandler(QueueHandler):
+    """
+    QueueHandler that keeps records structured for the listener's formatters.
+    
+    The stock prepare() pre-formats the whole record into its message, which
+    would bury tracebacks inside the JSON "message". Here only the arguments
+    are merged, so the listener thread never formats the caller's objects,
+    and the traceback is rendered to exc_text for the formatter to place.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def setup_logging(
     log_level: str = "INFO",
     log_file: Optional[str] = None,
-    format_string: Optional[str] = None
+    format_string: Optional[str] = None,
+    log_format: str = "text",
+    async_logging: bool = True
 ) -> None:
     """
     Configure enterprise-level logging.
     
+    Console and file output are written by a QueueListener thread: the
+    logging call only enqueues the record, so request and generation threads
+    never wait on formatting or console/file I/O.
+    
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional log file path
-        format_string: Optional custom format string
+        format_string: Optional custom format string (text format only)
+        log_format: "text" or "json" (one JSON object per line)
+        async_logging: Write through a background QueueListener
     """
+    global _listener
     if format_string is None:
         format_string = (
             '%(asctime)s - %(name)s - %(levelname)s - '
@@ -30,21 +146,26 @@ def setup_logging(
     
     # Get log level
     level = getattr(logging, log_level.upper(), logging.INFO)
+    if log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(format_string)
     
     # Configure root logger
     logging.root.setLevel(level)
     
-    # Remove existing handlers
+    # Remove existing handlers (and the listener feeding them)
+    _stop_listener()
     logging.root.handlers = []
     
     # Console handler (for Azure App Service logs)
     console_handler = logging.StreamHandler()
     console_handler.setLevel(level)
-    console_formatter = logging.Formatter(format_string)
-    console_handler.setFormatter(console_formatter)
-    logging.root.addHandler(console_handler)
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
     
     # File handler (if specified)
+    file_error = None
     if log_file:
         try:
             # Ensure log directory exists
@@ -58,11 +179,32 @@ def setup_logging(
                 backupCount=5
             )
             file_handler.setLevel(level)
-            file_formatter = logging.Formatter(format_string)
-            file_handler.setFormatter(file_formatter)
-            logging.root.addHandler(file_handler)
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
         except Exception as e:
-            logging.warning(f"Could not set up file logging: {e}")
+            file_error = e
+    
+    if async_logging:
+        queue_handler = _ContextQueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(ContextFilter())
+        logging.root.addHandler(queue_handler)
+        _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            handler.addFilter(ContextFilter())
+            logging.root.addHandler(handler)
+    
+    if file_error is not None:
+        logging.warning(f"Could not set up file logging: {file_error}")
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background listener"""
+    _stop_listener()
+
+
+atexit.register(shutdown_logging)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -71,9 +213,8 @@ def get_logger(name: str) -> logging.Logger:
     
     Args:
         name: Logger name (typically __name__)
-        
+    
     Returns:
         Logger instance
     """
     return logging.getLogger(name)
-
@@ -0,0 +1,233 @@
+"""
+Memory Profiler
+Opt-in tracemalloc and RSS readings at pipeline stage boundaries
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (None where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """High-water mark of the resident set size in bytes (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _Frame:
+    """Readings for one stage while it is running"""
+
+    __slots__ = ("stage", "start_current", "peak", "start_rss", "started")
+
+    def __init__(self, stage: str, start_current: int, start_rss: Optional[int]):
+        self.stage = stage
+        self.start_current = start_current
+        self.peak = start_current
+        self.start_rss = start_rss
+        self.started = time.perf_counter()
+
+
+class MemoryProfiler:
+    """
+    Records traced-allocation and RSS deltas for each pipeline stage.
+
+    Disabled by default; while disabled, stage() is a no-op. When enabled,
+    tracemalloc runs for the whole process and every stage_timer block
+    becomes a stage boundary: the stage's peak delta is the highest traced
+    allocation above its starting point, its net delta what it left
+    allocated. Nested stages (table_build inside a run) fold their peak into
+    the enclosing stage. tracemalloc's peak is process-wide, so readings
+    from concurrent requests overlap; profile one large request at a time
+    for exact attribution.
+    """
+
+    def __init__(self, frames: int = 1, log_threshold_mb: float = 10.0, history: int = 200):
+        self.frames = frames
+        self.log_threshold = int(log_threshold_mb * _MB)
+        self._enabled = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._recent: "deque[Dict[str, Any]]" = deque(maxlen=history)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def configure(self, frames: Optional[int] = None, log_threshold_mb: Optional[float] = None) -> None:
+        """
+        Adjust traceback depth and the INFO logging threshold.
+
+        Args:
+            frames: Stack frames kept per allocation (takes effect on the next enable)
+            log_threshold_mb: Stage peak delta above which readings are logged at INFO
+        """
+        if frames is not None:
+            self.frames = max(1, frames)
+        if log_threshold_mb is not None:
+            self.log_threshold = int(log_threshold_mb * _MB)
+
+    def enable(self) -> None:
+        """Start tracemalloc (if needed) and begin recording stages"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._enabled = True
+        logger.info(f"🧠 Memory profiling enabled (tracemalloc, {self.frames} frame(s))")
+
+    def disable(self) -> None:
+        """Stop recording and stop tracemalloc, releasing its bookkeeping"""
+        self._enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        logger.info("🧠 Memory profiling disabled")
+
+    def reset(self) -> None:
+        """Forget recorded stage statistics"""
+        with self._lock:
+            self._stages.clear()
+            self._recent.clear()
+
+    def _stack(self) -> List[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Take readings at the start and end of the enclosed stage"""
+        if not self._enabled or not tracemalloc.is_tracing():
+            yield
+            return
+
+        stack = self._stack()
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, peak)
+        tracemalloc.reset_peak()
+        frame = _Frame(stage, current, current_rss())
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            if tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                frame.peak = max(frame.peak, peak)
+                if stack:
+                    stack[-1].peak = max(stack[-1].peak, frame.peak)
+                tracemalloc.reset_peak()
+                self._record(frame, current)
+
+    def _record(self, frame: _Frame, end_current: int) -> None:
+        rss = current_rss()
+        reading = {
+            "stage": frame.stage,
+            "timestamp": time.time(),
+            "seconds": round(time.perf_counter() - frame.started, 4),
+            "peak_delta_bytes": frame.peak - frame.start_current,
+            "net_delta_bytes": end_current - frame.start_current,
+            "traced_bytes": end_current,
+            "rss_bytes": rss,
+            "rss_delta_bytes": rss - frame.start_rss if rss is not None and frame.start_rss is not None else None,
+        }
+        with self._lock:
+            self._recent.append(reading)
+            totals = self._stages.setdefault(frame.stage, {
+                "count": 0, "max_peak_delta_bytes": 0, "total_net_delta_bytes": 0, "max_rss_bytes": 0
+            })
+            totals["count"] += 1
+            totals["max_peak_delta_bytes"] = max(totals["max_peak_delta_bytes"], reading["peak_delta_bytes"])
+            totals["total_net_delta_bytes"] += reading["net_delta_bytes"]
+            totals["max_rss_bytes"] = max(totals["max_rss_bytes"], rss or 0)
+
+        # Per-employee stages stay at DEBUG unless they allocate a lot
+        message = (
+            f"🧠 Memory [{frame.stage}]: peak +{reading['peak_delta_bytes'] / _MB:.1f} MB, "
+            f"net {reading['net_delta_bytes'] / _MB:+.1f} MB, "
+            f"RSS {(rss or 0) / _MB:.1f} MB"
+        )
+        level = logging.INFO if reading["peak_delta_bytes"] >= self.log_threshold else logging.DEBUG
+        logger.log(level, message, extra={"memory": reading})
+
+    def top_allocators(self, limit: int = 20, group_by: str = "lineno") -> List[Dict[str, Any]]:
+        """
+        Largest live allocation sites right now.
+
+        Args:
+            limit: Number of sites to return
+            group_by: "lineno", "filename" or "traceback"
+
+        Returns:
+            List of dicts with location, size_bytes and count
+        """
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        return [
+            {
+                "location": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics(group_by)[:limit]
+        ]
+
+    def report(self, top: int = 20) -> Dict[str, Any]:
+        """Current readings, per-stage statistics, recent stage readings and top allocators"""
+        traced_current, traced_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        with self._lock:
+            stages = {stage: dict(totals) for stage, totals in self._stages.items()}
+            recent = list(self._recent)
+        return {
+            "enabled": self._enabled,
+            "rss_bytes": current_rss(),
+            "peak_rss_bytes": peak_rss(),
+            "traced_bytes": traced_current,
+            "traced_peak_bytes": traced_peak,
+            "stages": stages,
+            "recent": recent,
+            "top_allocators": self.top_allocators(top) if top > 0 else [],
+        }
+
+    def log_top_allocators(self, limit: int = 10) -> None:
+        """Log the largest live allocation sites"""
+        for entry in self.top_allocators(limit):
+            logger.info(
+                f"🧠 {entry['size_bytes'] / _MB:.1f} MB in {entry['count']} blocks at {entry['location'][-1]}"
+            )
+
+
+# Shared profiler for the whole process (enabled from settings at startup)
+memory_profiler = MemoryProfiler()
@@ -0,0 +1,278 @@
+"""
+Metrics
+Dependency-free Prometheus metrics and per-request stage timings
+"""
+
+import math
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .memory_profiler import memory_profiler
+
+# Pipeline stages timed by stage_timer()
+STAGES = ("upload", "load", "detect_columns", "filter", "group", "table_build", "render", "write")
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Metric:
+    """Base for labelled metrics; values are keyed by the label value tuple"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label key -> (per-bucket counts, sum)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and scrape-time collectors and renders the text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Add a callable returning exposition lines, evaluated on every scrape"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        for collector in collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.register(Histogram(
+    "timeguard_stage_seconds", "Time spent in each PDF pipeline stage", ("stage",)
+))
+pdfs_generated = registry.register(Counter(
+    "timeguard_pdfs_generated_total", "PDFs rendered successfully", ("mode",)
+))
+pdfs_failed = registry.register(Counter(
+    "timeguard_pdfs_failed_total", "PDF renders that failed", ("mode",)
+))
+pdf_bytes_written = registry.register(Counter(
+    "timeguard_pdf_bytes_written_total", "Bytes of PDF written to the output directory"
+))
+cache_hits = registry.register(Counter(
+    "timeguard_cache_hits_total", "Cache hits (snapshot frame, group index, unchanged PDFs)", ("cache",)
+))
+cache_misses = registry.register(Counter(
+    "timeguard_cache_misses_total", "Cache misses (snapshot frame, group index, unchanged PDFs)", ("cache",)
+))
+
+# Text layout caches live on generator instances; their stats are summed at scrape time
+_layout_caches: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def track_layout_cache(cache) -> None:
+    """Include a TextLayoutCache's hit/miss statistics in the scrape output"""
+    _layout_caches.add(cache)
+
+
+def _collect_layout_caches() -> List[str]:
+    totals = {"hits": 0, "misses": 0, "size": 0}
+    for cache in list(_layout_caches):
+        stats = cache.stats()
+        for field in totals:
+            totals[field] += stats[field]
+    return [
+        "# HELP timeguard_text_layout_cache_hits_total Cell layout cache hits",
+        "# TYPE timeguard_text_layout_cache_hits_total counter",
+        f"timeguard_text_layout_cache_hits_total {totals['hits']}",
+        "# HELP timeguard_text_layout_cache_misses_total Cell layout cache misses",
+        "# TYPE timeguard_text_layout_cache_misses_total counter",
+        f"timeguard_text_layout_cache_misses_total {totals['misses']}",
+        "# HELP timeguard_text_layout_cache_entries Cell layouts currently cached",
+        "# TYPE timeguard_text_layout_cache_entries gauge",
+        f"timeguard_text_layout_cache_entries {totals['size']}",
+    ]
+
+
+registry.register_collector(_collect_layout_caches)
+
+
+class RequestTimings:
+    """Seconds spent per stage while handling one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def breakdown(self) -> Dict[str, float]:
+        """Milliseconds per stage (in pipeline order) plus the request total so far"""
+        ordered = [stage for stage in STAGES if stage in self.stages]
+        ordered += [stage for stage in self.stages if stage not in STAGES]
+        result = {f"{stage}_ms": round(self.stages[stage] * 1000, 1) for stage in ordered}
+        result["total_ms"] = round((time.perf_counter() - self.started) * 1000, 1)
+        return result
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+_stage_metrics_disabled: ContextVar[bool] = ContextVar("stage_metrics_disabled", default=False)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record a stage duration in the histogram and the active request's breakdown"""
+    if _stage_metrics_disabled.get():
+        return
+    stage_seconds.observe(seconds, stage=stage)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Time the enclosed block as one pipeline stage (with memory readings when profiling)"""
+    if _stage_metrics_disabled.get():
+        yield
+        return
+    with memory_profiler.stage(stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            observe_stage(stage, time.perf_counter() - started)
+
+
+@contextmanager
+def request_timings() -> Iterator[RequestTimings]:
+    """Collect the stage timings of everything run inside the block"""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def stage_metrics_disabled() -> Iterator[None]:
+    """Run the block without recording stage timings or memory readings (e.g. startup warm-up)"""
+    token = _stage_metrics_disabled.set(True)
+    try:
+        yield
+    finally:
+        _stage_metrics_disabled.reset(token)
@@ -0,0 +1,227 @@
+"""
+PDF Index
+SQLite index of generated PDFs used for listing and unchanged-data skips
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SORT_COLUMNS = ("created", "filename", "file_size", "user_name", "emp_id")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdfs (
+    filename TEXT PRIMARY KEY,
+    user_name TEXT,
+    emp_id TEXT,
+    file_path TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    run_id TEXT,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pdfs_created ON pdfs (created);
+CREATE INDEX IF NOT EXISTS idx_pdfs_user_name ON pdfs (user_name);
+CREATE INDEX IF NOT EXISTS idx_pdfs_emp_id ON pdfs (emp_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('updated_at', 0);
+"""
+
+_COLUMNS = ("filename", "user_name", "emp_id", "file_path", "file_size", "created", "run_id", "content_hash")
+
+
+def _like_pattern(text: str) -> str:
+    """Substring LIKE pattern matching text literally (used with ESCAPE '\\')"""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class PDFIndex:
+    """
+    Embedded index of the PDFs in the output directory.
+
+    The generator records every file it writes and the delete endpoints drop
+    the files they remove, so listing never has to scan or stat the output
+    directory. The index is stored next to the PDFs and is rebuilt from disk
+    when it is first created (or on request).
+
+    Every change bumps a generation counter, which callers use as a cheap
+    version of the output directory (e.g. for HTTP validators).
+    """
+
+    FILENAME = ".pdf_index.sqlite3"
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, self.FILENAME)
+        os.makedirs(output_dir, exist_ok=True)
+        self.is_new = not os.path.exists(self.path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def record(self, filename: str, file_path: str, file_size: int, user_name: str = "",
+               emp_id: str = "", run_id: Optional[str] = None,
+               content_hash: Optional[str] = None, created: Optional[float] = None) -> None:
+        """
+        Insert or replace the entry for a generated PDF.
+
+        Args:
+            filename: PDF filename
+            file_path: Path the file was written to
+            file_size: Size in bytes
+            user_name: Employee name
+            emp_id: Employee ID
+            run_id: Generation run that wrote the file
+            content_hash: Hash of the employee rows the PDF was rendered from
+            created: Creation timestamp (defaults to now)
+        """
+        self.record_many([(
+            filename, user_name, emp_id, file_path, file_size,
+            created if created is not None else time.time(), run_id, content_hash
+        )])
+
+    def record_many(self, rows: Iterable[Tuple]) -> None:
+        """Insert or replace several entries given as tuples in column order"""
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO pdfs ({', '.join(_COLUMNS)}) VALUES ({placeholders})", rows
+            )
+            self._bump_generation()
+
+    def remove(self, filename: str) -> None:
+        """Drop the entry for a deleted PDF"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pdfs WHERE filename = ?", (filename,))
+            self._bump_generation()
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pdfs")
+            self._bump_generation()
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for a PDF, if indexed"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM pdfs WHERE filename = ?", (filename,)).fetchone()
+        return dict(row) if row else None
+
+    def get_hash(self, filename: str) -> Optional[str]:
+        """Return the recorded content hash for a PDF, if any"""
+        entry = self.get(filename)
+        return entry["content_hash"] if entry else None
+
+    def query(self, search: Optional[str] = None, sort_by: str = "created", order: str = "desc",
+              limit: Optional[int] = None, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        List indexed PDFs.
+
+        Args:
+            search: Case-insensitive substring matched against filename, employee and EMP ID
+            sort_by: One of SORT_COLUMNS
+            order: "asc" or "desc"
+            limit: Maximum rows to return (None for all)
+            offset: Rows to skip
+
+        Returns:
+            Tuple of (rows, total matching rows)
+        """
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"sort_by must be one of {', '.join(SORT_COLUMNS)}")
+        direction = "ASC" if order.lower() == "asc" else "DESC"
+
+        where = ""
+        params: List[Any] = []
+        if search:
+            pattern = _like_pattern(search.lower())
+            where = (
+                "WHERE lower(filename) LIKE ? ESCAPE '\\' OR lower(user_name) LIKE ? ESCAPE '\\' "
+                "OR lower(emp_id) LIKE ? ESCAPE '\\'"
+            )
+            params = [pattern, pattern, pattern]
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM pdfs {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT * FROM pdfs {where} ORDER BY {sort_by} {direction}, filename ASC "
+                f"LIMIT ? OFFSET ?",
+                params + [limit if limit is not None else -1, offset]
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def generation(self) -> Tuple[int, float]:
+        """
+        Current version of the index.
+
+        Returns:
+            Tuple of (generation counter, timestamp of the last change)
+        """
+        with self._lock:
+            values = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        return int(values.get("generation", 0)), float(values.get("updated_at", 0))
+
+    def _bump_generation(self) -> None:
+        # Caller holds the lock and an open transaction
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+        self._conn.execute("UPDATE meta SET value = ? WHERE key = 'updated_at'", (time.time(),))
+
+    def count(self) -> int:
+        """Number of indexed PDFs"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pdfs").fetchone()[0]
+
+    def rebuild(self, storage) -> int:
+        """
+        Re-index the output directory from disk.
+
+        Content hashes already in the index are kept so unchanged-data skips
+        keep working after a rebuild.
+
+        Args:
+            storage: PDFStorage used to locate the files
+
+        Returns:
+            Number of indexed PDFs
+        """
+        with self._lock:
+            known = {
+                row["filename"]: dict(row)
+                for row in self._conn.execute("SELECT filename, user_name, emp_id, run_id, content_hash FROM pdfs")
+            }
+
+        rows = []
+        for filename, file_path in storage.iter_files():
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            entry = known.get(filename, {})
+            rows.append((
+                filename, entry.get("user_name", ""), entry.get("emp_id", ""), file_path,
+                stat.st_size, stat.st_ctime, entry.get("run_id"), entry.get("content_hash")
+            ))
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pdfs")
+            self._conn.executemany(
+                f"INSERT INTO pdfs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)})", rows
+            )
+            self._bump_generation()
+        logger.info(f"📊 PDF index rebuilt: {len(rows)} files")
+        return len(rows)
+
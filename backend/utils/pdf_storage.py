@@ -0,0 +1,235 @@
+"""
+PDF Storage
+Sharded on-disk layout and atomic writes for generated PDFs
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+LAYOUTS = ("flat", "sharded")
+TEMP_SUFFIX = ".tmp"
+# Hidden directories under the output root; never listed as PDFs or swapped out
+INCOMING_DIR = ".incoming"
+TRASH_DIR = ".trash"
+
+# Lock file guarding renames into and out of the layout
+LOCK_FILE = ".storage.lock"
+
+
+class PDFStorage:
+    """
+    Resolves where each generated PDF lives under the output directory.
+
+    In the "sharded" layout a PDF is stored in a subdirectory named after the
+    first characters of the MD5 of its filename (e.g. output/3f/Doe, John.pdf),
+    which keeps every directory small even with tens of thousands of files.
+    The "flat" layout keeps the original output/{filename} paths. Files left
+    at the top level by older versions are still found in either layout.
+
+    PDFs are always rendered to a temp file under the hidden .incoming
+    directory and os.replace()d into place, so a crash mid-render never leaves
+    a truncated PDF under its final name. Bulk deletes move the stored PDFs
+    into .trash with a handful of renames and reclaim them later; both steps
+    take the same per-root file lock, held across threads and worker
+    processes, so a writer's PDF either lands before the swap (and is deleted
+    with the rest) or in the fresh, empty layout.
+    """
+
+    def __init__(self, root: str, layout: str = "sharded", shard_width: int = 2):
+        if layout not in LAYOUTS:
+            logger.warning(f"⚠️ Unknown PDF output layout '{layout}', using 'sharded'")
+            layout = "sharded"
+        self.root = root
+        self.layout = layout
+        self.shard_width = shard_width
+        self._lock = FileLock(os.path.join(root, LOCK_FILE))
+
+    def shard_for(self, filename: str) -> str:
+        """Return the shard subdirectory for a filename ("" in the flat layout)"""
+        if self.layout == "flat":
+            return ""
+        return hashlib.md5(filename.encode("utf-8")).hexdigest()[:self.shard_width]
+
+    def path_for(self, filename: str) -> str:
+        """Return the path a PDF is written to in the current layout"""
+        return os.path.join(self.root, self.shard_for(filename), filename)
+
+    def resolve(self, filename: str) -> Optional[str]:
+        """
+        Find an existing PDF.
+
+        Args:
+            filename: PDF filename (no directory components)
+
+        Returns:
+            Path of the file, or None if it does not exist
+        """
+        path = self.path_for(filename)
+        if os.path.isfile(path):
+            return path
+        legacy_path = os.path.join(self.root, filename)
+        if legacy_path != path and os.path.isfile(legacy_path):
+            return legacy_path
+        return None
+
+    def iter_files(self) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate over all stored PDFs, whatever directory they live in.
+
+        Yields:
+            (filename, file_path) pairs; temp files from in-flight writes are skipped
+        """
+        if not os.path.isdir(self.root):
+            return
+        with os.scandir(self.root) as entries:
+            subdirs = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith("."):
+                        subdirs.append(entry.path)
+                elif self._is_pdf(entry.name):
+                    yield entry.name, entry.path
+        for subdir in subdirs:
+            with os.scandir(subdir) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False) and self._is_pdf(entry.name):
+                        yield entry.name, entry.path
+
+    @staticmethod
+    def _is_pdf(name: str) -> bool:
+        return name.endswith(".pdf") and not name.startswith(".")
+
+    @contextmanager
+    def atomic_write(self, filename: str) -> Iterator[str]:
+        """
+        Context manager yielding a temp path to render a PDF into.
+
+        On success the temp file is moved onto the final path in one step and
+        any top-level copy left by the flat layout is removed; on error the temp
+        file is deleted and the previous PDF (if any) is left untouched.
+
+        Args:
+            filename: Final PDF filename
+        """
+        final_path = self.path_for(filename)
+        incoming = os.path.join(self.root, INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{filename}.", suffix=TEMP_SUFFIX, dir=incoming)
+        os.close(fd)
+        try:
+            yield temp_path
+            with self._lock.exclusive():
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(temp_path, final_path)
+                legacy_path = os.path.join(self.root, filename)
+                if legacy_path != final_path and os.path.exists(legacy_path):
+                    os.unlink(legacy_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def write_bytes(self, filename: str, content: bytes) -> str:
+        """
+        Atomically store an in-memory PDF.
+
+        Returns:
+            Final path of the file
+        """
+        with self.atomic_write(filename) as temp_path:
+            with open(temp_path, "wb") as pdf_file:
+                pdf_file.write(content)
+        return self.path_for(filename)
+
+    def remove(self, filename: str) -> bool:
+        """
+        Delete a PDF from wherever it is stored.
+
+        Returns:
+            True if a file was deleted
+        """
+        path = self.resolve(filename)
+        if path is None:
+            return False
+        os.remove(path)
+        return True
+
+    def swap_out(self) -> Optional[str]:
+        """
+        Move every stored PDF into a new trash directory, leaving an empty layout.
+
+        Only the top-level entries are renamed (at most one per shard plus any
+        legacy flat files), so this takes milliseconds whatever the file count.
+        Hidden entries such as the index and in-flight temp files stay put.
+
+        Returns:
+            Path of the trash directory, or None if there was nothing to move
+        """
+        if not os.path.isdir(self.root):
+            return None
+        trash_path = os.path.join(
+            self.root, TRASH_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        )
+        moved = 0
+        with self._lock.exclusive():
+            with os.scandir(self.root) as entries:
+                targets = [
+                    entry for entry in entries
+                    if not entry.name.startswith(".")
+                    and (entry.is_dir(follow_symlinks=False) or self._is_pdf(entry.name))
+                ]
+            if targets:
+                os.makedirs(trash_path)
+            for entry in targets:
+                os.rename(entry.path, os.path.join(trash_path, entry.name))
+                moved += 1
+        if not moved:
+            return None
+        logger.info(f"📊 Moved {moved} output entries to {trash_path}")
+        return trash_path
+
+    def pending_trash(self) -> List[str]:
+        """Trash directories not yet reclaimed (e.g. left behind by a restart)"""
+        trash_root = os.path.join(self.root, TRASH_DIR)
+        if not os.path.isdir(trash_root):
+            return []
+        with os.scandir(trash_root) as entries:
+            return sorted(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+
+    @staticmethod
+    def reclaim(trash_path: str, progress: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Delete a trash directory produced by swap_out().
+
+        Args:
+            trash_path: Directory to remove
+            progress: Called with the running count of deleted files
+
+        Returns:
+            Number of files deleted
+        """
+        deleted = 0
+        for directory, _, files in os.walk(trash_path, topdown=False):
+            for name in files:
+                try:
+                    os.unlink(os.path.join(directory, name))
+                except FileNotFoundError:
+                    continue
+                deleted += 1
+                if progress is not None:
+                    progress(deleted)
+            try:
+                os.rmdir(directory)
+            except FileNotFoundError:
+                pass
+        return deleted
@@ -0,0 +1,217 @@
+"""
+Run Store
+SQLite checkpoints of batch generation runs so interrupted runs can resume
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    snapshot_hash TEXT,
+    snapshot_version TEXT,
+    inputs TEXT,
+    total INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    started REAL NOT NULL,
+    updated REAL NOT NULL,
+    finished REAL,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs (started);
+CREATE TABLE IF NOT EXISTS run_items (
+    run_id TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    emp_id TEXT NOT NULL,
+    filename TEXT,
+    content_hash TEXT,
+    status TEXT NOT NULL,
+    outcome TEXT,
+    file_size INTEGER,
+    error TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (run_id, user_name, emp_id)
+);
+CREATE INDEX IF NOT EXISTS idx_run_items_updated ON run_items (run_id, updated);
+"""
+
+# Run statuses
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class RunStore:
+    """
+    Durable record of each per-employee generation run.
+
+    A run stores its ID, the version and hash of the snapshot it read, the
+    request inputs needed to replay it (filters, custom condition, ...) and
+    one row per employee as soon as that employee's PDF is finished. After a restart the
+    run is still "running" here; resuming it replays the inputs and skips every
+    employee already completed with the same content hash.
+    """
+
+    FILENAME = ".pdf_runs.sqlite3"
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, self.FILENAME)
+        os.makedirs(output_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def start(self, run_id: str, total: int, snapshot_hash: Optional[str] = None,
+              inputs: Optional[Dict[str, Any]] = None, snapshot_version: Optional[str] = None) -> None:
+        """
+        Create a run, or mark an existing one as running again when resuming.
+
+        Args:
+            run_id: Run identifier
+            total: Number of employees selected by the run
+            snapshot_hash: Hash of the workbook the run reads
+            inputs: JSON-serialisable request inputs used to replay the run
+            snapshot_version: Snapshot version the run reads
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE runs SET status = ?, total = ?, snapshot_hash = COALESCE(?, snapshot_hash), "
+                "snapshot_version = COALESCE(?, snapshot_version), "
+                "attempts = attempts + 1, updated = ?, finished = NULL WHERE run_id = ?",
+                (RUNNING, total, snapshot_hash, snapshot_version, now, run_id)
+            ).rowcount
+            if not updated:
+                self._conn.execute(
+                    "INSERT INTO runs (run_id, status, snapshot_hash, snapshot_version, inputs, total, started, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, RUNNING, snapshot_hash, snapshot_version, json.dumps(inputs or {}), total, now, now)
+                )
+
+    def record_item(self, run_id: str, user_name: str, emp_id: str, filename: str,
+                    content_hash: Optional[str], status: str = COMPLETED,
+                    outcome: Optional[str] = None, file_size: int = 0,
+                    error: Optional[str] = None) -> None:
+        """
+        Checkpoint one employee of a run.
+
+        Args:
+            run_id: Run identifier
+            user_name: Employee name
+            emp_id: Employee ID
+            filename: PDF filename
+            content_hash: Hash of the rows the PDF was rendered from
+            status: COMPLETED or FAILED
+            outcome: What happened, e.g. "created", "regenerated", "skipped", "failed"
+            file_size: Size of the PDF in bytes
+            error: Failure reason
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO run_items "
+                "(run_id, user_name, emp_id, filename, content_hash, status, outcome, file_size, error, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, user_name, emp_id, filename, content_hash, status, outcome, file_size, error, now)
+            )
+            self._conn.execute("UPDATE runs SET updated = ? WHERE run_id = ?", (now, run_id))
+
+    def finish(self, run_id: str, status: str = COMPLETED,
+               summary: Optional[Dict[str, Any]] = None) -> None:
+        """Mark a run completed or failed, storing its summary counters"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, summary = ?, updated = ?, finished = ? WHERE run_id = ?",
+                (status, json.dumps(summary or {}), now, now, run_id)
+            )
+
+    def completed_items(self, run_id: str) -> Dict[Tuple[str, str], str]:
+        """
+        Employees a run has already finished.
+
+        Returns:
+            Mapping of (user_name, emp_id) to the content hash that was rendered
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_name, emp_id, content_hash FROM run_items WHERE run_id = ? AND status = ?",
+                (run_id, COMPLETED)
+            ).fetchall()
+        return {(row["user_name"], row["emp_id"]): row["content_hash"] for row in rows}
+
+    def list_items(self, run_id: str, status: Optional[str] = None, limit: int = 100,
+                   offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Page through a run's per-employee results in processing order.
+
+        Args:
+            run_id: Run identifier
+            status: Only COMPLETED or FAILED items (all if None)
+            limit: Maximum items to return
+            offset: Items to skip
+
+        Returns:
+            Tuple of (items, total matching items)
+        """
+        where = "WHERE run_id = ?"
+        params: List[Any] = [run_id]
+        if status:
+            where += " AND status = ?"
+            params.append(status)
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM run_items {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT user_name, emp_id, filename, status, outcome, file_size, error, updated "
+                f"FROM run_items {where} ORDER BY updated, rowid LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Return a run with its decoded inputs and per-status item counts"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM run_items WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall())
+        return self._decode(row, counts)
+
+    def list_runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent runs first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM runs ORDER BY started DESC LIMIT ?", (limit,)
+            ).fetchall()
+            counts: Dict[str, Dict[str, int]] = {}
+            for item in self._conn.execute(
+                "SELECT run_id, status, COUNT(*) AS n FROM run_items "
+                f"WHERE run_id IN ({', '.join('?' for _ in rows)}) GROUP BY run_id, status",
+                [row["run_id"] for row in rows]
+            ):
+                counts.setdefault(item["run_id"], {})[item["status"]] = item["n"]
+        return [self._decode(row, counts.get(row["run_id"], {})) for row in rows]
+
+    @staticmethod
+    def _decode(row: sqlite3.Row, counts: Dict[str, int]) -> Dict[str, Any]:
+        run = dict(row)
+        run["inputs"] = json.loads(run["inputs"] or "{}")
+        run["summary"] = json.loads(run["summary"] or "{}")
+        run["completed"] = counts.get(COMPLETED, 0)
+        run["failed"] = counts.get(FAILED, 0)
+        return run
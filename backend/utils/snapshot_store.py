@@ -0,0 +1,223 @@
+"""
+Snapshot Store
+Immutable, versioned copies of the uploaded workbook with an atomic "current" pointer
+"""
+
+import logging
+import os
+import shutil
+import time
+import uuid
+from typing import List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from .file_lock import FileLock, GenerationCounter
+
+logger = logging.getLogger(__name__)
+
+# Layout under the store root:
+#   CURRENT            name of the current version (absent when cleared)
+#   v000007/<workbook> one directory per published version, never modified
+#   .staging-*         uploads being written, moved into a version on publish
+CURRENT_FILE = "CURRENT"
+STAGING_PREFIX = ".staging-"
+PUBLISH_LOCK_FILE = ".publish.lock"
+GENERATION_FILE = ".generation"
+# Held shared by every lease on a version; garbage collection needs it exclusively
+REF_LOCK_FILE = ".ref.lock"
+
+# Staging files older than this were left behind by a crashed upload
+STAGING_MAX_AGE_SECONDS = 3600
+
+
+class SnapshotLease:
+    """
+    Reference to one snapshot version, keeping it on disk until released.
+
+    Works as a context manager; release() is idempotent. Coroutines use
+    "async with", which releases in the threadpool since releasing may wait
+    for the publish lock to garbage-collect.
+    """
+
+    def __init__(self, store: "SnapshotStore", version: str, lock: FileLock, fd: int):
+        self.store = store
+        self.version = version
+        self.path = store.workbook_path(version)
+        self._lock = lock
+        self._fd: Optional[int] = fd
+
+    def release(self) -> None:
+        """Drop the reference; the version is collected if it is no longer current"""
+        if self._fd is None:
+            return
+        self._lock.release(self._fd)
+        self._fd = None
+        if self.version != self.store.read_current():
+            self.store.collect_garbage()
+
+    def __enter__(self) -> "SnapshotLease":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    async def __aenter__(self) -> "SnapshotLease":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await run_in_threadpool(self.release)
+
+
+class SnapshotStore:
+    """
+    Publishes each upload as a new immutable version directory.
+
+    Publishing moves a finished workbook into a fresh version directory and
+    then rewrites the CURRENT pointer with an atomic rename, all under an
+    exclusive lock shared by every worker process. Readers lease a version
+    (a shared lock on the version's ref lock file), so a generation run keeps
+    reading the data it started with even if a new upload or a clear arrives
+    meanwhile. Versions that are neither current nor leased are removed by
+    collect_garbage(), which runs after every publish, clear and release.
+    """
+
+    def __init__(self, root: str, workbook_name: str):
+        self.root = root
+        self.workbook_name = workbook_name
+        os.makedirs(root, exist_ok=True)
+        self._lock = FileLock(os.path.join(root, PUBLISH_LOCK_FILE))
+        self._generation = GenerationCounter(os.path.join(root, GENERATION_FILE))
+        self._current_path = os.path.join(root, CURRENT_FILE)
+
+    def version_dir(self, version: str) -> str:
+        return os.path.join(self.root, version)
+
+    def workbook_path(self, version: str) -> str:
+        """Path of a version's workbook (read-only once published)"""
+        return os.path.join(self.root, version, self.workbook_name)
+
+    def staging_path(self, suffix: str = "") -> str:
+        """Hidden path in the store to write an upload to before publish()"""
+        return os.path.join(self.root, f"{STAGING_PREFIX}{uuid.uuid4().hex}{suffix}")
+
+    def read_current(self) -> Optional[str]:
+        """Current version without taking the lock (the pointer is replaced atomically)"""
+        try:
+            with open(self._current_path, "r", encoding="ascii") as pointer:
+                return pointer.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_current(self, version: Optional[str]) -> None:
+        if version is None:
+            try:
+                os.unlink(self._current_path)
+            except FileNotFoundError:
+                pass
+            return
+        temp_path = f"{self._current_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="ascii") as pointer:
+            pointer.write(version)
+        os.replace(temp_path, self._current_path)
+
+    def publish(self, source_path: str) -> Optional[SnapshotLease]:
+        """
+        Move a finished workbook in as a new version and make it current.
+
+        Args:
+            source_path: Workbook to publish (moved, not copied); must be on the
+                same filesystem, e.g. from staging_path()
+
+        Returns:
+            Lease on the new version, or None if source_path no longer exists
+            (another worker already published it)
+        """
+        with self._lock.exclusive():
+            if not os.path.exists(source_path):
+                return None
+            version = f"v{self._generation.bump():06d}"
+            while os.path.exists(self.version_dir(version)):
+                version = f"v{self._generation.bump():06d}"
+            os.makedirs(self.version_dir(version))
+            os.replace(source_path, self.workbook_path(version))
+            lease = self._lease(version)
+            self._write_current(version)
+        logger.info(f"📊 Published snapshot {version}")
+        self.collect_garbage()
+        return lease
+
+    def clear(self) -> Optional[str]:
+        """
+        Unset the current version; leased versions stay readable until released.
+
+        Returns:
+            The version that was current, or None if there was none
+        """
+        with self._lock.exclusive():
+            previous = self.read_current()
+            if previous is not None:
+                self._write_current(None)
+                self._generation.bump()
+        self.collect_garbage()
+        return previous
+
+    def _lease(self, version: str) -> SnapshotLease:
+        # Callers hold the publish lock, so collect_garbage() can't remove the version meanwhile
+        lock = FileLock(os.path.join(self.version_dir(version), REF_LOCK_FILE))
+        return SnapshotLease(self, version, lock, lock.acquire(shared=True))
+
+    def acquire(self, version: Optional[str] = None) -> Optional[SnapshotLease]:
+        """
+        Lease a version so it is not garbage-collected while in use.
+
+        Args:
+            version: Version to lease (the current one if omitted)
+
+        Returns:
+            Lease to release when done, or None if there is no such version
+        """
+        with self._lock.shared():
+            if version is None:
+                version = self.read_current()
+            if version is None or version.startswith(".") or os.sep in version:
+                return None
+            if not os.path.isfile(self.workbook_path(version)):
+                return None
+            return self._lease(version)
+
+    def collect_garbage(self) -> List[str]:
+        """
+        Remove versions that are neither current nor leased, and stale staging files.
+
+        Returns:
+            Versions removed
+        """
+        removed = []
+        now = time.time()
+        with self._lock.exclusive():
+            current = self.read_current()
+            with os.scandir(self.root) as entries:
+                candidates = list(entries)
+            for entry in candidates:
+                if entry.name.startswith(STAGING_PREFIX):
+                    try:
+                        if now - entry.stat().st_mtime > STAGING_MAX_AGE_SECONDS:
+                            os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                if entry.name.startswith(".") or entry.name == current or not entry.is_dir():
+                    continue
+                ref_lock = FileLock(os.path.join(entry.path, REF_LOCK_FILE))
+                fd = ref_lock.acquire(blocking=False)
+                if fd is None:
+                    continue  # still leased by a running job
+                # New leases are only taken under the publish lock we hold, so the
+                # ref lock can be closed before removal (Windows can't delete open files)
+                ref_lock.release(fd)
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed.append(entry.name)
+        if removed:
+            logger.info(f"📊 Garbage-collected snapshot versions: {', '.join(removed)}")
+        return removed
@@ -0,0 +1,83 @@
+"""
+Text Layout Cache
+Bounded LRU cache of measured and wrapped cell text shared across PDFs
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class TextLayoutCache:
+    """
+    Least-recently-used cache for text layouts.
+
+    Keys are tuples of the text, its font or paragraph style and the column
+    width; values are whatever the renderer computed for them (wrapped lines
+    and cell height for the canvas engine, parsed fragments and line breaks
+    for platypus Paragraphs).
+    Cell values such as project names, DU heads and billability labels repeat
+    across employees, so one cache instance is shared by every PDF a generator
+    renders.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached layout for key, computing and storing it on a miss.
+
+        Args:
+            key: Cache key, typically (text, font, size, width)
+            compute: Zero-argument callable producing the layout
+
+        Returns:
+            Cached or freshly computed layout
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries and reset statistics"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with size, hits, misses, evictions and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
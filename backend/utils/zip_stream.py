@@ -0,0 +1,90 @@
+"""
+Streaming ZIP Utilities
+Builds ZIP archives on the fly without a temporary file or in-memory archive
+"""
+
+import io
+import logging
+import os
+import zipfile
+from typing import Iterable, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only, non-seekable sink that buffers what ZipFile writes until drained.
+
+    Because it cannot seek, ZipFile writes each entry with a trailing data
+    descriptor instead of going back to patch the local header.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        """Return and clear everything written since the last drain"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip_stream(
+    files: Iterable[Tuple[str, str]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Stream a ZIP archive of files in chunks.
+
+    Entries use the stored (no compression) method since PDFs are already
+    compressed. Only one chunk of one file is held in memory at a time, so
+    memory stays flat regardless of how many files are bundled.
+
+    Args:
+        files: Iterable of (archive_name, file_path) pairs
+        chunk_size: Read size per chunk in bytes
+
+    Yields:
+        Consecutive pieces of the ZIP archive
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for arcname, file_path in files:
+            try:
+                info = zipfile.ZipInfo.from_file(file_path, arcname)
+            except FileNotFoundError:
+                # Deleted between listing and streaming - leave it out
+                logger.warning(f"⚠️ Skipping missing file in ZIP stream: {arcname}")
+                continue
+            info.compress_type = zipfile.ZIP_STORED
+
+            with open(file_path, "rb") as source, archive.open(info, mode="w") as entry:
+                while True:
+                    chunk = source.read(chunk_size)
+                    if not chunk:
+                        break
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+
+            # Data descriptor written when the entry closes
+            data = sink.drain()
+            if data:
+                yield data
+
+    # Central directory written when the archive closes
+    data = sink.drain()
+    if data:
+        yield data
@@ -15,6 +15,7 @@ import logger from '@/lib/logger'
 import { useExcelStatus } from '@/lib/hooks/useExcelStatus'
 import { useGeneratedPDFs } from '@/lib/hooks/useGeneratedPDFs'
 import { usePDFOperations } from '@/lib/hooks/usePDFOperations'
+import { useLiveUpdates } from '@/lib/hooks/useLiveUpdates'
 
 interface GeneratedPDF {
   filename: string
@@ -26,16 +27,20 @@ interface GeneratedPDF {
 interface PDFGenerationResult {
   success: boolean
   message: string
-  generated_files: Array<{
+  generated_files: Array<{  // first 100 files of a batch run
     filename: string
     file_path: string
     user_name?: string
     emp_id?: string
     file_size?: number
   }>
+  generated_files_truncated?: boolean  // more files than listed in generated_files
+  results_url?: string  // paginated per-employee results of the run
+  run_id?: string
   total_resources: number
   total_employees: number
   successful_generations: number
+  failed_generations?: number
   filter_letter: string
   filter_emp_id?: string
   filter_billability?: string
@@ -49,18 +54,25 @@ export function EnhancedAutomationDashboard() {
   const [filterEmpId, setFilterEmpId] = useState('')
   const [filterBillability, setFilterBillability] = useState('all')
   const [customCondition, setCustomCondition] = useState('')
+  const [outputMode, setOutputMode] = useState('individual')
   const [processingResult, setProcessingResult] = useState<PDFGenerationResult | null>(null)
   const fileInputRef = useRef<HTMLInputElement>(null)
   const queryClient = useQueryClient()
 
   // Use custom hooks for data fetching
-  const { data: excelStatus, refetch: refetchExcelStatus } = useExcelStatus()
-  const { data: pdfs, isLoading: pdfsLoading, refetch: refetchPdfs } = useGeneratedPDFs()
-  const { deletePDF, deleteAllPDFs, downloadPDF, isDeleting, isDeletingAll } = usePDFOperations()
+  const { connected: liveUpdates, jobProgress } = useLiveUpdates()
+  const { data: excelStatus, refetch: refetchExcelStatus } = useExcelStatus({ live: liveUpdates })
+  const { data: pdfs, isLoading: pdfsLoading, refetch: refetchPdfs } = useGeneratedPDFs({ live: liveUpdates })
+  const { deletePDF, deleteAllPDFs, downloadPDF, downloadAllPDFs, isDeleting, isDeletingAll } = usePDFOperations()
 
   // Derived state from hooks
   const excelFileExists = excelStatus?.exists || false
   const excelFileInfo = excelStatus
+  // Live "processed/total" counts of the running generation, when events arrive
+  const generationProgress =
+    jobProgress?.status === 'running' && jobProgress.kind !== 'delete-all'
+      ? ` (${jobProgress.processed}/${jobProgress.total})`
+      : ''
 
   // Upload and generate PDFs mutation
   const uploadMutation = useMutation({
@@ -134,6 +146,7 @@ export function EnhancedAutomationDashboard() {
     formData.append('filter_emp_id', filterEmpId)
     formData.append('filter_billability', filterBillability)
     formData.append('custom_condition', customCondition)
+    formData.append('single_document', String(outputMode === 'combined'))
 
     try {
       const result = await uploadMutation.mutateAsync(formData)
@@ -142,7 +155,7 @@ export function EnhancedAutomationDashboard() {
     } catch (error) {
       logger.error('Error generating PDFs', error as Error)
     }
-  }, [selectedFile, excelFileExists, filterLetter, filterEmpId, filterBillability, customCondition, uploadMutation, refetchExcelStatus])
+  }, [selectedFile, excelFileExists, filterLetter, filterEmpId, filterBillability, customCondition, outputMode, uploadMutation, refetchExcelStatus])
 
   const handleClearExcel = useCallback(async () => {
     if (!window.confirm('Are you sure you want to clear the uploaded Excel file? This will allow you to upload a new file.')) {
@@ -316,6 +329,21 @@ export function EnhancedAutomationDashboard() {
                 Generate PDFs for resources with specific billability type
               </p>
             </div>
+            <div>
+              <Label htmlFor="output-mode">Output Mode</Label>
+              <select
+                id="output-mode"
+                value={outputMode}
+                onChange={(e) => setOutputMode(e.target.value)}
+                className="mt-1 w-full px-3 py-2 border border-light-gray dark:border-medium-gray rounded-md bg-white dark:bg-dark-gray text-dark-gray dark:text-white focus:outline-none focus:ring-2 focus:ring-teal"
+              >
+                <option value="individual">One PDF per Resource</option>
+                <option value="combined">Single Combined PDF</option>
+              </select>
+              <p className="text-sm text-gray-600 mt-1">
+                Combined mode produces one PDF with a bookmark for each resource
+              </p>
+            </div>
           </div>
           
           {/* Custom Condition Input - Full Width */}
@@ -373,7 +401,7 @@ export function EnhancedAutomationDashboard() {
               {isProcessing ? (
                 <>
                   <RefreshCw className="h-4 w-4 mr-2 animate-spin" />
-                  Processing Excel & Generating PDFs...
+                  Processing Excel & Generating PDFs{generationProgress}...
                 </>
               ) : (
                 <>
@@ -485,9 +513,17 @@ export function EnhancedAutomationDashboard() {
                 </div>
               ))}
               
-              {/* Delete All Button */}
+              {/* Download All / Delete All Buttons */}
               {pdfs.files.length > 0 && (
-                <div className="mt-4 pt-4 border-t">
+                <div className="mt-4 pt-4 border-t space-y-2">
+                  <Button
+                    onClick={() => downloadAllPDFs()}
+                    variant="outline"
+                    className="w-full"
+                  >
+                    <Download className="h-4 w-4 mr-2" />
+                    Download All PDFs as ZIP ({pdfs.files.length})
+                  </Button>
                   <Button
                     onClick={handleDeleteAll}
                     variant="destructive"
@@ -18,7 +18,12 @@ interface ExcelStatus {
   error?: string
 }
 
-export function useExcelStatus() {
+interface UseExcelStatusOptions {
+  // Live updates connected: rely on pushed events instead of polling
+  live?: boolean
+}
+
+export function useExcelStatus({ live = false }: UseExcelStatusOptions = {}) {
   return useQuery<ExcelStatus>({
     queryKey: ['excel-status'],
     queryFn: async () => {
@@ -36,7 +41,7 @@ export function useExcelStatus() {
         return { success: false, exists: false }
       }
     },
-    refetchInterval: 5000, // Check every 5 seconds
+    refetchInterval: live ? false : 5000, // Check every 5 seconds unless live updates are connected
     staleTime: 3000, // Consider data stale after 3 seconds
   })
 }
@@ -20,7 +20,12 @@ interface PDFListResponse {
   format?: string
 }
 
-export function useGeneratedPDFs() {
+interface UseGeneratedPDFsOptions {
+  // Live updates connected: rely on pushed events instead of polling
+  live?: boolean
+}
+
+export function useGeneratedPDFs({ live = false }: UseGeneratedPDFsOptions = {}) {
   return useQuery<PDFListResponse>({
     queryKey: ['generated-pdfs'],
     queryFn: async () => {
@@ -43,7 +48,7 @@ export function useGeneratedPDFs() {
         return { files: [], count: 0, output_directory: '' }
       }
     },
-    refetchInterval: 10000, // Refresh every 10 seconds
+    refetchInterval: live ? false : 10000, // Refresh every 10 seconds unless live updates are connected
     staleTime: 5000, // Consider data stale after 5 seconds
   })
 }
@@ -0,0 +1,92 @@
+/**
+ * Custom Hook for Live Updates
+ * Subscribes to backend change notifications (Server-Sent Events) and
+ * invalidates the affected queries, replacing interval polling while connected
+ */
+
+import { useEffect, useState } from 'react'
+import { useQueryClient } from '@tanstack/react-query'
+import logger from '../logger'
+
+// Event type -> query keys to refetch
+const INVALIDATIONS: Record<string, string[][]> = {
+  'snapshot-uploaded': [['excel-status']],
+  'snapshot-cleared': [['excel-status']],
+  'pdf-created': [['generated-pdfs']],
+  'pdf-deleted': [['generated-pdfs']],
+  'job-progress': [['generated-pdfs']],
+}
+
+// Coalesce bursts (e.g. one pdf-created per employee) into one refetch
+const INVALIDATE_DELAY_MS = 500
+
+export interface JobProgress {
+  run_id: string
+  kind?: 'delete-all'
+  status: 'running' | 'completed'
+  processed: number
+  total: number
+  successful?: number
+}
+
+export function useLiveUpdates() {
+  const queryClient = useQueryClient()
+  const [connected, setConnected] = useState(false)
+  const [jobProgress, setJobProgress] = useState<JobProgress | null>(null)
+
+  useEffect(() => {
+    if (typeof window === 'undefined' || typeof EventSource === 'undefined') {
+      return
+    }
+
+    const source = new EventSource('/api/backend/events')
+    const pending = new Set<string>()
+    let timer: ReturnType<typeof setTimeout> | null = null
+
+    const flush = () => {
+      timer = null
+      pending.forEach((key) => queryClient.invalidateQueries({ queryKey: JSON.parse(key) }))
+      pending.clear()
+    }
+
+    const handlers = Object.entries(INVALIDATIONS).map(([type, queryKeys]) => {
+      const handler = (event: MessageEvent) => {
+        if (type === 'job-progress') {
+          try {
+            setJobProgress(JSON.parse(event.data))
+          } catch (error) {
+            logger.warn('Malformed job-progress event', { data: event.data })
+          }
+        }
+        queryKeys.forEach((queryKey) => pending.add(JSON.stringify(queryKey)))
+        if (!timer) {
+          timer = setTimeout(flush, INVALIDATE_DELAY_MS)
+        }
+      }
+      source.addEventListener(type, handler as EventListener)
+      return [type, handler] as const
+    })
+
+    source.onopen = () => {
+      setConnected(true)
+      // Catch up on anything missed while disconnected
+      queryClient.invalidateQueries({ queryKey: ['excel-status'] })
+      queryClient.invalidateQueries({ queryKey: ['generated-pdfs'] })
+      logger.debug('Live updates connected')
+    }
+    source.onerror = () => {
+      // EventSource reconnects by itself; fall back to polling meanwhile
+      setConnected(false)
+      logger.debug('Live updates disconnected, falling back to polling')
+    }
+
+    return () => {
+      handlers.forEach(([type, handler]) => source.removeEventListener(type, handler as EventListener))
+      if (timer) clearTimeout(timer)
+      source.close()
+      setConnected(false)
+    }
+  }, [queryClient])
+
+  return { connected, jobProgress }
+}
@@ -9,6 +9,8 @@ import logger from '../logger'
 interface DeleteResponse {
   success: boolean
   message: string
+  deleted_count?: number
+  job_id?: string  // delete-all: background reclamation job
 }
 
 export function usePDFOperations() {
@@ -81,10 +83,23 @@ export function usePDFOperations() {
     }
   }
 
+  const downloadAllPDFs = (nameFilter?: string): void => {
+    // Let the browser stream the archive straight to disk instead of buffering a blob
+    const params = nameFilter ? `?name_filter=${encodeURIComponent(nameFilter)}` : ''
+    const link = document.createElement('a')
+    link.href = `/api/backend/expected-format-pdf/download-zip${params}`
+    link.download = 'timesheets.zip'
+    document.body.appendChild(link)
+    link.click()
+    document.body.removeChild(link)
+    logger.info('PDF ZIP download started', { nameFilter })
+  }
+
   return {
     deletePDF: deletePDF.mutateAsync,
     deleteAllPDFs: deleteAllPDFs.mutateAsync,
     downloadPDF,
+    downloadAllPDFs,
     isDeleting: deletePDF.isPending,
     isDeletingAll: deleteAllPDFs.isPending,
   }